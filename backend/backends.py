@@ -0,0 +1,248 @@
+# backends.py
+import os
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from schema import ClassRegistry
+from config import (
+    ROBOFLOW_API_KEY,
+    MODEL_WORKSPACE,
+    MODEL_NAME,
+    MODEL_VERSION,
+    CONFIDENCE_THRESHOLD,
+    OVERLAP_THRESHOLD,
+    DETECTION_BACKEND,
+    LOCAL_MODEL_PATH,
+    LOCAL_MODEL_LABELS,
+    LOCAL_MODEL_INPUT_SIZE,
+    STUB_DETECTOR_COST_MS,
+    STUB_DETECTOR_BOXES
+)
+
+class DetectionBackend:
+    """Interface for object detection backends.
+
+    predict_batch returns, for every frame, a list of prediction dicts with
+    'class', 'confidence' and a center-based 'x', 'y', 'width', 'height' box
+    in frame pixels, matching the Roboflow prediction format. Class names
+    are interned in the backend's registry, shared by every detector that
+    uses the backend.
+    """
+
+    def __init__(self):
+        self.classes = ClassRegistry()
+
+    def predict_batch(self, frames: List[np.ndarray]) -> List[List[dict]]:
+        raise NotImplementedError
+
+class RoboflowBackend(DetectionBackend):
+    """Hosted Roboflow model, one remote call per frame"""
+
+    def __init__(self):
+        super().__init__()
+        from roboflow import Roboflow
+
+        rf = Roboflow(api_key=ROBOFLOW_API_KEY)
+        self.model = rf.workspace(MODEL_WORKSPACE).project(MODEL_NAME).version(MODEL_VERSION).model
+
+    def predict_batch(self, frames):
+        # The hosted model takes one image per call
+        return [
+            list(self.model.predict(frame, confidence=CONFIDENCE_THRESHOLD, overlap=OVERLAP_THRESHOLD))
+            for frame in frames
+        ]
+
+def letterbox(frame: np.ndarray, size: int):
+    """Resize a frame into a square canvas keeping its aspect ratio.
+
+    Returns the padded image, the scale factor and the (left, top) padding.
+    """
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    left, top = (size - new_w) // 2, (size - new_h) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return canvas, scale, (left, top)
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                        iou_threshold: float) -> np.ndarray:
+    """Class-aware greedy NMS over corner boxes, returning kept indices"""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Offset boxes per class so that boxes of different classes never overlap
+    offsets = class_ids[:, None].astype(np.float32) * (boxes.max() + 1)
+    shifted = boxes + offsets
+    x1, y1, x2, y2 = shifted.T
+    areas = (x2 - x1) * (y2 - y1)
+
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+class LocalBackend(DetectionBackend):
+    """In-process CPU inference on an exported YOLO-style model.
+
+    Uses ONNX Runtime when requested and installed, otherwise OpenCV DNN.
+    Both YOLOv5 (N x 5+classes) and YOLOv8 (4+classes x N) output layouts
+    are supported.
+    """
+
+    def __init__(self, model_path: str = LOCAL_MODEL_PATH,
+                 labels_path: Optional[str] = LOCAL_MODEL_LABELS,
+                 input_size: int = LOCAL_MODEL_INPUT_SIZE,
+                 runtime: str = "onnx"):
+        super().__init__()
+        if not model_path or not os.path.exists(model_path):
+            raise FileNotFoundError(f"Local model not found: {model_path}")
+
+        self.input_size = input_size
+        self.labels = self._load_labels(labels_path)
+        self.classes = ClassRegistry(self.labels)
+        self.session = None
+        self.net = None
+
+        if runtime == "onnx":
+            try:
+                import onnxruntime as ort
+            except ImportError:
+                ort = None
+            if ort is not None:
+                self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+                model_input = self.session.get_inputs()[0]
+                self.input_name = model_input.name
+                # A symbolic or missing batch dimension means the model accepts batches
+                self.dynamic_batch = not isinstance(model_input.shape[0], int)
+
+        if self.session is None:
+            self.net = cv2.dnn.readNet(model_path)
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            self.dynamic_batch = False
+
+    @staticmethod
+    def _load_labels(labels_path: Optional[str]) -> List[str]:
+        if not labels_path or not os.path.exists(labels_path):
+            return []
+        with open(labels_path) as f:
+            return [line.strip() for line in f if line.strip()]
+
+    def _run(self, blob: np.ndarray) -> np.ndarray:
+        if self.session is not None:
+            return self.session.run(None, {self.input_name: blob})[0]
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def predict_batch(self, frames):
+        prepared = [letterbox(frame, self.input_size) for frame in frames]
+        blob = cv2.dnn.blobFromImages(
+            [image for image, _, _ in prepared],
+            scalefactor=1 / 255.0,
+            size=(self.input_size, self.input_size),
+            swapRB=True
+        )
+
+        if self.dynamic_batch:
+            outputs = self._run(blob)
+        else:
+            outputs = np.concatenate([self._run(blob[i:i + 1]) for i in range(len(frames))])
+
+        return [
+            self._decode(output, scale, padding)
+            for output, (_, scale, padding) in zip(outputs, prepared)
+        ]
+
+    def _decode(self, output: np.ndarray, scale: float, padding) -> List[dict]:
+        # YOLOv8 exports are (4 + classes, anchors); YOLOv5 exports are (anchors, 5 + classes)
+        if output.shape[0] < output.shape[1]:
+            output = output.T
+            class_scores = output[:, 4:]
+        else:
+            class_scores = output[:, 5:] * output[:, 4:5]
+
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        mask = scores >= CONFIDENCE_THRESHOLD
+        if not mask.any():
+            return []
+
+        boxes, scores, class_ids = output[mask, :4], scores[mask], class_ids[mask]
+
+        # Undo the letterbox so boxes are in original frame pixels
+        left, top = padding
+        cx = (boxes[:, 0] - left) / scale
+        cy = (boxes[:, 1] - top) / scale
+        w = boxes[:, 2] / scale
+        h = boxes[:, 3] / scale
+        corners = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        keep = non_max_suppression(corners, scores, class_ids, OVERLAP_THRESHOLD)
+        return [
+            {
+                'class': self.labels[class_ids[i]] if class_ids[i] < len(self.labels) else str(class_ids[i]),
+                'confidence': float(scores[i]),
+                'x': float(cx[i]),
+                'y': float(cy[i]),
+                'width': float(w[i]),
+                'height': float(h[i])
+            }
+            for i in keep
+        ]
+
+class StubBackend(DetectionBackend):
+    """Fake detector with a fixed per-frame cost, for benchmarks and load tests.
+
+    Each frame takes cost_ms of CPU time and yields the same boxes laid out
+    across the frame, so results are deterministic and trackable.
+    """
+
+    def __init__(self, cost_ms: float = STUB_DETECTOR_COST_MS, boxes: int = STUB_DETECTOR_BOXES):
+        super().__init__()
+        self.cost = cost_ms / 1000.0
+        self.boxes = boxes
+
+    def predict_batch(self, frames):
+        results = []
+        for frame in frames:
+            # Busy-wait so the cost is paid in CPU time, like a real model
+            deadline = time.perf_counter() + self.cost
+            while time.perf_counter() < deadline:
+                pass
+
+            h, w = frame.shape[:2]
+            results.append([
+                {
+                    'class': 'person',
+                    'confidence': 0.9,
+                    'x': w * (i + 0.5) / self.boxes,
+                    'y': h / 2,
+                    'width': w / (2 * self.boxes),
+                    'height': h / 3
+                }
+                for i in range(self.boxes)
+            ])
+        return results
+
+def create_backend(name: str = DETECTION_BACKEND) -> DetectionBackend:
+    """Create the detection backend selected in config"""
+    if name == "roboflow":
+        return RoboflowBackend()
+    if name in ("onnx", "opencv"):
+        return LocalBackend(runtime=name)
+    if name == "stub":
+        return StubBackend()
+    raise ValueError(f"Unknown detection backend: {name}")
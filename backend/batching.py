@@ -0,0 +1,116 @@
+# batching.py
+import asyncio
+import time
+from typing import Any, Callable, List, Optional
+
+from config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+
+# Takes a list of queued items and returns one result per item. Coroutine
+# functions are awaited directly, plain functions run in a thread. A result
+# that is an Exception fails only that item's caller.
+BatchDetector = Callable[[List[Any]], List[Any]]
+
+class BatchInferenceEngine:
+    """Gather items from concurrent callers and run them through the detector in batches"""
+
+    def __init__(self, detect_batch: BatchDetector,
+                 max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self.detect_batch = detect_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.frames = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_batch_time = 0.0
+
+    async def start(self):
+        """Start the batch scheduler"""
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batch scheduler and fail any frames still waiting"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        while self.queue and not self.queue.empty():
+            _, future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference engine stopped"))
+
+    async def submit(self, frame: Any) -> Any:
+        """Queue a frame for detection and wait for its result"""
+        if self.task is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((frame, future, time.monotonic()))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            started = time.monotonic()
+            for _, _, queued_at in batch:
+                wait = started - queued_at
+                self.total_queue_wait += wait
+                self.max_queue_wait = max(self.max_queue_wait, wait)
+
+            try:
+                frames = [frame for frame, _, _ in batch]
+                if asyncio.iscoroutinefunction(self.detect_batch):
+                    results = await self.detect_batch(frames)
+                else:
+                    results = await asyncio.to_thread(self.detect_batch, frames)
+                for (_, future, _), result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            self.batches += 1
+            self.frames += len(batch)
+            self.total_batch_time += time.monotonic() - started
+
+    def get_stats(self) -> dict:
+        """Get batch fill and queue wait statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "frames": self.frames,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "avg_batch_size": self.frames / self.batches if self.batches else 0.0,
+            "avg_batch_fill": self.frames / (self.batches * self.max_batch_size) if self.batches else 0.0,
+            "avg_queue_wait_ms": self.total_queue_wait / self.frames * 1000.0 if self.frames else 0.0,
+            "max_queue_wait_ms": self.max_queue_wait * 1000.0,
+            "avg_batch_time_ms": self.total_batch_time / self.batches * 1000.0 if self.batches else 0.0
+        }
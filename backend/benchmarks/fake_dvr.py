@@ -0,0 +1,98 @@
+# fake_dvr.py
+import argparse
+import asyncio
+import random
+from typing import Dict, Optional
+
+from aiohttp import web
+from benchmarks.frames import encode_jpeg, synthetic_frames
+
+class FakeDVRServer:
+    """Local stand-in for a Dahua DVR's HTTP API.
+
+    Serves magicBox.cgi?action=getSystemInfo and snapshot.cgi?channel=N the
+    way CameraManager expects them, after a configurable delay. Each channel
+    has its own synthetic snapshot, and failure_rate of requests answer 500
+    to exercise error paths.
+    """
+
+    def __init__(self, channels: int = 16, latency: float = 0.02, jitter: float = 0.0,
+                 failure_rate: float = 0.0, snapshot_size=(1280, 720),
+                 host: str = "127.0.0.1", port: int = 0):
+        self.channels = channels
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.host = host
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+        self.requests: Dict[str, int] = {"status": 0, "snapshot": 0}
+
+        width, height = snapshot_size
+        frames = synthetic_frames(channels, width, height, seed=1)
+        self.snapshots = {channel: encode_jpeg(frame) for channel, frame in enumerate(frames, start=1)}
+
+    @property
+    def address(self) -> str:
+        """host:port to register as the DVR IP"""
+        return f"{self.host}:{self.port}"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/cgi-bin/magicBox.cgi", self._system_info)
+        app.router.add_get("/cgi-bin/snapshot.cgi", self._snapshot)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        # Pick up the ephemeral port when started with port 0
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def _delay(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise web.HTTPInternalServerError()
+
+    async def _system_info(self, request: web.Request) -> web.Response:
+        self.requests["status"] += 1
+        await self._delay()
+        return web.Response(text=f"ChannelNum={self.channels}\ndeviceStatus=OK\nserialNumber=FAKE0001\n")
+
+    async def _snapshot(self, request: web.Request) -> web.Response:
+        self.requests["snapshot"] += 1
+        await self._delay()
+        try:
+            data = self.snapshots[int(request.query.get("channel", 1))]
+        except (KeyError, ValueError):
+            raise web.HTTPNotFound()
+        return web.Response(body=data, content_type="image/jpeg")
+
+async def serve(args):
+    server = FakeDVRServer(args.channels, args.latency, args.jitter, args.failure_rate,
+                           host=args.host, port=args.port)
+    await server.start()
+    print(f"Fake DVR with {args.channels} channels listening on {server.address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Dahua DVR for manual testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
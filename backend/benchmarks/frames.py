@@ -0,0 +1,63 @@
+# frames.py
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+def synthetic_frames(count: int, width: int = 1280, height: int = 720,
+                     objects: int = 3, seed: int = 0) -> Iterator[np.ndarray]:
+    """Generate BGR frames of boxes moving across a noisy background"""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 64, size=(height, width, 3), dtype=np.uint8)
+    positions = rng.uniform(0, 1, size=(objects, 2)) * (width, height)
+    velocities = rng.uniform(-8, 8, size=(objects, 2))
+    colors = rng.integers(128, 256, size=(objects, 3))
+    box_w, box_h = max(1, width // 12), max(1, height // 6)
+
+    for _ in range(count):
+        frame = background.copy()
+        for (x, y), color in zip(positions.astype(int), colors):
+            frame[max(0, y):y + box_h, max(0, x):x + box_w] = color
+        positions += velocities
+        # Bounce off the edges so objects stay in view
+        for axis, limit in enumerate((width - box_w, height - box_h)):
+            out = (positions[:, axis] < 0) | (positions[:, axis] > limit)
+            velocities[out, axis] *= -1
+            positions[:, axis] = positions[:, axis].clip(0, limit)
+        yield frame
+
+def video_frames(path: str, count: int) -> Iterator[np.ndarray]:
+    """Read up to count frames from a video file, looping when it ends"""
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    try:
+        produced = 0
+        while produced < count:
+            ok, frame = capture.read()
+            if not ok:
+                if produced == 0:
+                    raise ValueError(f"No frames in video: {path}")
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            produced += 1
+            yield frame
+    finally:
+        capture.release()
+
+def load_frames(count: int, video: Optional[str] = None,
+                width: int = 1280, height: int = 720) -> List[np.ndarray]:
+    """Frames from a video file when given, synthetic frames otherwise"""
+    if video:
+        return list(video_frames(video, count))
+    return list(synthetic_frames(count, width, height))
+
+def encode_jpeg(frame: np.ndarray, quality: int = 85) -> bytes:
+    """JPEG-encode a frame like a camera snapshot or client upload"""
+    import cv2
+
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode frame")
+    return encoded.tobytes()
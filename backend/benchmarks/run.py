@@ -0,0 +1,344 @@
+# run.py
+"""Benchmark suite for the detection backend.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --only analyze snapshot
+
+Every benchmark reports throughput and p50/p95/p99 latency. Results are
+saved as JSON, and --baseline compares a run against an earlier one and
+exits non-zero when a benchmark regressed by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from benchmarks.fake_dvr import FakeDVRServer
+from benchmarks.frames import encode_jpeg, load_frames
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = ["analyze", "camera_list", "snapshot", "add_alert", "tracker"]
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> dict:
+    """Throughput and latency percentiles, in milliseconds, of one benchmark"""
+    samples = np.array(latencies) * 1000.0
+    stats = {
+        "count": len(latencies),
+        "errors": errors,
+        "seconds": round(seconds, 4),
+        "throughput": round(len(latencies) / seconds, 2) if seconds else 0.0
+    }
+    if len(samples):
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        stats.update({
+            "mean_ms": round(float(samples.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(samples.max()), 3)
+        })
+    return stats
+
+async def measure(call: Callable[[int], Awaitable], requests: int, concurrency: int) -> dict:
+    """Run call(i) for i in range(requests) from concurrency clients"""
+    latencies, errors = [], 0
+    pending = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+class AnalyzeServer:
+    """The API server in a subprocess, using the stub detector and a scratch database"""
+
+    def __init__(self, port: int, workdir: str, cost_ms: float, boxes: int, workers: Optional[int]):
+        self.url = f"http://127.0.0.1:{port}"
+        self.port = port
+        self.workdir = workdir
+        self.env = dict(os.environ,
+                        DETECTION_BACKEND="stub",
+                        STUB_DETECTOR_COST_MS=str(cost_ms),
+                        STUB_DETECTOR_BOXES=str(boxes))
+        if workers:
+            self.env["INFERENCE_WORKERS"] = str(workers)
+        self.process: Optional[subprocess.Popen] = None
+
+    async def start(self, session, timeout: float = 60.0):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:asgi_app", "--app-dir", BACKEND_DIR,
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=self.workdir, env=self.env
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"API server exited with code {self.process.returncode}")
+            try:
+                async with session.get(f"{self.url}/ready") as response:
+                    if response.status == 200:
+                        return
+            except Exception:
+                pass
+            await asyncio.sleep(0.2)
+        raise RuntimeError(f"API server not ready after {timeout}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+async def bench_analyze(args, workdir: str) -> dict:
+    """POST /analyze with JPEG frames"""
+    import aiohttp
+
+    uploads = [encode_jpeg(frame) for frame in load_frames(args.frames, args.video, args.width, args.height)]
+    async with aiohttp.ClientSession() as session:
+        server = None
+        url = args.url
+        if not url:
+            server = AnalyzeServer(args.port, workdir, args.stub_cost_ms, args.stub_boxes, args.inference_workers)
+            await server.start(session)
+            url = server.url
+
+        async def call(i: int):
+            form = aiohttp.FormData()
+            form.add_field("file", uploads[i % len(uploads)], filename="frame.jpg", content_type="image/jpeg")
+            params = {"camera_id": f"bench-{i % args.streams}"} if args.streams else None
+            async with session.post(f"{url}/analyze", data=form, params=params) as response:
+                body = await response.json()
+                if response.status != 200 or body.get("status") == "error":
+                    raise RuntimeError(body)
+
+        try:
+            # Warm the connection and the worker pipelines before timing
+            await measure(call, min(args.requests, 10), 1)
+            return await measure(call, args.requests, args.concurrency)
+        finally:
+            if server:
+                server.stop()
+
+async def _camera_manager(args, workdir: str, name: str):
+    from database import Database
+    from camera_manager import CameraManager
+
+    dvr = FakeDVRServer(args.channels, args.dvr_latency, args.dvr_jitter)
+    await dvr.start()
+    db = Database(os.path.join(workdir, f"{name}.db"))
+    await db.initialize()
+    manager = CameraManager(db)
+    await manager.initialize(dvr.address, "admin", "admin")
+    return dvr, db, manager
+
+async def _close_manager(dvr, db, manager):
+    await manager.close()
+    await db.close()
+    await dvr.stop()
+
+async def bench_camera_list(args, workdir: str) -> dict:
+    """CameraManager.get_camera_list against a fake DVR"""
+    dvr, db, manager = await _camera_manager(args, workdir, "camera_list")
+    try:
+        return await measure(lambda i: manager.get_camera_list(), args.requests, 1)
+    finally:
+        await _close_manager(dvr, db, manager)
+
+async def bench_snapshot(args, workdir: str) -> dict:
+    """CameraManager.get_snapshot across all channels of a fake DVR"""
+    dvr, db, manager = await _camera_manager(args, workdir, "snapshot")
+    manager.snapshots.ttl = args.snapshot_ttl
+    camera_ids = list(manager.cameras)
+
+    async def call(i: int):
+        if await manager.get_snapshot(camera_ids[i % len(camera_ids)]) is None:
+            raise RuntimeError("No snapshot")
+
+    try:
+        stats = await measure(call, args.requests, args.concurrency)
+        stats["cache"] = manager.snapshots.get_stats()
+        stats["upstream_requests"] = dvr.requests["snapshot"]
+        return stats
+    finally:
+        await _close_manager(dvr, db, manager)
+
+async def bench_add_alert(args, workdir: str) -> dict:
+    """Database.add_alert enqueue latency and the rate alerts reach the disk"""
+    from database import Database
+
+    db = Database(os.path.join(workdir, "alerts.db"))
+    await db.initialize()
+    try:
+        started = time.perf_counter()
+        stats = await measure(
+            lambda i: db.add_alert("Suspicious Activity", f"Camera {i % 16}", "high"),
+            args.requests, args.concurrency
+        )
+        while db.alerts_written < stats["count"]:
+            await asyncio.sleep(0.001)
+        seconds = time.perf_counter() - started
+        stats["written_per_second"] = round(db.alerts_written / seconds, 2)
+        stats["flushes"] = db.flushes
+        return stats
+    finally:
+        await db.close()
+
+async def bench_tracker(args, workdir: str) -> dict:
+    """IoUTracker.update on moving synthetic detections"""
+    from schema import ClassRegistry, predictions_to_array
+    from tracker import IoUTracker
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 1, size=(args.objects, 2)) * (args.width, args.height)
+    velocities = rng.uniform(-5, 5, size=(args.objects, 2))
+    classes = ClassRegistry()
+    steps = []
+    for _ in range(args.requests):
+        positions += velocities
+        steps.append(predictions_to_array([
+            {'class': 'person', 'confidence': 0.9, 'x': x, 'y': y, 'width': 40, 'height': 80}
+            for x, y in positions
+        ], classes))
+
+    tracker = IoUTracker()
+    latencies = []
+    started = time.perf_counter()
+    for detections in steps:
+        step_started = time.perf_counter()
+        tracker.update(detections)
+        tracker.to_array()
+        latencies.append(time.perf_counter() - step_started)
+    stats = summarize(latencies, 0, time.perf_counter() - started)
+    stats["tracks"] = len(tracker)
+    return stats
+
+RUNNERS = {
+    "analyze": bench_analyze,
+    "camera_list": bench_camera_list,
+    "snapshot": bench_snapshot,
+    "add_alert": bench_add_alert,
+    "tracker": bench_tracker
+}
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Print each benchmark against the baseline and return the ones that regressed"""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        checks = [
+            # (metric, worse when higher)
+            ("p95_ms", True),
+            ("p99_ms", True),
+            ("throughput", False),
+            ("written_per_second", False)
+        ]
+        for metric, higher_is_worse in checks:
+            old, new = previous.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change > tolerance if higher_is_worse else change < -tolerance
+            flag = "REGRESSION" if regressed else ""
+            print(f"  {name:<12} {metric:<11} {old:>12.3f} -> {new:>12.3f} ({change:+.1%}) {flag}")
+            if regressed:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+async def run(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir:
+        for name in args.only:
+            print(f"Running {name}...")
+            results[name] = await RUNNERS[name](args, workdir)
+            stats = results[name]
+            print(f"  {stats['count']} ok, {stats['errors']} errors, {stats['throughput']}/s, "
+                  f"p50 {stats.get('p50_ms')}ms p95 {stats.get('p95_ms')}ms p99 {stats.get('p99_ms')}ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the detection backend")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to save the JSON results")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    parser.add_argument("--requests", type=int, default=500, help="Operations per benchmark")
+    parser.add_argument("--concurrency", type=int, default=8)
+
+    frames = parser.add_argument_group("frames")
+    frames.add_argument("--video", help="Video file to take frames from instead of synthetic ones")
+    frames.add_argument("--frames", type=int, default=50, help="Distinct frames to cycle through")
+    frames.add_argument("--width", type=int, default=1280)
+    frames.add_argument("--height", type=int, default=720)
+    frames.add_argument("--objects", type=int, default=20, help="Objects per frame for the tracker")
+
+    analyze = parser.add_argument_group("analyze")
+    analyze.add_argument("--url", help="Benchmark a running server instead of starting one")
+    analyze.add_argument("--port", type=int, default=8765)
+    analyze.add_argument("--streams", type=int, default=4, help="Distinct camera_id values, 0 for none")
+    analyze.add_argument("--stub-cost-ms", type=float, default=20.0)
+    analyze.add_argument("--stub-boxes", type=int, default=3)
+    analyze.add_argument("--inference-workers", type=int)
+
+    dvr = parser.add_argument_group("fake DVR")
+    dvr.add_argument("--channels", type=int, default=16)
+    dvr.add_argument("--dvr-latency", type=float, default=0.02, help="Seconds per DVR response")
+    dvr.add_argument("--dvr-jitter", type=float, default=0.0)
+    dvr.add_argument("--snapshot-ttl", type=float, default=0.0, help="0 fetches every snapshot upstream")
+
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": vars(args),
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} ({baseline.get('commit')}, {baseline.get('timestamp')}):")
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
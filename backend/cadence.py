@@ -0,0 +1,65 @@
+# cadence.py
+from config import (
+    ADAPTIVE_DETECTION,
+    DETECT_INTERVAL_MIN,
+    DETECT_INTERVAL_MAX,
+    DETECT_CONFIDENCE_FLOOR
+)
+
+class DetectionCadence:
+    """Decide which frames get full detection and which are carried by the tracker.
+
+    The detection interval grows by one frame after every quiet keyframe and
+    halves whenever tracks appear or are lost, staying between the configured
+    bounds. A detection is also forced when any coasting track's confidence
+    falls below the floor.
+    """
+
+    def __init__(self, enabled: bool = ADAPTIVE_DETECTION,
+                 min_interval: int = DETECT_INTERVAL_MIN,
+                 max_interval: int = DETECT_INTERVAL_MAX,
+                 confidence_floor: float = DETECT_CONFIDENCE_FLOOR):
+        self.enabled = enabled
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.confidence_floor = confidence_floor
+        self.interval = self.min_interval
+        self.frames_since_detection = 0
+
+        self.detected_frames = 0
+        self.tracked_frames = 0
+
+    def should_detect(self, tracker) -> bool:
+        """Claim the next frame, returning whether it should run the detector"""
+        self.frames_since_detection += 1
+        detect = (
+            not self.enabled
+            or self.frames_since_detection >= self.interval
+            or tracker.min_confidence() < self.confidence_floor
+        )
+        if detect:
+            self.frames_since_detection = 0
+            self.detected_frames += 1
+        else:
+            self.tracked_frames += 1
+        return detect
+
+    def record_detection(self, tracker):
+        """Adapt the interval to the activity seen on a keyframe"""
+        if not self.enabled:
+            return
+        if tracker.new_tracks or tracker.lost_tracks:
+            self.interval = max(self.min_interval, self.interval // 2)
+        else:
+            self.interval = min(self.max_interval, self.interval + 1)
+
+    def get_stats(self) -> dict:
+        """Get the current interval and the achieved detect/track ratio"""
+        total = self.detected_frames + self.tracked_frames
+        return {
+            "enabled": self.enabled,
+            "interval": self.interval,
+            "detected_frames": self.detected_frames,
+            "tracked_frames": self.tracked_frames,
+            "detect_ratio": self.detected_frames / total if total else 1.0
+        }
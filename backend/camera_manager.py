@@ -2,31 +2,98 @@ import asyncio
 import aiohttp
 import base64
 import json
-from typing import Dict, Optional
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
 from datetime import datetime
+from ingest import IngestWorker, FrameHandler
+from snapshots import SnapshotCache, Snapshot
+from preview import PreviewStream
+from clips import ClipRecorder
+from metrics import registry
+from config import (
+    STATUS_POLL_INTERVAL,
+    STATUS_CACHE_TTL,
+    STATUS_REQUEST_TIMEOUT,
+    DVR_POOL_LIMIT,
+    DVR_POOL_LIMIT_PER_HOST,
+    DVR_DNS_CACHE_TTL,
+    DVR_KEEPALIVE_TIMEOUT,
+    DVR_CONCURRENCY
+)
+
+DVR_REQUEST_SECONDS = registry.histogram("dvr_request_seconds", "Latency of HTTP calls to DVRs")
+DVR_REQUEST_ERRORS = registry.counter("dvr_request_errors_total", "DVR HTTP calls that failed or timed out")
+
+@contextmanager
+def dvr_request(ip: str, request: str):
+    """Time an HTTP call to a DVR, counting failures and cancellations by timeout"""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        DVR_REQUEST_ERRORS.inc(dvr=ip, request=request)
+        raise
+    finally:
+        DVR_REQUEST_SECONDS.observe(time.perf_counter() - started, dvr=ip, request=request)
+
+class DvrConnectionPool:
+    """Shared keep-alive HTTP session for every channel of a DVR"""
+
+    def __init__(self, username: str, password: str,
+                 limit: int = DVR_POOL_LIMIT,
+                 limit_per_host: int = DVR_POOL_LIMIT_PER_HOST,
+                 dns_cache_ttl: int = DVR_DNS_CACHE_TTL,
+                 keepalive_timeout: float = DVR_KEEPALIVE_TIMEOUT):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.headers = {
+            "Authorization": f"Basic {base64.b64encode(f'{username}:{password}'.encode()).decode()}",
+            "Content-Type": "application/json"
+        }
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self.session
+
+    async def close(self):
+        """Close the shared session and all pooled connections"""
+        if self.session:
+            await self.session.close()
+            self.session = None
 
 class DahuaCamera:
-    def __init__(self, ip: str, username: str, password: str, channel: int = 1):
+    def __init__(self, ip: str, username: str, password: str, channel: int = 1,
+                 pool: Optional[DvrConnectionPool] = None):
         self.ip = ip
         self.username = username
         self.password = password
         self.channel = channel
+        self.owns_pool = pool is None
+        self.pool = pool or DvrConnectionPool(username, password)
         self.session: Optional[aiohttp.ClientSession] = None
-        self.auth = base64.b64encode(f"{username}:{password}".encode()).decode()
         
     async def connect(self):
-        """Initialize connection to the camera"""
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers={
-                "Authorization": f"Basic {self.auth}",
-                "Content-Type": "application/json"
-            })
+        """Borrow the shared DVR session for this camera"""
+        if not self.session or self.session.closed:
+            self.session = await self.pool.get_session()
         
     async def disconnect(self):
-        """Close the camera connection"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the camera's session, closing it only if the camera owns the pool"""
+        self.session = None
+        if self.owns_pool:
+            await self.pool.close()
             
     async def get_stream_url(self) -> str:
         """Get RTSP stream URL for the camera"""
@@ -34,54 +101,61 @@ class DahuaCamera:
         
     async def get_snapshot(self) -> bytes:
         """Get a snapshot from the camera"""
-        if not self.session:
-            await self.connect()
-            
+        await self.connect()
         url = f"http://{self.ip}/cgi-bin/snapshot.cgi?channel={self.channel}"
-        async with self.session.get(url) as response:
-            return await response.read()
+        with dvr_request(self.ip, "snapshot"):
+            async with self.session.get(url) as response:
+                return await response.read()
             
     async def get_status(self) -> dict:
         """Get camera status"""
-        if not self.session:
-            await self.connect()
-            
+        await self.connect()
         url = f"http://{self.ip}/cgi-bin/magicBox.cgi?action=getSystemInfo"
-        async with self.session.get(url) as response:
-            data = await response.text()
-            return {item.split("=")[0]: item.split("=")[1] 
-                   for item in data.strip().split("\n") if "=" in item}
+        with dvr_request(self.ip, "status"):
+            async with self.session.get(url) as response:
+                data = await response.text()
+        return {item.split("=")[0]: item.split("=")[1]
+                for item in data.strip().split("\n") if "=" in item}
 
 class DahuaDVR:
-    def __init__(self, ip: str, username: str, password: str):
+    def __init__(self, ip: str, username: str, password: str,
+                 concurrency: int = DVR_CONCURRENCY):
         self.ip = ip
         self.username = username
         self.password = password
         self.cameras: Dict[int, DahuaCamera] = {}
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.pool = DvrConnectionPool(username, password)
+        # Caps concurrent requests to this box, so a slow DVR only queues its own work
+        self.limit = asyncio.Semaphore(concurrency)
         
     async def initialize(self):
         """Initialize connection to the DVR and discover cameras"""
-        self.session = aiohttp.ClientSession(headers={
-            "Authorization": f"Basic {base64.b64encode(f'{self.username}:{self.password}'.encode()).decode()}",
-            "Content-Type": "application/json"
-        })
+        session = await self.pool.get_session()
         
         # Get channel information
         url = f"http://{self.ip}/cgi-bin/magicBox.cgi?action=getSystemInfo"
-        async with self.session.get(url) as response:
-            data = await response.text()
-            info = {item.split("=")[0]: item.split("=")[1] 
-                   for item in data.strip().split("\n") if "=" in item}
-            
-            # Initialize cameras based on available channels
-            for channel in range(1, int(info.get("ChannelNum", 1)) + 1):
-                self.cameras[channel] = DahuaCamera(
-                    self.ip,
-                    self.username,
-                    self.password,
-                    channel
-                )
+        with dvr_request(self.ip, "system_info"):
+            async with session.get(url) as response:
+                data = await response.text()
+        info = {item.split("=")[0]: item.split("=")[1]
+                for item in data.strip().split("\n") if "=" in item}
+
+        # Initialize cameras based on available channels
+        for channel in range(1, int(info.get("ChannelNum", 1)) + 1):
+            self.add_camera(channel)
+
+    def add_camera(self, channel: int) -> "DahuaCamera":
+        """Register a channel of this DVR"""
+        camera = self.cameras.get(channel)
+        if camera is None:
+            camera = self.cameras[channel] = DahuaCamera(
+                self.ip,
+                self.username,
+                self.password,
+                channel,
+                pool=self.pool
+            )
+        return camera
                 
     async def get_camera(self, channel: int) -> Optional[DahuaCamera]:
         """Get camera by channel number"""
@@ -96,71 +170,408 @@ class DahuaDVR:
         for camera in self.cameras.values():
             await camera.disconnect()
             
-        if self.session:
-            await self.session.close()
-            
+        await self.pool.close()
+
+StatusHandler = Callable[[int, dict], Awaitable[None]]
+# Gets a camera's region of interest when it is registered, and None when it is removed
+RoiHandler = Callable[[int, Optional[dict]], None]
+
+class CameraStatusPoller:
+    """Poll every camera of every DVR in the background and keep a cached status table.
+
+    Each DVR is polled under its own concurrency limit, so a slow or dead
+    box only delays its own cameras.
+    """
+
+    def __init__(self, manager: "CameraManager",
+                 interval: float = STATUS_POLL_INTERVAL,
+                 ttl: float = STATUS_CACHE_TTL,
+                 timeout: float = STATUS_REQUEST_TIMEOUT):
+        self.manager = manager
+        self.interval = interval
+        self.ttl = ttl
+        self.timeout = timeout
+        self.table: Dict[int, dict] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background polling loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background polling loop"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"Camera status poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def poll_once(self):
+        """Query all cameras concurrently and refresh the status table"""
+        cameras = dict(self.manager.cameras)
+        for camera_id in list(self.table):
+            if camera_id not in cameras:
+                del self.table[camera_id]
+
+        await asyncio.gather(self.manager.retry_offline(), *(
+            self._poll_camera(camera_id)
+            for camera_id in cameras
+        ))
+
+    async def poll_dvr(self, dvr_id: int):
+        """Refresh the status of one DVR's cameras"""
+        await asyncio.gather(*(
+            self._poll_camera(camera_id)
+            for camera_id, info in list(self.manager.cameras.items())
+            if info["dvr_id"] == dvr_id
+        ))
+
+    async def _poll_camera(self, camera_id: int):
+        resolved = self.manager.resolve(camera_id)
+        if resolved is None:
+            return
+        dvr, camera = resolved
+
+        entry = self.table.get(camera_id)
+        if entry is None:
+            entry = {
+                "status": "unknown",
+                "stream_url": await camera.get_stream_url(),
+                "last_checked": None,
+                "last_success": None,
+                "last_error": None
+            }
+            self.table[camera_id] = entry
+        previous = entry["status"]
+
+        async with dvr.limit:
+            try:
+                status = await asyncio.wait_for(camera.get_status(), self.timeout)
+                entry["status"] = "active" if status.get("deviceStatus") == "OK" else "inactive"
+                entry["last_success"] = time.time()
+                entry["last_error"] = None
+            except asyncio.TimeoutError:
+                entry["status"] = "inactive"
+                entry["last_error"] = f"Timed out after {self.timeout}s"
+            except Exception as e:
+                entry["status"] = "inactive"
+                entry["last_error"] = str(e) or type(e).__name__
+            entry["last_checked"] = time.time()
+
+        if entry["status"] != previous:
+            await self.manager.status_changed(camera_id, entry)
+
+    def is_stale(self, entry: dict) -> bool:
+        """Check whether a status entry is older than the cache TTL"""
+        return entry["last_checked"] is None or time.time() - entry["last_checked"] > self.ttl
+
+    def get_status(self, camera_id: int) -> Optional[dict]:
+        """Get the cached status entry for a camera"""
+        return self.table.get(camera_id)
+
 class CameraManager:
-    def __init__(self):
-        self.dvr: Optional[DahuaDVR] = None
-        self.active_streams: Dict[int, asyncio.Task] = {}
+    """Cameras of every registered DVR, addressed by global camera id.
+
+    DVRs and their channels are persisted in the database; each camera id
+    maps to a (dvr, channel) pair.
+    """
+
+    def __init__(self, db=None):
+        self.db = db
+        self.dvrs: Dict[int, DahuaDVR] = {}
+        # DVRs whose channels could not be discovered yet
+        self.offline = set()
+        self.cameras: Dict[int, dict] = {}
+        self.active_streams: Dict[int, IngestWorker] = {}
+        self.frame_handler: Optional[FrameHandler] = None
+        self.status_handler: Optional[StatusHandler] = None
+        self.roi_handler: Optional[RoiHandler] = None
+        # Samples running streams into event clip pre-roll when set
+        self.clip_recorder: Optional[ClipRecorder] = None
+        self.poller = CameraStatusPoller(self)
+        self.snapshots = SnapshotCache(self._fetch_snapshot)
+        self.previews: Dict[int, PreviewStream] = {}
+        self.preview_lock = asyncio.Lock()
+
+    async def load(self):
+        """Connect to every DVR stored in the database concurrently and start polling"""
+        dvrs = await self.db.get_dvrs()
+        await asyncio.gather(*(
+            self._connect_dvr(dvr["id"], dvr["ip"], dvr["username"], dvr["password"])
+            for dvr in dvrs
+        ))
+        await self.poller.start()
         
-    async def initialize(self, dvr_ip: str, username: str, password: str):
-        """Initialize the camera manager with DVR credentials"""
-        self.dvr = DahuaDVR(dvr_ip, username, password)
-        await self.dvr.initialize()
+    async def initialize(self, dvr_ip: str, username: str, password: str) -> int:
+        """Register a DVR, or reconnect a known one with new credentials, and return its id.
+
+        Nothing is stored unless the DVR answers with these credentials.
+        Streams and live previews running on a reconfigured DVR are moved
+        to the new connection, and previews keep their viewers.
+        """
+        dvr = DahuaDVR(dvr_ip, username, password)
+        try:
+            await asyncio.wait_for(dvr.initialize(), STATUS_REQUEST_TIMEOUT)
+        except BaseException:
+            await dvr.close()
+            raise
+
+        dvr_id = await self.db.save_dvr(dvr_ip, username, password)
+        async with self.preview_lock:
+            camera_ids = [camera_id for camera_id, info in self.cameras.items() if info["dvr_id"] == dvr_id]
+            detecting = [
+                camera_id for camera_id in camera_ids
+                if camera_id in self.active_streams and self.active_streams[camera_id].on_frame is not None
+            ]
+            # Previews are detached so removing the old connection does not end them
+            previews = {camera_id: self.previews.pop(camera_id) for camera_id in camera_ids if camera_id in self.previews}
+
+            await self.remove_dvr(dvr_id, forget=False)
+            self.dvrs[dvr_id] = dvr
+            await self._register_cameras(dvr_id, dvr)
+
+            for camera_id, preview in previews.items():
+                worker = await self._start_worker(camera_id) if camera_id in self.cameras else None
+                if worker is None:
+                    await preview.stop()
+                    continue
+                preview.worker = worker
+                self.previews[camera_id] = preview
+            for camera_id in detecting:
+                await self.start_stream(camera_id)
+        await self.poller.poll_dvr(dvr_id)
+        await self.poller.start()
+        return dvr_id
+
+    async def _connect_dvr(self, dvr_id: int, ip: str, username: str, password: str) -> DahuaDVR:
+        dvr = DahuaDVR(ip, username, password)
+        try:
+            await asyncio.wait_for(dvr.initialize(), STATUS_REQUEST_TIMEOUT)
+        except Exception as e:
+            # Keep the cameras known from earlier runs; polling reports them until the box is back
+            print(f"DVR {ip} unreachable: {str(e) or type(e).__name__}")
+            for camera in await self.db.get_dvr_cameras(dvr_id):
+                dvr.add_camera(camera["channel"])
+            self.offline.add(dvr_id)
+
+        self.dvrs[dvr_id] = dvr
+        await self._register_cameras(dvr_id, dvr)
+        return dvr
+
+    async def _register_cameras(self, dvr_id: int, dvr: DahuaDVR):
+        channels = {
+            channel: (f"{dvr.ip} Camera {channel}", await camera.get_stream_url())
+            for channel, camera in dvr.cameras.items()
+        }
+        rows = await self.db.save_dvr_cameras(dvr_id, channels)
+        for channel, row in rows.items():
+            if channel in dvr.cameras:
+                info = self.cameras[row["id"]] = {
+                    "dvr_id": dvr_id, "channel": channel, "name": row["name"],
+                    "roi": json.loads(row["roi"]) if row.get("roi") else None
+                }
+                if self.roi_handler:
+                    self.roi_handler(row["id"], info["roi"])
+
+    async def retry_offline(self):
+        """Retry channel discovery on DVRs that were unreachable when connected"""
+        async def retry(dvr_id: int):
+            dvr = self.dvrs.get(dvr_id)
+            if dvr is None:
+                self.offline.discard(dvr_id)
+                return
+            try:
+                await asyncio.wait_for(dvr.initialize(), STATUS_REQUEST_TIMEOUT)
+            except Exception:
+                return
+            self.offline.discard(dvr_id)
+            await self._register_cameras(dvr_id, dvr)
+
+        await asyncio.gather(*(retry(dvr_id) for dvr_id in list(self.offline)))
+
+    async def remove_dvr(self, dvr_id: int, forget: bool = True):
+        """Disconnect a DVR, stopping its streams; with forget, also delete it from the database"""
+        for camera_id in [camera_id for camera_id, info in self.cameras.items() if info["dvr_id"] == dvr_id]:
+            preview = self.previews.pop(camera_id, None)
+            if preview:
+                await preview.stop()
+            if camera_id in self.active_streams:
+                await self._stop_worker(camera_id)
+            self.snapshots.entries.pop(camera_id, None)
+            self.poller.table.pop(camera_id, None)
+            del self.cameras[camera_id]
+            if self.roi_handler:
+                self.roi_handler(camera_id, None)
+
+        self.offline.discard(dvr_id)
+        dvr = self.dvrs.pop(dvr_id, None)
+        if dvr:
+            await dvr.close()
+        if forget:
+            await self.db.delete_dvr(dvr_id)
+
+    def resolve(self, camera_id: int) -> Optional[Tuple[DahuaDVR, DahuaCamera]]:
+        """Map a global camera id to its DVR and channel camera"""
+        info = self.cameras.get(camera_id)
+        if info is None:
+            return None
+        dvr = self.dvrs.get(info["dvr_id"])
+        if dvr is None or info["channel"] not in dvr.cameras:
+            return None
+        return dvr, dvr.cameras[info["channel"]]
+
+    async def status_changed(self, camera_id: int, entry: dict):
+        """Persist a camera status change and pass it on to the status handler"""
+        if self.db:
+            await self.db.update_camera_status(camera_id, entry["status"])
+        if self.status_handler:
+            await self.status_handler(camera_id, entry)
+
+    def get_dvr_list(self) -> list:
+        """Get every connected DVR with its camera ids"""
+        return [
+            {
+                "id": dvr_id,
+                "ip": dvr.ip,
+                "online": dvr_id not in self.offline,
+                "cameras": sorted(camera_id for camera_id, info in self.cameras.items() if info["dvr_id"] == dvr_id)
+            }
+            for dvr_id, dvr in self.dvrs.items()
+        ]
         
     async def get_camera_list(self) -> list:
-        """Get list of all available cameras"""
-        if not self.dvr:
-            return []
-            
+        """Get list of all available cameras from the cached status table"""
         cameras = []
-        for channel, camera in (await self.dvr.get_all_cameras()).items():
-            status = await camera.get_status()
+        for camera_id, entry in self.poller.table.items():
+            info = self.cameras[camera_id]
             cameras.append({
-                "id": channel,
-                "name": f"Camera {channel}",
-                "status": "active" if status.get("deviceStatus") == "OK" else "inactive",
-                "streamUrl": await camera.get_stream_url()
+                "id": camera_id,
+                "name": info["name"],
+                "dvrId": info["dvr_id"],
+                "channel": info["channel"],
+                "status": entry["status"],
+                "streamUrl": entry["stream_url"],
+                "lastChecked": datetime.fromtimestamp(entry["last_checked"]).isoformat() if entry["last_checked"] else None,
+                "lastError": entry["last_error"],
+                "stale": self.poller.is_stale(entry)
             })
         return cameras
         
-    async def start_stream(self, channel: int) -> bool:
-        """Start streaming from a specific camera"""
-        if not self.dvr:
-            return False
-            
-        camera = await self.dvr.get_camera(channel)
-        if not camera:
-            return False
-            
-        await camera.connect()
+    async def start_stream(self, camera_id: int, source: Optional[Union[str, int]] = None) -> bool:
+        """Start ingesting frames from a specific camera, or from an explicit source"""
+        worker = self.active_streams.get(camera_id)
+        if worker is None:
+            worker = await self._start_worker(camera_id, source)
+            if worker is None:
+                return False
+        # A worker opened only for live preview starts feeding detection too
+        worker.on_frame = self.frame_handler
         return True
+
+    async def _start_worker(self, camera_id: int, source: Optional[Union[str, int]] = None) -> Optional[IngestWorker]:
+        if source is None:
+            resolved = self.resolve(camera_id)
+            if resolved is None:
+                return None
+
+            _, camera = resolved
+            await camera.connect()
+            source = await camera.get_stream_url()
+
+        worker = IngestWorker(camera_id, source)
+        await worker.start()
+        self.active_streams[camera_id] = worker
+        if self.clip_recorder:
+            self.clip_recorder.watch(str(camera_id), worker)
+        return worker
         
-    async def stop_stream(self, channel: int) -> bool:
-        """Stop streaming from a specific camera"""
-        if not self.dvr:
-            return False
-            
-        camera = await self.dvr.get_camera(channel)
-        if not camera:
+    async def stop_stream(self, camera_id: int) -> bool:
+        """Stop ingesting frames from a specific camera"""
+        worker = self.active_streams.get(camera_id)
+        if not worker:
             return False
-            
-        await camera.disconnect()
+
+        if camera_id in self.previews:
+            # Keep decoding for the live preview viewers, without detection
+            worker.on_frame = None
+            return True
+        await self._stop_worker(camera_id)
         return True
+
+    async def _stop_worker(self, camera_id: int):
+        worker = self.active_streams.pop(camera_id)
+        if self.clip_recorder:
+            await self.clip_recorder.unwatch(str(camera_id))
+        await worker.stop()
+        resolved = self.resolve(camera_id)
+        if resolved:
+            await resolved[1].disconnect()
+
+    async def open_preview(self, camera_id: int) -> Optional[PreviewStream]:
+        """Join a camera's live preview, starting its decode if nobody is watching yet"""
+        async with self.preview_lock:
+            preview = self.previews.get(camera_id)
+            if preview is None:
+                worker = self.active_streams.get(camera_id) or await self._start_worker(camera_id)
+                if worker is None:
+                    return None
+                preview = self.previews[camera_id] = PreviewStream(worker)
+                await preview.start()
+            preview.viewers += 1
+            return preview
+
+    async def close_preview(self, camera_id: int, preview: PreviewStream):
+        """Leave a live preview, tearing it down when the last viewer has gone"""
+        async with self.preview_lock:
+            preview.viewers -= 1
+            if preview.viewers > 0 or self.previews.get(camera_id) is not preview:
+                return
+            del self.previews[camera_id]
+            await preview.stop()
+            worker = self.active_streams.get(camera_id)
+            if worker is not None and worker.on_frame is None:
+                await self._stop_worker(camera_id)
+
+    def get_preview_stats(self) -> list:
+        """Get viewer and frame counters for every live preview"""
+        return [preview.get_stats() for preview in self.previews.values()]
+
+    def get_stream_stats(self) -> list:
+        """Get ingest counters for every active stream"""
+        return [worker.get_stats() for worker in self.active_streams.values()]
         
-    async def get_snapshot(self, channel: int) -> Optional[bytes]:
-        """Get a snapshot from a specific camera"""
-        if not self.dvr:
-            return None
-            
-        camera = await self.dvr.get_camera(channel)
-        if not camera:
+    async def get_snapshot(self, camera_id: int, width: Optional[int] = None) -> Optional[Snapshot]:
+        """Get a cached snapshot of a camera as (JPEG bytes, ETag), optionally downscaled"""
+        return await self.snapshots.get(camera_id, width)
+
+    async def _fetch_snapshot(self, camera_id: int) -> Optional[bytes]:
+        resolved = self.resolve(camera_id)
+        if resolved is None:
             return None
-            
-        return await camera.get_snapshot()
+
+        dvr, camera = resolved
+        async with dvr.limit:
+            return await asyncio.wait_for(camera.get_snapshot(), STATUS_REQUEST_TIMEOUT)
         
     async def close(self):
         """Close all connections"""
-        if self.dvr:
-            await self.dvr.close()
\ No newline at end of file
+        for preview in list(self.previews.values()):
+            await preview.stop()
+        self.previews.clear()
+        for camera_id in list(self.active_streams):
+            await self.stop_stream(camera_id)
+        await self.poller.stop()
+        for dvr in self.dvrs.values():
+            await dvr.close()
+        self.dvrs.clear()
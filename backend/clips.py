@@ -0,0 +1,311 @@
+# clips.py
+import asyncio
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from ingest import IngestWorker
+from preview import encode_preview
+from config import (
+    CLIP_DIR,
+    CLIP_PRE_SECONDS,
+    CLIP_POST_SECONDS,
+    CLIP_FPS,
+    CLIP_WIDTH,
+    CLIP_QUALITY,
+    CLIP_CAMERA_MAX_MB,
+    CLIP_MEMORY_MAX_MB,
+    CLIP_MAX_PENDING
+)
+
+# (capture time, JPEG bytes)
+ClipFrame = Tuple[float, bytes]
+# Gets the clip path once the clip is on disk
+ClipHandler = Callable[[str], Awaitable[None]]
+
+def write_clip(path: str, frames: List[ClipFrame], fps: float):
+    """Write JPEG frames to an MJPEG AVI, replacing path only once the file is complete"""
+    import cv2
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = os.path.splitext(path)[0] + ".part.avi"
+    writer, size = None, None
+    try:
+        for _, data in frames:
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            if writer is None:
+                size = (image.shape[1], image.shape[0])
+                writer = cv2.VideoWriter(partial, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+                if not writer.isOpened():
+                    raise RuntimeError(f"Could not open {partial} for writing")
+            elif (image.shape[1], image.shape[0]) != size:
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            writer.write(image)
+        if writer is None:
+            raise ValueError("No frames to write")
+    finally:
+        if writer is not None:
+            writer.release()
+    os.replace(partial, path)
+
+class JpegRingBuffer:
+    """Recent JPEG frames of one camera, bounded by age and by total bytes"""
+
+    def __init__(self, max_seconds: float):
+        self.max_seconds = max_seconds
+        self.frames: Deque[ClipFrame] = deque()
+        self.nbytes = 0
+
+    def add(self, timestamp: float, data: bytes, max_bytes: float) -> int:
+        """Append a frame and evict what no longer fits, returning the change in bytes"""
+        before = self.nbytes
+        self.frames.append((timestamp, data))
+        self.nbytes += len(data)
+        while self.frames and (self.nbytes > max_bytes or timestamp - self.frames[0][0] > self.max_seconds):
+            self.nbytes -= len(self.frames.popleft()[1])
+        return self.nbytes - before
+
+    def pop_oldest(self) -> int:
+        """Evict the oldest frame, returning the bytes freed"""
+        freed = len(self.frames.popleft()[1])
+        self.nbytes -= freed
+        return freed
+
+    @property
+    def last(self) -> Optional[float]:
+        return self.frames[-1][0] if self.frames else None
+
+    def since(self, timestamp: float) -> List[ClipFrame]:
+        return [frame for frame in self.frames if frame[0] >= timestamp]
+
+class Clip:
+    """A clip collecting post-roll frames until it is handed to the writer"""
+
+    def __init__(self, camera: str, path: str, frames: List[ClipFrame]):
+        self.camera = camera
+        self.path = path
+        self.frames = frames
+        self.alerts = 1
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class ClipRecorder:
+    """Keep a short JPEG pre-roll per camera and save clips around alerts.
+
+    Frames come from ingest workers, sampled at fps and encoded off the
+    event loop, or from JPEGs uploaded for analysis, stored as they are.
+    Each camera keeps at most pre_seconds and camera_max_bytes of frames.
+    All cameras together never hold more than memory_max_bytes: when a new
+    frame goes over, the oldest frames of the largest pre-rolls are evicted
+    first, so adding cameras shortens pre-roll instead of growing memory.
+    Pre-rolls that have not had a frame for pre_seconds are dropped, so
+    upload camera ids that stop sending do not hold memory.
+
+    An alert starts a clip with the pre-roll, which keeps collecting frames
+    for post_seconds and is then written to disk by a background task.
+    Alerts on a camera while its clip is still recording share that clip.
+    Only once the file is complete is clip_handler told, so alerts are
+    never linked to a clip that failed to write.
+    """
+
+    def __init__(self, directory: str = CLIP_DIR,
+                 pre_seconds: float = CLIP_PRE_SECONDS,
+                 post_seconds: float = CLIP_POST_SECONDS,
+                 fps: float = CLIP_FPS,
+                 width: int = CLIP_WIDTH,
+                 quality: int = CLIP_QUALITY,
+                 camera_max_bytes: float = CLIP_CAMERA_MAX_MB * 1024 * 1024,
+                 memory_max_bytes: float = CLIP_MEMORY_MAX_MB * 1024 * 1024,
+                 max_pending: int = CLIP_MAX_PENDING):
+        self.directory = directory
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self.width = width
+        self.quality = quality
+        self.camera_max_bytes = camera_max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.max_pending = max_pending
+
+        self.buffers: Dict[str, JpegRingBuffer] = {}
+        self.total_bytes = 0
+        self.last_expiry = 0.0
+        self.samplers: Dict[str, asyncio.Task] = {}
+        self.recording: Dict[str, Clip] = {}
+        # Paths of clips that are recording or waiting to be written
+        self.pending: Set[str] = set()
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.clip_handler: Optional[ClipHandler] = None
+
+        self.frames_skipped = 0
+        self.clips_written = 0
+        self.clips_failed = 0
+        self.triggers_dropped = 0
+
+    async def start(self):
+        """Start the background clip writer"""
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self._writer())
+
+    async def stop(self):
+        """Stop sampling, and write out clips that are still recording or queued"""
+        for camera in list(self.samplers):
+            await self.unwatch(camera)
+        for camera in list(self.recording):
+            self.recording[camera].timer.cancel()
+            self._finish(camera)
+        if self.task:
+            await self.queue.join()
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def watch(self, camera: str, worker: IngestWorker):
+        """Sample an ingest worker's frames into the camera's pre-roll"""
+        if camera not in self.samplers:
+            self.samplers[camera] = asyncio.create_task(self._sample(camera, worker))
+
+    async def unwatch(self, camera: str):
+        """Stop sampling a camera and free its pre-roll"""
+        task = self.samplers.pop(camera, None)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._drop(camera)
+
+    def _drop(self, camera: str):
+        buffer = self.buffers.pop(camera, None)
+        if buffer is not None:
+            self.total_bytes -= buffer.nbytes
+
+    async def _sample(self, camera: str, worker: IngestWorker):
+        loop = asyncio.get_running_loop()
+        source_seq = None
+        while True:
+            started = loop.time()
+            frame, seq = worker.latest_frame, worker.frames_read
+            if frame is not None and seq != source_seq:
+                try:
+                    data = await asyncio.to_thread(encode_preview, frame, self.quality, self.width)
+                except Exception as e:
+                    print(f"Clip frame encode failed for camera {camera}: {e}")
+                else:
+                    source_seq = seq
+                    self.add_frame(camera, data)
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    def add_frame(self, camera: str, data: bytes, timestamp: Optional[float] = None):
+        """Add an encoded JPEG frame to a camera's pre-roll and to its recording clip"""
+        timestamp = timestamp or time.time()
+        buffer = self.buffers.get(camera)
+        if buffer is None:
+            buffer = self.buffers[camera] = JpegRingBuffer(self.pre_seconds)
+        elif buffer.last is not None and timestamp - buffer.last < self.interval * 0.9:
+            # Uploads can arrive faster than clips are recorded
+            self.frames_skipped += 1
+            return
+
+        self.total_bytes += buffer.add(timestamp, data, min(self.camera_max_bytes, self.memory_max_bytes))
+        clip = self.recording.get(camera)
+        if clip is not None:
+            clip.frames.append((timestamp, data))
+
+        if timestamp - self.last_expiry >= self.pre_seconds:
+            self._expire(timestamp)
+        while self.total_bytes > self.memory_max_bytes:
+            largest = max(self.buffers.values(), key=lambda buffer: buffer.nbytes)
+            self.total_bytes -= largest.pop_oldest()
+
+    def _expire(self, now: float):
+        # A pre-roll with no frame for pre_seconds has nothing left to contribute to a clip
+        self.last_expiry = now
+        for camera, buffer in list(self.buffers.items()):
+            if buffer.last is None or now - buffer.last > self.pre_seconds:
+                self._drop(camera)
+
+    def trigger(self, camera: str) -> Optional[str]:
+        """Start a clip for an alert and return its path relative to the clip directory.
+
+        Returns None when the camera has no buffered frames, or when too
+        many clips are already recording or waiting to be written.
+        """
+        clip = self.recording.get(camera)
+        if clip is not None:
+            clip.alerts += 1
+            return clip.path
+        buffer = self.buffers.get(camera)
+        frames = buffer.since(time.time() - self.pre_seconds) if buffer else []
+        if self.queue is None or not frames or len(self.pending) >= self.max_pending:
+            self.triggers_dropped += 1
+            return None
+
+        name = re.sub(r"[^A-Za-z0-9_-]", "_", camera) or "camera"
+        path = os.path.join(name, datetime.now().strftime("%Y%m%d-%H%M%S-%f") + ".avi")
+        clip = self.recording[camera] = Clip(camera, path, frames)
+        self.pending.add(path)
+        clip.timer = asyncio.get_running_loop().call_later(self.post_seconds, self._finish, camera)
+        return path
+
+    def _finish(self, camera: str):
+        clip = self.recording.pop(camera, None)
+        if clip is not None:
+            self.queue.put_nowait(clip)
+
+    async def _writer(self):
+        while True:
+            clip = await self.queue.get()
+            try:
+                await asyncio.to_thread(write_clip, self.full_path(clip.path), clip.frames, self.fps)
+            except Exception as e:
+                self.clips_failed += 1
+                print(f"Failed to write clip {clip.path}: {e}")
+            else:
+                self.clips_written += 1
+                if self.clip_handler:
+                    try:
+                        await self.clip_handler(clip.path)
+                    except Exception as e:
+                        print(f"Failed to link clip {clip.path}: {e}")
+            finally:
+                self.pending.discard(clip.path)
+                self.queue.task_done()
+
+    def full_path(self, path: str) -> str:
+        """Location on disk of a clip path stored with an alert"""
+        return os.path.join(self.directory, path)
+
+    @property
+    def nbytes(self) -> int:
+        return self.total_bytes
+
+    def get_stats(self) -> dict:
+        """Get buffer memory and clip counters"""
+        return {
+            "cameras": len(self.buffers),
+            "buffered_bytes": self.nbytes,
+            "memory_max_bytes": self.memory_max_bytes,
+            "pre_roll_seconds": {
+                camera: round(buffer.frames[-1][0] - buffer.frames[0][0], 2) if buffer.frames else 0.0
+                for camera, buffer in self.buffers.items()
+            },
+            "recording": len(self.recording),
+            "pending_writes": self.queue.qsize() if self.queue else 0,
+            "clips_written": self.clips_written,
+            "clips_failed": self.clips_failed,
+            "triggers_dropped": self.triggers_dropped,
+            "frames_skipped": self.frames_skipped
+        }
@@ -10,4 +10,151 @@ MODEL_VERSION = os.getenv('ROBOFLOW_VERSION', '1')
 
 CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', '0.5'))
 OVERLAP_THRESHOLD = float(os.getenv('OVERLAP_THRESHOLD', '0.5'))
+
+# Detection backend: 'roboflow' (hosted), 'onnx' (ONNX Runtime), 'opencv' (OpenCV DNN) or 'stub'
+DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'roboflow')
+LOCAL_MODEL_PATH = os.getenv('LOCAL_MODEL_PATH')
+LOCAL_MODEL_LABELS = os.getenv('LOCAL_MODEL_LABELS')
+LOCAL_MODEL_INPUT_SIZE = int(os.getenv('LOCAL_MODEL_INPUT_SIZE', '640'))
+# The 'stub' backend fakes a detector for benchmarks: a fixed cost and box count per frame
+STUB_DETECTOR_COST_MS = float(os.getenv('STUB_DETECTOR_COST_MS', '20'))
+STUB_DETECTOR_BOXES = int(os.getenv('STUB_DETECTOR_BOXES', '3'))
 DB_AUTH_TOKEN=os.getenv('DB_AUTH_TOKEN')
+
+# Object tracking
+TRACKER_IOU_THRESHOLD = float(os.getenv('TRACKER_IOU_THRESHOLD', '0.3'))
+TRACKER_MAX_MISSED = int(os.getenv('TRACKER_MAX_MISSED', '5'))
+TRACKER_CONFIDENCE_DECAY = float(os.getenv('TRACKER_CONFIDENCE_DECAY', '0.95'))
+
+# Adaptive detection cadence: detect on keyframes, track in between
+ADAPTIVE_DETECTION = os.getenv('ADAPTIVE_DETECTION', 'false').lower() == 'true'
+DETECT_INTERVAL_MIN = int(os.getenv('DETECT_INTERVAL_MIN', '1'))
+DETECT_INTERVAL_MAX = int(os.getenv('DETECT_INTERVAL_MAX', '10'))
+DETECT_CONFIDENCE_FLOOR = float(os.getenv('DETECT_CONFIDENCE_FLOOR', '0.3'))
+
+# Movement analysis rules
+MOVEMENT_HISTORY = int(os.getenv('MOVEMENT_HISTORY', '32'))
+MOVEMENT_SPEED_THRESHOLD = float(os.getenv('MOVEMENT_SPEED_THRESHOLD', '750'))
+LOITER_SECONDS = float(os.getenv('LOITER_SECONDS', '30'))
+LOITER_RADIUS = float(os.getenv('LOITER_RADIUS', '40'))
+# JSON object mapping zone names to polygons, e.g. {"counter": [[0, 0], [200, 0], [200, 150], [0, 150]]}
+MOVEMENT_ZONES = os.getenv('MOVEMENT_ZONES')
+
+# Motion gating: skip detection on static frames
+MOTION_GATING = os.getenv('MOTION_GATING', 'false').lower() == 'true'
+MOTION_METHOD = os.getenv('MOTION_METHOD', 'diff')
+MOTION_THRESHOLD = float(os.getenv('MOTION_THRESHOLD', '0.005'))
+MOTION_PIXEL_THRESHOLD = int(os.getenv('MOTION_PIXEL_THRESHOLD', '25'))
+MOTION_DOWNSCALE_WIDTH = int(os.getenv('MOTION_DOWNSCALE_WIDTH', '160'))
+MOTION_CROP_HINTS = os.getenv('MOTION_CROP_HINTS', 'false').lower() == 'true'
+# Per-stream overrides, e.g. "camera-1=0.01,upload-door=0.02"
+MOTION_CAMERA_THRESHOLDS = {
+    stream.strip(): float(value)
+    for stream, value in (
+        item.split('=') for item in os.getenv('MOTION_CAMERA_THRESHOLDS', '').split(',') if '=' in item
+    )
+}
+
+# Per-camera regions of interest: pixels of padding around each ROI crop, and
+# the most crops per frame before they collapse into one box around all of them
+ROI_CROP_PADDING = int(os.getenv('ROI_CROP_PADDING', '32'))
+ROI_MAX_TILES = int(os.getenv('ROI_MAX_TILES', '4'))
+
+# Camera status polling
+STATUS_POLL_INTERVAL = float(os.getenv('STATUS_POLL_INTERVAL', '10'))
+STATUS_CACHE_TTL = float(os.getenv('STATUS_CACHE_TTL', '30'))
+STATUS_REQUEST_TIMEOUT = float(os.getenv('STATUS_REQUEST_TIMEOUT', '5'))
+
+# Shared DVR HTTP connection pool
+DVR_POOL_LIMIT = int(os.getenv('DVR_POOL_LIMIT', '32'))
+DVR_POOL_LIMIT_PER_HOST = int(os.getenv('DVR_POOL_LIMIT_PER_HOST', '8'))
+DVR_DNS_CACHE_TTL = int(os.getenv('DVR_DNS_CACHE_TTL', '300'))
+DVR_KEEPALIVE_TIMEOUT = float(os.getenv('DVR_KEEPALIVE_TIMEOUT', '30'))
+# Concurrent status and snapshot requests per DVR
+DVR_CONCURRENCY = int(os.getenv('DVR_CONCURRENCY', '8'))
+
+# Frame ingestion
+INGEST_BUFFER_SIZE = int(os.getenv('INGEST_BUFFER_SIZE', '4'))
+INGEST_RECONNECT_MIN = float(os.getenv('INGEST_RECONNECT_MIN', '1'))
+INGEST_RECONNECT_MAX = float(os.getenv('INGEST_RECONNECT_MAX', '30'))
+
+# Micro-batching inference
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '8'))
+BATCH_MAX_WAIT_MS = float(os.getenv('BATCH_MAX_WAIT_MS', '10'))
+
+# Inference worker processes
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', '2'))
+INFERENCE_MAX_PENDING = int(os.getenv('INFERENCE_MAX_PENDING', '64'))
+# Per-stream state (detectors in the workers, stats and metric series in the server) is
+# dropped for streams idle this long, and for the least recently used beyond the limit
+INFERENCE_MAX_STREAMS = int(os.getenv('INFERENCE_MAX_STREAMS', '256'))
+INFERENCE_STREAM_IDLE_SECONDS = float(os.getenv('INFERENCE_STREAM_IDLE_SECONDS', '600'))
+
+# Batched alert writer
+ALERT_BATCH_SIZE = int(os.getenv('ALERT_BATCH_SIZE', '100'))
+ALERT_FLUSH_INTERVAL = float(os.getenv('ALERT_FLUSH_INTERVAL', '0.5'))
+ALERT_QUEUE_MAX = int(os.getenv('ALERT_QUEUE_MAX', '10000'))
+
+# Alert retention and rollups
+# Raw alerts are kept forever unless a retention age is set
+ALERT_RETENTION_DAYS = float(os.getenv('ALERT_RETENTION_DAYS', '0'))
+ALERT_RETENTION_INTERVAL = float(os.getenv('ALERT_RETENTION_INTERVAL', '3600'))
+ALERT_RETENTION_CHUNK = int(os.getenv('ALERT_RETENTION_CHUNK', '500'))
+ALERT_ARCHIVE_PATH = os.getenv('ALERT_ARCHIVE_PATH')
+ROLLUP_MINUTE_RETENTION_DAYS = float(os.getenv('ROLLUP_MINUTE_RETENTION_DAYS', '7'))
+
+# Socket.IO push
+SOCKETIO_LOGGER = os.getenv('SOCKETIO_LOGGER', 'false').lower() == 'true'
+ENGINEIO_LOGGER = os.getenv('ENGINEIO_LOGGER', 'false').lower() == 'true'
+REALTIME_TICK_MS = float(os.getenv('REALTIME_TICK_MS', '200'))
+REALTIME_MAX_BACKLOG = int(os.getenv('REALTIME_MAX_BACKLOG', '16'))
+# Cameras whose latest state is kept for new subscribers, least recently updated dropped first
+REALTIME_MAX_CAMERAS = int(os.getenv('REALTIME_MAX_CAMERAS', '1024'))
+ALERT_COOLDOWN = float(os.getenv('ALERT_COOLDOWN', '30'))
+
+# Snapshot cache
+SNAPSHOT_TTL = float(os.getenv('SNAPSHOT_TTL', '1'))
+SNAPSHOT_THUMBNAIL_WIDTHS = [int(width) for width in os.getenv('SNAPSHOT_THUMBNAIL_WIDTHS', '160,320,640').split(',') if width]
+SNAPSHOT_THUMBNAIL_QUALITY = int(os.getenv('SNAPSHOT_THUMBNAIL_QUALITY', '80'))
+
+# Live MJPEG preview
+PREVIEW_MAX_FPS = float(os.getenv('PREVIEW_MAX_FPS', '10'))
+PREVIEW_QUALITY = int(os.getenv('PREVIEW_QUALITY', '70'))
+PREVIEW_WIDTH = int(os.getenv('PREVIEW_WIDTH', '960'))
+
+# /analyze decoding
+# Long side, in pixels, that uploads are decoded and resized to; 0 decodes at full resolution.
+# Movement thresholds then apply to pixels at this size.
+ANALYZE_DECODE_SIZE = int(os.getenv('ANALYZE_DECODE_SIZE', '0'))
+ANALYZE_MAX_BATCH = int(os.getenv('ANALYZE_MAX_BATCH', '32'))
+# Capture rate assumed for /analyze/batch frames sent without timestamps or fps
+ANALYZE_BATCH_FPS = float(os.getenv('ANALYZE_BATCH_FPS', '10'))
+
+# Shared-memory frame bus between ingest and inference processes
+FRAME_BUS = os.getenv('FRAME_BUS', 'false').lower() == 'true'
+FRAME_BUS_SLOTS = int(os.getenv('FRAME_BUS_SLOTS', '8'))
+
+# Background model loading
+INFERENCE_WARMUP_SIZE = int(os.getenv('INFERENCE_WARMUP_SIZE', '640'))
+INFERENCE_LOAD_RETRY_MAX = float(os.getenv('INFERENCE_LOAD_RETRY_MAX', '60'))
+
+# Metrics and profiling
+# Upper bounds, in seconds, of the latency histogram buckets on /metrics
+METRICS_LATENCY_BUCKETS = [float(bound) for bound in os.getenv(
+    'METRICS_LATENCY_BUCKETS', '0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10'
+).split(',') if bound]
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '10'))
+PROFILER_MAX_SECONDS = float(os.getenv('PROFILER_MAX_SECONDS', '300'))
+
+# Event clips: pre-roll buffered per camera as JPEG, saved with post-roll on each alert
+CLIP_RECORDING = os.getenv('CLIP_RECORDING', 'false').lower() == 'true'
+CLIP_DIR = os.getenv('CLIP_DIR', 'clips')
+CLIP_PRE_SECONDS = float(os.getenv('CLIP_PRE_SECONDS', '10'))
+CLIP_POST_SECONDS = float(os.getenv('CLIP_POST_SECONDS', '10'))
+CLIP_FPS = float(os.getenv('CLIP_FPS', '5'))
+CLIP_WIDTH = int(os.getenv('CLIP_WIDTH', '960'))
+CLIP_QUALITY = int(os.getenv('CLIP_QUALITY', '70'))
+CLIP_CAMERA_MAX_MB = float(os.getenv('CLIP_CAMERA_MAX_MB', '16'))
+CLIP_MEMORY_MAX_MB = float(os.getenv('CLIP_MEMORY_MAX_MB', '256'))
+CLIP_MAX_PENDING = int(os.getenv('CLIP_MAX_PENDING', '8'))
@@ -140,86 +140,569 @@
 
 
 # database.py
+import asyncio
+import base64
+import json
+import time
 import aiosqlite
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional, Tuple
+from config import (
+    ALERT_BATCH_SIZE,
+    ALERT_FLUSH_INTERVAL,
+    ALERT_QUEUE_MAX,
+    ALERT_RETENTION_DAYS,
+    ALERT_RETENTION_INTERVAL,
+    ALERT_RETENTION_CHUNK,
+    ALERT_ARCHIVE_PATH,
+    ROLLUP_MINUTE_RETENTION_DAYS
+)
+from metrics import registry
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def parse_timestamp(value: str) -> str:
+    """Normalize an ISO 8601 time filter to the stored UTC TIMESTAMP_FORMAT text.
+
+    Times without an offset are taken as UTC, like the stored created_at.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00").replace("z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+# Rollup bucket key for each granularity, as a prefix of the created_at text
+ROLLUP_BUCKETS = {
+    "minute": lambda created_at: created_at[:16],
+    "hour": lambda created_at: created_at[:13] + ":00",
+    "day": lambda created_at: created_at[:10]
+}
+ROLLUP_SQL_BUCKETS = {
+    "minute": "substr(created_at, 1, 16)",
+    "hour": "substr(created_at, 1, 13) || ':00'",
+    "day": "substr(created_at, 1, 10)"
+}
+
+class ClipLink(NamedTuple):
+    """Queued with the alerts to link a written clip to the alerts that were raised with it"""
+    path: str
+
+# Alert columns served by the API, leaving out bookkeeping ones
+ALERT_COLUMNS = "id, type, camera, severity, created_at, clip_path"
+
+# Queued after the last alert to make the writer flush and exit
+_STOP_WRITER = None
+
+ALERT_FLUSH_SECONDS = registry.histogram("alert_flush_seconds", "Time to write one batch of alerts and rollups")
 
 class Database:
     def __init__(self, db_path: str = "security.db"):
         self.db_path = db_path
+        self.conn: Optional[aiosqlite.Connection] = None
+        self.write_lock = asyncio.Lock()
+
+        # Alerts are queued and written in batches by a background task
+        self.alert_queue: asyncio.Queue = asyncio.Queue(maxsize=ALERT_QUEUE_MAX)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.alerts_written = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+        # Raw alerts past the retention age are pruned in small chunks
+        self.retention_task: Optional[asyncio.Task] = None
+        self.alerts_pruned = 0
+        self.last_prune: Optional[str] = None
 
     async def initialize(self):
-        """Initialize the database with required tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS cameras (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    stream_url TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+        """Open the shared connection and create the required tables"""
+        self.conn = await aiosqlite.connect(self.db_path)
+        self.conn.row_factory = aiosqlite.Row
+
+        # WAL lets readers run alongside the alert writer; NORMAL sync is durable in WAL mode
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA busy_timeout=5000")
+        await self.conn.execute("PRAGMA temp_store=MEMORY")
+        await self.conn.execute("PRAGMA cache_size=-16000")
+
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS dvrs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ip TEXT NOT NULL UNIQUE,
+                username TEXT NOT NULL,
+                password TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS cameras (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stream_url TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Cameras are DVR channels; their id is the global camera id used by the API
+        await self._add_columns("cameras", {"dvr_id": "INTEGER REFERENCES dvrs (id)", "channel": "INTEGER"})
+        # Region of interest as JSON {"polygons": [...], "rectangles": [...]}, NULL for the whole frame
+        await self._add_columns("cameras", {"roi": "TEXT"})
+        await self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_cameras_dvr_channel ON cameras (dvr_id, channel)")
+        
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                camera TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Path of the event clip saved around the alert, relative to CLIP_DIR
+        await self._add_columns("alerts", {"clip_path": "TEXT"})
+        # Path of the clip the alert started or joined, until the clip is written and becomes clip_path
+        await self._add_columns("alerts", {"pending_clip_path": "TEXT"})
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_alerts_pending_clip_path ON alerts (pending_clip_path) "
+            "WHERE pending_clip_path IS NOT NULL"
+        )
+
+        # Every alert query orders by (created_at, id); the rowid rides along in each index
+        await self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_created_at ON alerts (created_at)")
+        await self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_camera_created_at ON alerts (camera, created_at)")
+        await self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_severity_created_at ON alerts (severity, created_at)")
+
+        # Alert counts per time bucket, kept current by the alert writer
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS alert_rollups (
+                granularity TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                camera TEXT NOT NULL,
+                type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (granularity, bucket, camera, type, severity)
+            ) WITHOUT ROWID
+        """)
+        await self._backfill_rollups()
+
+        if ALERT_ARCHIVE_PATH:
+            await self.conn.execute("ATTACH DATABASE ? AS archive", (ALERT_ARCHIVE_PATH,))
+            await self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive.alerts (
+                    id INTEGER PRIMARY KEY,
                     type TEXT NOT NULL,
                     camera TEXT NOT NULL,
                     severity TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP
                 )
             """)
-            
-            await db.commit()
+            await self._add_columns("alerts", {"clip_path": "TEXT"}, schema="archive")
+        
+        await self.conn.commit()
+        self.writer_task = asyncio.create_task(self._alert_writer())
+        if ALERT_RETENTION_DAYS > 0 or ROLLUP_MINUTE_RETENTION_DAYS > 0:
+            self.retention_task = asyncio.create_task(self._retention_loop())
+
+    async def _add_columns(self, table: str, columns: dict, schema: str = "main"):
+        # Older databases get columns added in place
+        async with self.conn.execute(f"PRAGMA {schema}.table_info({table})") as cursor:
+            existing = {row["name"] for row in await cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                await self.conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {name} {definition}")
+
+    async def _backfill_rollups(self):
+        # Databases created before rollups existed get them built once from the raw alerts
+        async with self.conn.execute("SELECT 1 FROM alert_rollups LIMIT 1") as cursor:
+            if await cursor.fetchone():
+                return
+        for granularity, bucket in ROLLUP_SQL_BUCKETS.items():
+            await self.conn.execute(f"""
+                INSERT INTO alert_rollups (granularity, bucket, camera, type, severity, count)
+                SELECT ?, {bucket}, camera, type, severity, COUNT(*)
+                FROM alerts GROUP BY 2, camera, type, severity
+            """, (granularity,))
+
+    async def close(self):
+        """Flush queued alerts and close the connection"""
+        if self.retention_task:
+            self.retention_task.cancel()
+            try:
+                await self.retention_task
+            except asyncio.CancelledError:
+                pass
+            self.retention_task = None
+
+        if self.writer_task:
+            # The writer flushes its current batch and everything queued before the stop marker
+            if not self.writer_task.done():
+                await self.alert_queue.put(_STOP_WRITER)
+            try:
+                await self.writer_task
+            except Exception as e:
+                print(f"Alert writer failed: {e}")
+            self.writer_task = None
+
+        # Write alerts queued after the stop marker, or left behind by a failed writer
+        pending = []
+        while not self.alert_queue.empty():
+            alert = self.alert_queue.get_nowait()
+            if alert is not _STOP_WRITER:
+                pending.append(alert)
+        if pending and self.conn:
+            await self._flush_alerts(pending)
+
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
 
     async def add_camera(self, name: str, status: str, stream_url: str = None):
         """Add a new camera to the database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+        async with self.write_lock:
+            await self.conn.execute(
                 "INSERT INTO cameras (name, status, stream_url) VALUES (?, ?, ?)",
                 (name, status, stream_url)
             )
-            await db.commit()
+            await self.conn.commit()
 
     async def delete_camera(self, camera_id: int):
         """Delete a camera from the database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("DELETE FROM cameras WHERE id = ?", (camera_id,))
-            await db.commit()
+        async with self.write_lock:
+            await self.conn.execute("DELETE FROM cameras WHERE id = ?", (camera_id,))
+            await self.conn.commit()
 
     async def update_camera_status(self, camera_id: int, status: str):
         """Update the status of a camera"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+        async with self.write_lock:
+            await self.conn.execute(
                 "UPDATE cameras SET status = ? WHERE id = ?",
                 (status, camera_id)
             )
-            await db.commit()
+            await self.conn.commit()
+
+    async def set_camera_roi(self, camera_id: int, roi: Optional[dict]):
+        """Store a camera's region of interest, or clear it with None"""
+        async with self.write_lock:
+            await self.conn.execute(
+                "UPDATE cameras SET roi = ? WHERE id = ?",
+                (json.dumps(roi) if roi else None, camera_id)
+            )
+            await self.conn.commit()
 
     async def get_cameras(self):
         """Get all cameras from the database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute("SELECT * FROM cameras ORDER BY created_at DESC") as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
-
-    async def add_alert(self, alert_type: str, camera: str, severity: str):
-        """Add a new alert to the database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT INTO alerts (type, camera, severity) VALUES (?, ?, ?)",
-                (alert_type, camera, severity)
+        async with self.conn.execute("SELECT * FROM cameras ORDER BY created_at DESC") as cursor:
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def save_dvr(self, ip: str, username: str, password: str) -> int:
+        """Add a DVR, or update the credentials of a known one, and return its id"""
+        async with self.write_lock:
+            await self.conn.execute(
+                """
+                INSERT INTO dvrs (ip, username, password) VALUES (?, ?, ?)
+                ON CONFLICT (ip) DO UPDATE SET username = excluded.username, password = excluded.password
+                """,
+                (ip, username, password)
+            )
+            await self.conn.commit()
+        async with self.conn.execute("SELECT id FROM dvrs WHERE ip = ?", (ip,)) as cursor:
+            return (await cursor.fetchone())["id"]
+
+    async def get_dvrs(self):
+        """Get all registered DVRs"""
+        async with self.conn.execute("SELECT * FROM dvrs ORDER BY id") as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def delete_dvr(self, dvr_id: int):
+        """Delete a DVR and its cameras"""
+        async with self.write_lock:
+            await self.conn.execute("DELETE FROM cameras WHERE dvr_id = ?", (dvr_id,))
+            await self.conn.execute("DELETE FROM dvrs WHERE id = ?", (dvr_id,))
+            await self.conn.commit()
+
+    async def save_dvr_cameras(self, dvr_id: int, cameras: dict) -> Dict[int, dict]:
+        """Register a DVR's channels as cameras, given {channel: (name, stream_url)}.
+
+        Known channels keep their camera id and name. Returns {channel: camera row}.
+        """
+        async with self.write_lock:
+            await self.conn.executemany(
+                """
+                INSERT INTO cameras (name, status, stream_url, dvr_id, channel) VALUES (?, 'unknown', ?, ?, ?)
+                ON CONFLICT (dvr_id, channel) DO UPDATE SET stream_url = excluded.stream_url
+                """,
+                [(name, stream_url, dvr_id, channel) for channel, (name, stream_url) in cameras.items()]
             )
-            await db.commit()
+            await self.conn.commit()
+        return {camera["channel"]: camera for camera in await self.get_dvr_cameras(dvr_id)}
+
+    async def get_dvr_cameras(self, dvr_id: int):
+        """Get the cameras of one DVR"""
+        async with self.conn.execute(
+            "SELECT * FROM cameras WHERE dvr_id = ? ORDER BY channel", (dvr_id,)
+        ) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def add_alert(self, alert_type: str, camera: str, severity: str, clip_path: Optional[str] = None):
+        """Queue a new alert for the batched writer, waiting only if the queue is full.
+
+        clip_path is the clip the alert is being recorded into; it is only
+        served with the alert once link_clip reports the clip written.
+        """
+        created_at = datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+        await self.alert_queue.put((alert_type, camera, severity, created_at, clip_path))
+
+    async def link_clip(self, path: str):
+        """Link a clip that has been written to exactly the alerts that were raised with it.
+
+        The link goes through the alert queue, so it lands after every alert
+        queued before it.
+        """
+        await self.alert_queue.put(ClipLink(path))
+
+    async def _alert_writer(self):
+        stopping = False
+        while not stopping:
+            alert = await self.alert_queue.get()
+            if alert is _STOP_WRITER:
+                return
+            batch = [alert]
+            deadline = time.monotonic() + ALERT_FLUSH_INTERVAL
+            while len(batch) < ALERT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    alert = await asyncio.wait_for(self.alert_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if alert is _STOP_WRITER:
+                    stopping = True
+                    break
+                batch.append(alert)
+            try:
+                await self._flush_alerts(batch)
+            except Exception as e:
+                print(f"Failed to write {len(batch)} alerts: {e}")
+
+    async def _flush_alerts(self, batch: list):
+        started = time.perf_counter()
+        links = [item for item in batch if isinstance(item, ClipLink)]
+        alerts = [item for item in batch if not isinstance(item, ClipLink)]
+        # Fold the batch into the rollups in the same transaction
+        counts = Counter(
+            (granularity, bucket(created_at), camera, alert_type, severity)
+            for alert_type, camera, severity, created_at, _ in alerts
+            for granularity, bucket in ROLLUP_BUCKETS.items()
+        )
+        async with self.write_lock:
+            try:
+                await self.conn.executemany(
+                    "INSERT INTO alerts (type, camera, severity, created_at, pending_clip_path) VALUES (?, ?, ?, ?, ?)",
+                    alerts
+                )
+                await self.conn.executemany(
+                    """
+                    INSERT INTO alert_rollups (granularity, bucket, camera, type, severity, count)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (granularity, bucket, camera, type, severity)
+                    DO UPDATE SET count = count + excluded.count
+                    """,
+                    [(*key, count) for key, count in counts.items()]
+                )
+                await self.conn.executemany(
+                    """
+                    UPDATE alerts SET clip_path = pending_clip_path, pending_clip_path = NULL
+                    WHERE pending_clip_path = ?
+                    """,
+                    [(link.path,) for link in links]
+                )
+                await self.conn.commit()
+            except BaseException:
+                # Never leave alerts committed without their rollup rows
+                await self.conn.rollback()
+                raise
+
+        elapsed = (time.perf_counter() - started) * 1000.0
+        ALERT_FLUSH_SECONDS.observe(elapsed / 1000.0)
+        self.alerts_written += len(alerts)
+        self.flushes += 1
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self.total_flush_ms += elapsed
+
+    def get_stats(self) -> dict:
+        """Get alert queue depth and flush latency metrics"""
+        return {
+            "queue_depth": self.alert_queue.qsize(),
+            "alerts_written": self.alerts_written,
+            "flushes": self.flushes,
+            "avg_batch_size": self.alerts_written / self.flushes if self.flushes else 0.0,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self.total_flush_ms / self.flushes if self.flushes else 0.0,
+            "max_flush_ms": self.max_flush_ms,
+            "retention_days": ALERT_RETENTION_DAYS,
+            "alerts_pruned": self.alerts_pruned,
+            "last_prune": self.last_prune
+        }
+
+    async def get_alert_stats(self, granularity: str = "hour", since: str = None, until: str = None,
+                              camera: str = None, severity: str = None, alert_type: str = None):
+        """Get alert counts per time bucket, camera, type and severity from the rollups"""
+        if granularity not in ROLLUP_BUCKETS:
+            raise ValueError(f"Unknown granularity: {granularity}")
+
+        conditions, params = ["granularity = ?"], [granularity]
+        if since is not None:
+            conditions.append("bucket >= ?")
+            params.append(ROLLUP_BUCKETS[granularity](parse_timestamp(since)))
+        if until is not None:
+            conditions.append("bucket < ?")
+            params.append(ROLLUP_BUCKETS[granularity](parse_timestamp(until)))
+        if camera is not None:
+            conditions.append("camera = ?")
+            params.append(camera)
+        if severity is not None:
+            conditions.append("severity = ?")
+            params.append(severity)
+        if alert_type is not None:
+            conditions.append("type = ?")
+            params.append(alert_type)
+
+        async with self.conn.execute(
+            f"""
+            SELECT bucket, camera, type, severity, count FROM alert_rollups
+            WHERE {' AND '.join(conditions)}
+            ORDER BY bucket
+            """,
+            params
+        ) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def _retention_loop(self):
+        while True:
+            try:
+                await self.prune_alerts()
+            except Exception as e:
+                print(f"Error pruning alerts: {str(e)}")
+            await asyncio.sleep(ALERT_RETENTION_INTERVAL)
+
+    async def prune_alerts(self, max_age_days: float = ALERT_RETENTION_DAYS,
+                           chunk_size: int = ALERT_RETENTION_CHUNK) -> int:
+        """Delete (or archive) raw alerts older than max_age_days, if it is above 0.
+
+        Rows go in chunks of chunk_size, each its own short transaction, and
+        the write lock is released between chunks so the alert writer never
+        waits behind a long delete. Rollups are left intact, except minute
+        buckets past ROLLUP_MINUTE_RETENTION_DAYS.
+        """
+        now = datetime.utcnow()
+        cutoff = (now - timedelta(days=max_age_days)).strftime(TIMESTAMP_FORMAT)
+        pruned = 0
+        while max_age_days > 0:
+            async with self.write_lock:
+                async with self.conn.execute(
+                    "SELECT id FROM alerts WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                    (cutoff, chunk_size)
+                ) as cursor:
+                    ids = [row[0] for row in await cursor.fetchall()]
+                if not ids:
+                    break
+
+                placeholders = ",".join("?" * len(ids))
+                if ALERT_ARCHIVE_PATH:
+                    await self.conn.execute(
+                        f"INSERT OR IGNORE INTO archive.alerts (id, type, camera, severity, created_at, clip_path) "
+                        f"SELECT id, type, camera, severity, created_at, clip_path "
+                        f"FROM alerts WHERE id IN ({placeholders})",
+                        ids
+                    )
+                await self.conn.execute(f"DELETE FROM alerts WHERE id IN ({placeholders})", ids)
+                await self.conn.commit()
+            pruned += len(ids)
+            # Yield so queued writes get the lock before the next chunk
+            await asyncio.sleep(0)
+
+        if ROLLUP_MINUTE_RETENTION_DAYS > 0:
+            minute_cutoff = (now - timedelta(days=ROLLUP_MINUTE_RETENTION_DAYS)).strftime(TIMESTAMP_FORMAT)
+            async with self.write_lock:
+                await self.conn.execute(
+                    "DELETE FROM alert_rollups WHERE granularity = 'minute' AND bucket < ?",
+                    (ROLLUP_BUCKETS["minute"](minute_cutoff),)
+                )
+                await self.conn.commit()
+
+        self.alerts_pruned += pruned
+        self.last_prune = now.strftime(TIMESTAMP_FORMAT)
+        return pruned
 
     async def get_recent_alerts(self, limit: int = 100):
         """Get recent alerts from the database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                "SELECT * FROM alerts ORDER BY created_at DESC LIMIT ?",
-                (limit,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+        alerts, _ = await self.query_alerts(limit=limit)
+        return alerts
+
+    @staticmethod
+    def encode_cursor(created_at: str, alert_id: int) -> str:
+        """Encode the position after an alert as an opaque pagination cursor"""
+        return base64.urlsafe_b64encode(f"{created_at}|{alert_id}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """Decode a pagination cursor into the (created_at, id) it points after"""
+        created_at, alert_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return created_at, int(alert_id)
+
+    async def query_alerts(self, camera: str = None, severity: str = None, alert_type: str = None,
+                           since: str = None, until: str = None, cursor: str = None,
+                           limit: int = 100):
+        """Get alerts newest first with optional filters, using keyset pagination.
+
+        Returns the page and a cursor for the next page, or None on the last
+        page. Each page seeks straight to the cursor position through the
+        (created_at) indexes, so deep pages cost the same as the first.
+        """
+        conditions, params = [], []
+        if camera is not None:
+            conditions.append("camera = ?")
+            params.append(camera)
+        if severity is not None:
+            conditions.append("severity = ?")
+            params.append(severity)
+        if alert_type is not None:
+            conditions.append("type = ?")
+            params.append(alert_type)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(parse_timestamp(since))
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(parse_timestamp(until))
+        if cursor is not None:
+            try:
+                position = self.decode_cursor(cursor)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(position)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        async with self.conn.execute(
+            f"SELECT {ALERT_COLUMNS} FROM alerts {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit + 1)
+        ) as db_cursor:
+            rows = [dict(row) for row in await db_cursor.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
\ No newline at end of file
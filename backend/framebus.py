@@ -0,0 +1,155 @@
+# framebus.py
+import threading
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from config import FRAME_BUS_SLOTS
+
+# Every slot starts with a small header; seq is 0 while the slot is being written
+SLOT_HEADER = np.dtype([('seq', '<u8'), ('height', '<u4'), ('width', '<u4'), ('channels', '<u4')])
+HEADER_BYTES = 64
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    # The creating process owns the segment. Readers must not register it with
+    # the resource tracker, or it would be unlinked (or double-unregistered)
+    # when they exit.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+class FrameRef(NamedTuple):
+    """Pointer to one frame in a shared ring, cheap to send to another process"""
+    name: str
+    slots: int
+    slot_bytes: int
+    slot: int
+    seq: int
+    shape: Tuple[int, ...]
+
+class SharedFrameRing:
+    """Fixed-size ring of decoded frames in shared memory.
+
+    A single writer copies each frame into the next slot and hands out a
+    FrameRef. Readers in other processes attach by name and get a read-only
+    view of the slot without copying. A reader can check afterwards whether
+    the writer has lapped the ring and overwritten its frame.
+
+    The writer pins each slot it fills until the frame is released, so a
+    frame that is buffered or being analyzed is never overwritten; when
+    every slot is pinned, write raises BufferError and the frame is dropped.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, slot_bytes: int, owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+        self.stride = HEADER_BYTES + slot_bytes
+        self.headers = [
+            np.ndarray(1, dtype=SLOT_HEADER, buffer=shm.buf, offset=slot * self.stride)
+            for slot in range(slots)
+        ]
+        self.seq = 0
+        self.pinned = set()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, slot_bytes: int, slots: int = FRAME_BUS_SLOTS) -> "SharedFrameRing":
+        """Allocate a new ring for frames of up to slot_bytes bytes"""
+        shm = shared_memory.SharedMemory(create=True, size=slots * (HEADER_BYTES + slot_bytes))
+        return cls(shm, slots, slot_bytes, owner=True)
+
+    @classmethod
+    def attach(cls, ref: FrameRef) -> "SharedFrameRing":
+        """Open the ring a FrameRef points into"""
+        return cls(_open_untracked(ref.name), ref.slots, ref.slot_bytes, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, frame: np.ndarray) -> FrameRef:
+        """Copy a frame into the next free slot and return a reference to it, pinning the slot"""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit {self.slot_bytes} byte slots")
+        with self.lock:
+            slot = next(
+                (slot for slot in ((self.seq + 1 + i) % self.slots for i in range(self.slots))
+                 if slot not in self.pinned),
+                None
+            )
+            if slot is None:
+                raise BufferError(f"All {self.slots} frame slots are in use")
+            self.pinned.add(slot)
+        self.seq += 1
+        header = self.headers[slot]
+        header['seq'] = 0
+        offset = slot * self.stride + HEADER_BYTES
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset)[...] = frame
+        height, width = frame.shape[:2]
+        header['height'], header['width'] = height, width
+        header['channels'] = frame.shape[2] if frame.ndim == 3 else 1
+        header['seq'] = self.seq
+        return FrameRef(self.name, self.slots, self.slot_bytes, slot, self.seq, frame.shape)
+
+    def release(self, ref: FrameRef):
+        """Let the writer reuse a frame's slot once nobody needs the frame any more"""
+        if self.headers and ref.name == self.name:
+            with self.lock:
+                if int(self.headers[ref.slot]['seq'][0]) == ref.seq:
+                    self.pinned.discard(ref.slot)
+
+    def read(self, ref: FrameRef) -> Optional[np.ndarray]:
+        """Get a read-only view of a frame, or None if it has been overwritten"""
+        if not self.valid(ref):
+            return None
+        offset = ref.slot * self.stride + HEADER_BYTES
+        frame = np.ndarray(ref.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+        frame.flags.writeable = False
+        return frame
+
+    def valid(self, ref: FrameRef) -> bool:
+        """Check that a frame is still in its slot"""
+        return int(self.headers[ref.slot]['seq'][0]) == ref.seq
+
+    def close(self):
+        """Detach from the ring, and free it if this process created it"""
+        self.headers = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class FrameBusReader:
+    """Per-process cache of attached rings, so each ring is opened once"""
+
+    def __init__(self, max_rings: int = 64):
+        self.max_rings = max_rings
+        self.rings: "OrderedDict[str, SharedFrameRing]" = OrderedDict()
+
+    def ring(self, ref: FrameRef) -> SharedFrameRing:
+        ring = self.rings.get(ref.name)
+        if ring is None:
+            ring = self.rings[ref.name] = SharedFrameRing.attach(ref)
+            if len(self.rings) > self.max_rings:
+                # Rings of stopped or resized streams age out
+                self.rings.popitem(last=False)[1].close()
+        else:
+            self.rings.move_to_end(ref.name)
+        return ring
+
+    def read(self, ref: FrameRef) -> Optional[np.ndarray]:
+        """Get a read-only view of a referenced frame, or None if it has been overwritten"""
+        return self.ring(ref).read(ref)
+
+    def valid(self, ref: FrameRef) -> bool:
+        """Check that a referenced frame has not been overwritten"""
+        return self.ring(ref).valid(ref)
@@ -1,24 +1,32 @@
 #inference.py
-from roboflow import Roboflow
 import cv2
 import numpy as np
-from config import (
-    ROBOFLOW_API_KEY,
-    MODEL_WORKSPACE,
-    MODEL_NAME,
-    MODEL_VERSION,
-    CONFIDENCE_THRESHOLD,
-    OVERLAP_THRESHOLD
-)
+from backends import DetectionBackend, create_backend
+from tracker import IoUTracker
+from cadence import DetectionCadence
+from motion import MotionGate, merge_regions
+from movement import MovementAnalyzer
+from roi import RegionOfInterest, RoiShapes
+from schema import DETECTION_DTYPE, predictions_to_array, corner_boxes
+from metrics import StageTimer
+from config import MOTION_THRESHOLD, MOTION_CROP_HINTS
 
 class TheftDetector:
-    def __init__(self):
-        rf = Roboflow(api_key=ROBOFLOW_API_KEY)
-        self.model = rf.workspace(MODEL_WORKSPACE).project(MODEL_NAME).version(MODEL_VERSION).model
+    def __init__(self, backend: DetectionBackend = None, motion_threshold: float = None):
+        self.backend = backend or create_backend()
         
-        # Initialize object tracking - using KCF tracker instead of CSRT
-        self.tracked_objects = {}
-        self.last_frame = None
+        # Skip static frames before they reach the model
+        self.motion = MotionGate(threshold=motion_threshold if motion_threshold is not None else MOTION_THRESHOLD)
+        
+        # Initialize object tracking
+        self.tracker = IoUTracker()
+        self.cadence = DetectionCadence()
+        self.movement = MovementAnalyzer()
+        self.tracked_objects = self.tracker.to_array()
+        # Areas of the view detection is limited to, or None for the whole frame
+        self.roi = None
+        # Time spent per pipeline stage, collected by the caller after each frame
+        self.stages = StageTimer()
         
     def preprocess_frame(self, frame):
         """Preprocess frame before inference"""
@@ -33,109 +41,159 @@ class TheftDetector:
             
         return frame
         
-    def detect_objects(self, frame):
-        """Perform object detection on a frame"""
-        frame = self.preprocess_frame(frame)
-        if frame is None:
-            return []
-            
-        # Get predictions from Roboflow model
-        predictions = self.model.predict(frame, confidence=CONFIDENCE_THRESHOLD, overlap=OVERLAP_THRESHOLD)
-        
-        # Convert predictions to a standardized format
-        detections = []
-        for pred in predictions:
-            detection = {
-                'class': pred['class'],
-                'confidence': pred['confidence'],
-                'bbox': {
-                    'x': pred['x'],
-                    'y': pred['y'],
-                    'width': pred['width'],
-                    'height': pred['height']
-                }
-            }
-            detections.append(detection)
-            
-        return detections
+    def detect_objects(self, frame, region=None):
+        """Perform object detection on a frame, optionally restricted to a crop region"""
+        return self.detect_objects_batch([frame], [region])[0]
+
+    def detect_objects_batch(self, frames, regions=None):
+        """Perform object detection on a batch of frames.
+
+        regions optionally gives an (x1, y1, x2, y2) crop per frame, or a
+        list of crops that are each run through the model (an empty list
+        skips the frame); boxes found inside a crop are mapped back to
+        full-frame coordinates.
+        """
+        regions = regions or [None] * len(frames)
+        with self.stages.stage('preprocess'):
+            frames = [self.preprocess_frame(frame) for frame in frames]
+        results = [np.empty(0, dtype=DETECTION_DTYPE) for _ in frames]
+        valid = [i for i, frame in enumerate(frames) if frame is not None]
+        if not valid:
+            return results
+
+        inputs, owners = [], []
+        for i in valid:
+            crops = [regions[i]] if regions[i] is None or isinstance(regions[i], tuple) else regions[i]
+            for crop in crops:
+                if crop is not None:
+                    x1, y1, x2, y2 = crop
+                    inputs.append(frames[i][y1:y2, x1:x2])
+                else:
+                    inputs.append(frames[i])
+                owners.append((i, crop[:2] if crop is not None else (0, 0)))
+        if not inputs:
+            return results
+
+        # Get predictions from the configured backend
+        with self.stages.stage('predict'):
+            predictions = self.backend.predict_batch(inputs)
+        found = {}
+        for (i, offset), crop_predictions in zip(owners, predictions):
+            found.setdefault(i, []).append(self.format_predictions(crop_predictions, offset))
+        for i, arrays in found.items():
+            results[i] = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+        return results
+
+    def format_predictions(self, predictions, offset=(0, 0)):
+        """Convert predictions to DETECTION_DTYPE rows in frame coordinates"""
+        return predictions_to_array(predictions, self.backend.classes, offset)
         
     def track_objects(self, frame, detections):
-        """Track detected objects across frames using KCF tracker"""
-        current_objects = {}
-        
-        # Initialize tracking for new objects
-        for detection in detections:
-            bbox = detection['bbox']
-            x, y, w, h = bbox['x'], bbox['y'], bbox['width'], bbox['height']
-            
-            # Create tracker for each object
-            tracker = cv2.legacy.TrackerKCF_create()
-            tracker.init(frame, (int(x), int(y), int(w), int(h)))
-            
-            object_id = len(self.tracked_objects)
-            current_objects[object_id] = {
-                'tracker': tracker,
-                'class': detection['class'],
-                'bbox': bbox,
-                'confidence': detection['confidence']
-            }
-            
-        # Update existing trackers
-        for obj_id, obj_info in self.tracked_objects.items():
-            success, bbox = obj_info['tracker'].update(frame)
-            if success:
-                current_objects[obj_id] = obj_info
-                current_objects[obj_id]['bbox'] = {
-                    'x': float(bbox[0]),
-                    'y': float(bbox[1]),
-                    'width': float(bbox[2]),
-                    'height': float(bbox[3])
-                }
-                
+        """Track detected objects across frames with the IoU tracker"""
+        with self.stages.stage('track'):
+            self.tracker.update(detections)
+            current_objects = self.tracker.to_array()
         self.tracked_objects = current_objects
         return current_objects
         
-    def analyze_movement(self, current_objects):
-        """Analyze object movement patterns for suspicious activity"""
-        suspicious_activities = []
-        
-        for obj_id, obj_info in current_objects.items():
-            # Check for rapid movement
-            if obj_id in self.tracked_objects:
-                prev_bbox = self.tracked_objects[obj_id]['bbox']
-                curr_bbox = obj_info['bbox']
-                
-                # Calculate displacement
-                dx = curr_bbox['x'] - prev_bbox['x']
-                dy = curr_bbox['y'] - prev_bbox['y']
-                displacement = np.sqrt(dx*dx + dy*dy)
-                
-                # Define suspicious movement threshold
-                if displacement > 50:  # Adjust threshold as needed
-                    suspicious_activities.append({
-                        'object_id': obj_id,
-                        'type': 'rapid_movement',
-                        'confidence': obj_info['confidence']
-                    })
+    def analyze_movement(self, current_objects, timestamp=None):
+        """Analyze object movement patterns for suspicious activity, as of the frame's capture time"""
+        with self.stages.stage('movement'):
+            suspicious_activities = self.movement.update(
+                current_objects['id'],
+                corner_boxes(current_objects),
+                current_objects['confidence'],
+                timestamp=timestamp
+            )
+
+            # Attach the per-track kinematics computed in the same pass
+            current_objects['speed'] = self.movement.speed
+            current_objects['dwell_time'] = self.movement.dwell_time
                     
         return suspicious_activities
         
-    def process_frame(self, frame):
-        """Process a single frame for theft detection"""
+    def check_motion(self, frame):
+        """Run the motion pre-stage, returning whether to continue and an optional crop hint"""
+        with self.stages.stage('motion'):
+            moving, regions = self.motion.check(frame)
+            hint = merge_regions(regions, frame.shape) if moving and MOTION_CROP_HINTS else None
+        return moving, hint
+
+    def set_roi(self, shapes: RoiShapes = None):
+        """Limit detection to the given normalized polygons, or lift the limit with None"""
+        if shapes != (self.roi.shapes if self.roi else None):
+            self.roi = RegionOfInterest(shapes) if shapes else None
+
+    def detection_regions(self, frame, hint=None):
+        """Crops to detect on: the ROI tiles narrowed to the motion hint, else the hint alone"""
+        if self.roi is None:
+            return hint
+        return self.roi.tiles(frame.shape, hint)
+
+    def filter_roi(self, frame, detections):
+        """Drop detections whose box center lies outside the ROI"""
+        if self.roi is None or not len(detections):
+            return detections
+        centers = np.stack([
+            (detections['x1'] + detections['x2']) / 2,
+            (detections['y1'] + detections['y2']) / 2
+        ], axis=1)
+        return detections[self.roi.contains(centers, frame.shape)]
+
+    def needs_detection(self):
+        """Check whether the next frame should run the detector or rely on tracking"""
+        return self.cadence.should_detect(self.tracker)
+
+    def process_frame(self, frame, timestamp=None):
+        """Process a single frame for theft detection, optionally with its capture time"""
+        moving, hint = self.check_motion(frame)
+        if not moving:
+            return self.process_skipped(frame, timestamp)
+
+        if not self.needs_detection():
+            return self.process_tracking(frame, timestamp)
+
         # Detect objects
-        detections = self.detect_objects(frame)
+        detections = self.detect_objects(frame, self.detection_regions(frame, hint))
         
+        return self.process_detections(frame, detections, timestamp)
+
+    def process_detections(self, frame, detections, timestamp=None):
+        """Track and analyze detections that were produced for a frame"""
+        detections = self.filter_roi(frame, detections)
+
         # Track objects
         tracked_objects = self.track_objects(frame, detections)
+        self.cadence.record_detection(self.tracker)
         
+        return self._analyze(detections, tracked_objects, timestamp, detected=True)
+
+    def process_tracking(self, frame, timestamp=None):
+        """Carry tracked objects forward on a frame without running the detector"""
+        with self.stages.stage('track'):
+            self.tracker.predict()
+            tracked_objects = self.tracker.to_array()
+        self.tracked_objects = tracked_objects
+
+        return self._analyze(np.empty(0, dtype=DETECTION_DTYPE), tracked_objects, timestamp, detected=False)
+
+    def process_skipped(self, frame, timestamp=None):
+        """Report a static frame that skipped detection and tracking"""
+        return self._analyze(
+            np.empty(0, dtype=DETECTION_DTYPE), self.tracked_objects, timestamp, detected=False, skipped=True
+        )
+
+    def _analyze(self, detections, tracked_objects, timestamp, detected, skipped=False):
         # Analyze movements
-        suspicious_activities = self.analyze_movement(tracked_objects)
-        
-        # Store frame for next iteration
-        self.last_frame = frame
+        suspicious_activities = self.analyze_movement(tracked_objects, timestamp)
         
         return {
             'detections': detections,
-            'tracked_objects': tracked_objects,
-            'suspicious_activities': suspicious_activities
+            'tracks': tracked_objects,
+            'suspicious_activities': suspicious_activities,
+            'detected': detected,
+            'skipped': skipped,
+            'cadence': self.cadence.get_stats(),
+            'motion': self.motion.get_stats()
         }
\ No newline at end of file
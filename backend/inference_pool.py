@@ -0,0 +1,491 @@
+# inference_pool.py
+import asyncio
+import multiprocessing
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from batching import BatchInferenceEngine
+from framebus import FrameBusReader, FrameRef
+from schema import encode_result
+from roi import RoiShapes
+from metrics import registry
+from config import (
+    MOTION_CAMERA_THRESHOLDS,
+    INFERENCE_WORKERS,
+    INFERENCE_MAX_PENDING,
+    INFERENCE_MAX_STREAMS,
+    INFERENCE_STREAM_IDLE_SECONDS,
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+    ANALYZE_DECODE_SIZE,
+    INFERENCE_WARMUP_SIZE,
+    INFERENCE_LOAD_RETRY_MAX
+)
+
+# An encoded image, an already decoded frame, or a decoded frame in shared memory
+FramePayload = Union[bytes, np.ndarray, FrameRef]
+# A stream key, its frame, the stream's region of interest if it has one, and
+# when the frame was captured, in seconds
+WorkItem = Tuple[str, FramePayload, Optional[RoiShapes], float]
+
+class PoolSaturatedError(Exception):
+    """Raised when the inference pool has too many frames in flight"""
+
+STAGE_SECONDS = registry.histogram(
+    "inference_stage_seconds",
+    "Time a frame spent in each worker stage (decode, motion, preprocess, predict, track, movement)"
+)
+ANALYZE_SECONDS = registry.histogram(
+    "inference_frame_seconds", "Time from submitting a frame to its result, including queueing"
+)
+FRAMES_PROCESSED = registry.counter("frames_processed_total", "Frames analyzed")
+FRAMES_SKIPPED = registry.counter("frames_skipped_total", "Analyzed frames the motion gate found static")
+FRAMES_DROPPED = registry.counter("frames_dropped_total", "Frames that got no result, by reason")
+# Series labeled with a stream, dropped with the rest of its state
+STREAM_METRICS = (STAGE_SECONDS, ANALYZE_SECONDS, FRAMES_PROCESSED, FRAMES_SKIPPED, FRAMES_DROPPED)
+
+# Worker process state: one detection backend per process, and one detector
+# per stream so tracking state never mixes between cameras. Any camera_id a
+# client uploads with makes a stream, so detectors are kept in least recently
+# used order with their last use, and _evict_detectors bounds them.
+_backend = None
+_load_error: Optional[str] = None
+_detectors: "OrderedDict[str, TheftDetector]" = OrderedDict()
+_detector_used: Dict[str, float] = {}
+_bus = FrameBusReader()
+
+def _init_worker():
+    # A failed load is kept for _ensure_backend to report and retry, rather
+    # than raised here, which would break the whole executor
+    global _load_error
+    try:
+        _ensure_backend()
+    except Exception as e:
+        _load_error = str(e) or type(e).__name__
+
+def _ensure_backend():
+    global _backend, _load_error
+    if _backend is None:
+        from backends import create_backend
+
+        _backend = create_backend()
+        _load_error = None
+    return _backend
+
+def _warm_up(size: int) -> float:
+    """Load the model if needed and run it once on a synthetic frame, returning the seconds taken"""
+    started = time.perf_counter()
+    try:
+        backend = _ensure_backend()
+    except Exception as e:
+        raise RuntimeError(f"Model failed to load: {str(e) or _load_error}") from e
+    backend.predict_batch([np.zeros((size, size, 3), dtype=np.uint8)])
+    return time.perf_counter() - started
+
+def _get_detector(stream: str):
+    from inference import TheftDetector
+
+    detector = _detectors.get(stream)
+    if detector is None:
+        detector = _detectors[stream] = TheftDetector(
+            backend=_backend,
+            motion_threshold=MOTION_CAMERA_THRESHOLDS.get(stream)
+        )
+    else:
+        _detectors.move_to_end(stream)
+    _detector_used[stream] = time.monotonic()
+    return detector
+
+def _evict_detectors(max_streams: int = INFERENCE_MAX_STREAMS,
+                     idle_seconds: float = INFERENCE_STREAM_IDLE_SECONDS):
+    # A stream that comes back after eviction starts over, like a new camera
+    now = time.monotonic()
+    while _detectors:
+        stream = next(iter(_detectors))
+        if len(_detectors) <= max_streams and now - _detector_used[stream] < idle_seconds:
+            break
+        del _detectors[stream], _detector_used[stream]
+
+# JPEG start-of-frame markers, which carry the image dimensions
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from a JPEG header without decoding, or None if it is not a JPEG"""
+    if data[:2] != b"\xff\xd8":
+        return None
+    offset = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    return None
+
+def _decode(payload: FramePayload, target: int = ANALYZE_DECODE_SIZE) -> Tuple[np.ndarray, float]:
+    """Decode a payload into a BGR frame no larger than target on its long side.
+
+    JPEGs are decoded straight at 1/2, 1/4 or 1/8 scale when that still
+    covers the target, then resized once. Returns the frame and the factor
+    that maps its pixels back to the original resolution.
+    """
+    import cv2
+
+    if isinstance(payload, FrameRef):
+        # Read in place from the ingest process's ring, no copy
+        payload = _bus.read(payload)
+        if payload is None:
+            raise ValueError("Frame was overwritten before it was analyzed")
+
+    if isinstance(payload, np.ndarray):
+        frame = payload if payload.ndim == 3 else cv2.cvtColor(payload, cv2.COLOR_GRAY2BGR)
+        original = max(frame.shape[:2])
+    else:
+        flag, size = cv2.IMREAD_COLOR, _jpeg_size(payload) if target else None
+        if size:
+            for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                    (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                if max(size) / factor >= target:
+                    flag = reduced
+                    break
+        frame = cv2.imdecode(np.frombuffer(payload, np.uint8), flag)
+        if frame is None:
+            raise ValueError("Could not decode image")
+        original = max(size) if size else max(frame.shape[:2])
+
+    if target and max(frame.shape[:2]) > target:
+        scale = target / max(frame.shape[:2])
+        frame = cv2.resize(
+            frame, (max(1, round(frame.shape[1] * scale)), max(1, round(frame.shape[0] * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+    return frame, original / max(frame.shape[:2])
+
+def _encode(result: dict, scale: float = 1.0) -> dict:
+    # Results leave the worker in the compact wire schema, in original frame pixels
+    return encode_result(result, _backend.classes.names, scale)
+
+def _add_stages(timings: Dict[str, float], stages: Dict[str, float], share: float = 1.0):
+    for stage, seconds in stages.items():
+        timings[stage] = timings.get(stage, 0.0) + seconds * share
+
+def _process_batch(items: List[WorkItem]) -> Tuple[list, List[Dict[str, float]], Dict[str, int]]:
+    """Analyze a batch, returning the results, each frame's stage timings and tracks per stream.
+
+    Keyframes of different streams share one model call, but each stream's
+    frames are analyzed in the order they were submitted: a frame after a
+    keyframe of its stream waits for a later round, once that keyframe's
+    detections have reached the tracker.
+    """
+    _ensure_backend()
+    results: list = [None] * len(items)
+    timings: List[Dict[str, float]] = [{} for _ in items]
+    remaining = list(range(len(items)))
+    while remaining:
+        keyframes, deferred, waiting = [], [], set()
+        for i in remaining:
+            stream, payload, roi, timestamp = items[i]
+            if stream in waiting:
+                deferred.append(i)
+                continue
+            detector = None
+            try:
+                started = time.perf_counter()
+                frame, scale = _decode(payload)
+                timings[i]['decode'] = time.perf_counter() - started
+                detector = _get_detector(stream)
+                detector.set_roi(roi)
+                moving, hint = detector.check_motion(frame)
+                if not moving:
+                    results[i] = _encode(detector.process_skipped(frame, timestamp), scale)
+                elif detector.needs_detection():
+                    keyframes.append((i, frame, detector.detection_regions(frame, hint), scale))
+                    waiting.add(stream)
+                else:
+                    results[i] = _encode(detector.process_tracking(frame, timestamp), scale)
+            except Exception as e:
+                results[i] = e
+            if detector is not None:
+                _add_stages(timings[i], detector.stages.take())
+        if keyframes:
+            _detect_keyframes(items, keyframes, results, timings)
+        remaining = deferred
+
+    for i, (_, payload, _, _) in enumerate(items):
+        if isinstance(payload, FrameRef) and not isinstance(results[i], Exception) and not _bus.valid(payload):
+            results[i] = ValueError("Frame was overwritten while it was analyzed")
+
+    tracks = {stream: len(_detectors[stream].tracker) for stream, _, _, _ in items if stream in _detectors}
+    _evict_detectors()
+    return results, timings, tracks
+
+def _detect_keyframes(items: List[WorkItem], keyframes: list, results: list, timings: List[Dict[str, float]]):
+    # One model call for the keyframes of a round, then each stream's tracker takes its detections
+    batch_detector = _get_detector(items[keyframes[0][0]][0])
+    frames = [frame for _, frame, _, _ in keyframes]
+    regions = [frame_regions for _, _, frame_regions, _ in keyframes]
+    try:
+        detections = batch_detector.detect_objects_batch(frames, regions)
+    except Exception:
+        # Retry one frame at a time, so a bad frame fails only its own result
+        detections = []
+        for frame, frame_regions in zip(frames, regions):
+            try:
+                detections.append(batch_detector.detect_objects(frame, frame_regions))
+            except Exception as e:
+                detections.append(e)
+    # Preprocessing and the model call are shared by the batch; charge each frame its share
+    shared = batch_detector.stages.take()
+    for (i, frame, _, scale), frame_detections in zip(keyframes, detections):
+        _add_stages(timings[i], shared, 1.0 / len(keyframes))
+        if isinstance(frame_detections, Exception):
+            results[i] = frame_detections
+            continue
+        stream, _, _, timestamp = items[i]
+        detector = _get_detector(stream)
+        try:
+            results[i] = _encode(detector.process_detections(frame, frame_detections, timestamp), scale)
+        except Exception as e:
+            results[i] = e
+        _add_stages(timings[i], detector.stages.take())
+
+class InferenceWorkerPool:
+    """Run decode and inference in worker processes, pinning each stream to one worker"""
+
+    def __init__(self, workers: int = INFERENCE_WORKERS,
+                 max_pending: int = INFERENCE_MAX_PENDING,
+                 max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 max_streams: int = INFERENCE_MAX_STREAMS,
+                 stream_idle_seconds: float = INFERENCE_STREAM_IDLE_SECONDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executors: List[ProcessPoolExecutor] = []
+        self.engines: List[BatchInferenceEngine] = []
+        self.pending = 0
+        self.rejected = 0
+        self.streams: Dict[str, dict] = {}
+        self.active_tracks: Dict[str, int] = {}
+        # Streams in least recently used order with their last frame's time, bounding
+        # the per-stream stats and metric series like the workers bound their detectors
+        self.max_streams = max_streams
+        self.stream_idle_seconds = stream_idle_seconds
+        self.stream_seen: "OrderedDict[str, float]" = OrderedDict()
+        self.restarts = 0
+        # Regions of interest per stream, sent to the worker with each frame
+        self.rois: Dict[str, RoiShapes] = {}
+
+        # Models load and warm up in the background after start
+        self.warmup_tasks: List[asyncio.Task] = []
+        self.warmup_seconds: List[Optional[float]] = []
+        self.load_errors: List[Optional[str]] = []
+
+    @property
+    def ready(self) -> bool:
+        """Whether every worker has loaded its model and run a warm-up frame"""
+        return bool(self.engines) and all(seconds is not None for seconds in self.warmup_seconds)
+
+    async def start(self):
+        """Start one single-process executor and batch engine per worker"""
+        if self.executors:
+            return
+        for index in range(self.workers):
+            self.executors.append(self._create_executor())
+            engine = BatchInferenceEngine(
+                partial(self._run_batch, index),
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_ms
+            )
+            await engine.start()
+            self.engines.append(engine)
+
+        self.warmup_seconds = [None] * self.workers
+        self.load_errors = [None] * self.workers
+        self.warmup_tasks = [
+            asyncio.create_task(self._warm_up_worker(index))
+            for index in range(self.workers)
+        ]
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    async def _run_in_worker(self, index: int, fn, *args):
+        """Run fn in a worker's process, replacing the process if it has died"""
+        executor = self.executors[index]
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._replace_executor(index, executor)
+            raise
+
+    def _replace_executor(self, index: int, broken: ProcessPoolExecutor):
+        # A dead process breaks its executor for good. Only the batch that was
+        # running fails; the streams pinned to the worker continue on a fresh
+        # process, which gets their ROIs with the next frames.
+        if index >= len(self.executors) or self.executors[index] is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.executors[index] = self._create_executor()
+        self.restarts += 1
+        print(f"Inference worker {index} died; started a new process")
+
+        # The new process has no model yet, so the pool is not ready until it warms up again
+        self.warmup_seconds[index] = None
+        if self.warmup_tasks and self.warmup_tasks[index].done():
+            self.warmup_tasks[index] = asyncio.create_task(self._warm_up_worker(index))
+
+    async def _warm_up_worker(self, index: int, size: int = INFERENCE_WARMUP_SIZE):
+        delay = 1.0
+        while True:
+            try:
+                self.warmup_seconds[index] = await self._run_in_worker(index, _warm_up, size)
+                self.load_errors[index] = None
+                return
+            except Exception as e:
+                self.load_errors[index] = str(e) or type(e).__name__
+                print(f"Inference worker {index} not ready: {self.load_errors[index]}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, INFERENCE_LOAD_RETRY_MAX)
+
+    async def stop(self):
+        """Stop the batch engines and shut the worker processes down"""
+        for task in self.warmup_tasks:
+            task.cancel()
+        self.warmup_tasks = []
+        for engine in self.engines:
+            await engine.stop()
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.engines = []
+        self.executors = []
+
+    async def _run_batch(self, index: int, items: List[WorkItem]) -> list:
+        results, timings, tracks = await self._run_in_worker(index, _process_batch, items)
+        for (stream, _, _, _), stages in zip(items, timings):
+            if stream not in self.stream_seen:
+                # Forgotten while its frame was in flight
+                continue
+            for stage, seconds in stages.items():
+                STAGE_SECONDS.observe(seconds, camera=stream, stage=stage)
+        self.active_tracks.update({stream: count for stream, count in tracks.items() if stream in self.stream_seen})
+        return results
+
+    def _touch(self, stream: str):
+        now = time.monotonic()
+        self.stream_seen[stream] = now
+        self.stream_seen.move_to_end(stream)
+        while self.stream_seen and (len(self.stream_seen) > self.max_streams or (
+                now - next(iter(self.stream_seen.values())) >= self.stream_idle_seconds)):
+            self.forget_stream(next(iter(self.stream_seen)))
+
+    def forget_stream(self, stream: str):
+        """Drop a stream's stats and metric series"""
+        self.stream_seen.pop(stream, None)
+        self.streams.pop(stream, None)
+        self.active_tracks.pop(stream, None)
+        for metric in STREAM_METRICS:
+            metric.remove(camera=stream)
+
+    def set_roi(self, stream: str, shapes: Optional[RoiShapes]):
+        """Limit detection on a stream to normalized polygons, or to the whole frame with None"""
+        if shapes:
+            self.rois[stream] = shapes
+        else:
+            self.rois.pop(stream, None)
+
+    def worker_for(self, stream: str) -> int:
+        """Get the worker index a stream is pinned to"""
+        return zlib.crc32(stream.encode()) % self.workers
+
+    async def submit(self, stream: str, payload: FramePayload, timestamp: Optional[float] = None) -> dict:
+        """Analyze a frame on the stream's worker, failing fast when the pool is saturated.
+
+        timestamp is when the frame was captured, in seconds on a clock that
+        is consistent for the stream; movement speeds are measured between
+        these times. It defaults to now, the time the frame arrived.
+        """
+        if not self.engines:
+            raise RuntimeError("Inference pool is not running")
+        self._touch(stream)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            FRAMES_DROPPED.inc(camera=stream, reason="saturated")
+            raise PoolSaturatedError(f"{self.pending} frames already in flight")
+
+        timestamp = time.time() if timestamp is None else timestamp
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            results = await self.engines[self.worker_for(stream)].submit(
+                (stream, payload, self.rois.get(stream), timestamp)
+            )
+        except Exception:
+            FRAMES_DROPPED.inc(camera=stream, reason="failed")
+            raise
+        finally:
+            self.pending -= 1
+            self._touch(stream)
+        ANALYZE_SECONDS.observe(time.perf_counter() - started, camera=stream)
+        FRAMES_PROCESSED.inc(camera=stream)
+        if results['skipped']:
+            FRAMES_SKIPPED.inc(camera=stream)
+
+        self.streams[stream] = {
+            "cadence": results['cadence'],
+            "motion": results['motion']
+        }
+        return results
+
+    async def submit_many(self, stream: str, payloads: List[FramePayload],
+                          timestamps: Optional[List[float]] = None) -> list:
+        """Analyze consecutive frames of one stream, admitting all of them or none.
+
+        Frames are queued in order and share batches on the stream's worker.
+        timestamps gives each frame's capture time; frames that share a batch
+        are analyzed microseconds apart, so without them speeds are meaningless.
+        Each entry of the result is the frame's result or the exception it raised.
+        """
+        timestamps = timestamps or [None] * len(payloads)
+        self._touch(stream)
+        if self.pending + len(payloads) > self.max_pending:
+            self.rejected += len(payloads)
+            FRAMES_DROPPED.inc(len(payloads), camera=stream, reason="saturated")
+            raise PoolSaturatedError(f"{self.pending} frames already in flight, {len(payloads)} more requested")
+        return await asyncio.gather(
+            *(self.submit(stream, payload, timestamp) for payload, timestamp in zip(payloads, timestamps)),
+            return_exceptions=True
+        )
+
+    def get_stats(self) -> dict:
+        """Get pool occupancy and per-worker batching statistics"""
+        return {
+            "workers": self.workers,
+            "ready": self.ready,
+            "warmup_seconds": self.warmup_seconds,
+            "load_errors": self.load_errors,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "engines": [engine.get_stats() for engine in self.engines],
+            "streams": self.streams
+        }
@@ -0,0 +1,242 @@
+# ingest.py
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+import numpy as np
+from framebus import FrameRef, SharedFrameRing
+from config import (
+    INGEST_BUFFER_SIZE,
+    INGEST_RECONNECT_MIN,
+    INGEST_RECONNECT_MAX,
+    FRAME_BUS,
+    FRAME_BUS_SLOTS
+)
+
+# Handlers get the decoded frame, or a reference to it in shared memory when the frame bus is on,
+# and the time.time() it was captured at
+FrameHandler = Callable[[int, Union[np.ndarray, FrameRef], float], Awaitable[None]]
+# A buffered frame and its capture time
+CapturedFrame = Tuple[Union[np.ndarray, FrameRef], float]
+
+class FrameRingBuffer:
+    """Bounded buffer of captured frames that drops the oldest frame when full"""
+
+    def __init__(self, size: int = INGEST_BUFFER_SIZE):
+        self.frames = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, frame: CapturedFrame) -> Optional[CapturedFrame]:
+        """Add a frame, evicting and returning the oldest one if the buffer is full"""
+        with self.lock:
+            evicted = None
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+                evicted = self.frames.popleft()
+            self.frames.append(frame)
+            return evicted
+
+    def get(self) -> Optional[CapturedFrame]:
+        """Take the oldest buffered frame"""
+        with self.lock:
+            return self.frames.popleft() if self.frames else None
+
+    def take_latest(self) -> Tuple[Optional[CapturedFrame], List[CapturedFrame]]:
+        """Take the newest buffered frame, dropping and returning the older ones"""
+        with self.lock:
+            if not self.frames:
+                return None, []
+            frame = self.frames.pop()
+            skipped = list(self.frames)
+            self.frames.clear()
+            self.dropped += len(skipped)
+            return frame, skipped
+
+    def latest(self) -> Optional[CapturedFrame]:
+        """Peek at the newest buffered frame without consuming it"""
+        with self.lock:
+            return self.frames[-1] if self.frames else None
+
+    def __len__(self):
+        return len(self.frames)
+
+class IngestWorker:
+    """Pull frames from one OpenCV-readable source and feed them to a handler"""
+
+    def __init__(self, channel: int, source: Union[str, int],
+                 on_frame: Optional[FrameHandler] = None,
+                 buffer_size: int = INGEST_BUFFER_SIZE,
+                 reconnect_min: float = INGEST_RECONNECT_MIN,
+                 reconnect_max: float = INGEST_RECONNECT_MAX,
+                 bus_slots: int = FRAME_BUS_SLOTS if FRAME_BUS else 0):
+        self.channel = channel
+        self.source = source
+        self.on_frame = on_frame
+        self.buffer = FrameRingBuffer(buffer_size)
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        # Local files decode far faster than real time, so play them back at their native rate
+        self.pace = isinstance(source, str) and os.path.exists(source)
+        # Shared-memory ring that frames are published to, allocated on the first frame.
+        # Every buffered frame and the one being analyzed keep their slot, plus one to write into.
+        self.bus_slots = max(bus_slots, buffer_size + 2) if bus_slots else 0
+        self.ring: Optional[SharedFrameRing] = None
+
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.frame_ready: Optional[asyncio.Event] = None
+
+        self.connected = False
+        self.frames_read = 0
+        self.frames_processed = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self.fps = 0.0
+        self.last_frame_time: Optional[float] = None
+        # Newest captured frame, for consumers that only ever want the latest
+        self.latest_frame: Optional[np.ndarray] = None
+
+    async def start(self):
+        """Start the capture thread and the frame consumer task"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.loop = asyncio.get_running_loop()
+        self.frame_ready = asyncio.Event()
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._capture_loop,
+            name=f"ingest-{self.channel}",
+            daemon=True
+        )
+        self.thread.start()
+        self.task = asyncio.create_task(self._consume_loop())
+
+    async def stop(self):
+        """Stop capturing and wait for the worker to exit"""
+        self.stop_event.set()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.thread:
+            await asyncio.to_thread(self.thread.join)
+            self.thread = None
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+    def _capture_loop(self):
+        import cv2
+
+        backoff = self.reconnect_min
+        while not self.stop_event.is_set():
+            capture = cv2.VideoCapture(self.source)
+            if not capture.isOpened():
+                capture.release()
+                self.connected = False
+                self.last_error = f"Unable to open source for channel {self.channel}"
+                self.reconnects += 1
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.reconnect_max)
+                continue
+
+            self.connected = True
+            backoff = self.reconnect_min
+            source_fps = capture.get(cv2.CAP_PROP_FPS) if self.pace else 0
+            frame_interval = 1.0 / source_fps if source_fps > 0 else 0
+            while not self.stop_event.is_set():
+                if frame_interval and self.last_frame_time is not None:
+                    delay = self.last_frame_time + frame_interval - time.monotonic()
+                    if delay > 0:
+                        self.stop_event.wait(delay)
+                ok, frame = capture.read()
+                if not ok:
+                    self.last_error = f"Stream ended for channel {self.channel}"
+                    break
+                captured_at = time.time()
+                self.latest_frame = frame
+                self._record_frame()
+                if self.bus_slots:
+                    try:
+                        frame = self._publish(frame)
+                    except BufferError:
+                        self.buffer.dropped += 1
+                        continue
+                self._release(self.buffer.put((frame, captured_at)))
+                self.loop.call_soon_threadsafe(self.frame_ready.set)
+
+            capture.release()
+            self.connected = False
+            if not self.stop_event.is_set():
+                self.reconnects += 1
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.reconnect_max)
+
+    def _publish(self, frame: np.ndarray) -> FrameRef:
+        if self.ring is None or frame.nbytes > self.ring.slot_bytes:
+            # First frame, or the source switched to a larger resolution
+            previous, self.ring = self.ring, SharedFrameRing.create(frame.nbytes, self.bus_slots)
+            if previous:
+                previous.close()
+        return self.ring.write(frame)
+
+    def _release(self, captured: Optional[CapturedFrame]):
+        # Frames on the bus hold their ring slot until they are dropped or analyzed
+        if captured is not None and isinstance(captured[0], FrameRef) and self.ring is not None:
+            self.ring.release(captured[0])
+
+    def _record_frame(self):
+        now = time.monotonic()
+        if self.last_frame_time is not None:
+            interval = now - self.last_frame_time
+            if interval > 0:
+                # Exponential moving average keeps the rate smooth without a window
+                self.fps = 0.9 * self.fps + 0.1 * (1.0 / interval) if self.fps else 1.0 / interval
+        self.last_frame_time = now
+        self.frames_read += 1
+
+    async def _consume_loop(self):
+        while True:
+            await self.frame_ready.wait()
+            self.frame_ready.clear()
+            while True:
+                if self.bus_slots:
+                    # Only the newest frame is worth analyzing; the skipped ones free their slots
+                    captured, skipped = self.buffer.take_latest()
+                    for old in skipped:
+                        self._release(old)
+                else:
+                    captured = self.buffer.get()
+                if captured is None:
+                    break
+                try:
+                    if self.on_frame:
+                        await self.on_frame(self.channel, *captured)
+                except Exception as e:
+                    self.last_error = str(e)
+                finally:
+                    self._release(captured)
+                self.frames_processed += 1
+
+    def get_stats(self) -> dict:
+        """Get ingest counters for this channel"""
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "fps": round(self.fps, 2),
+            "frames_read": self.frames_read,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.buffer.dropped,
+            "buffered": len(self.buffer),
+            "reconnects": self.reconnects,
+            "last_error": self.last_error
+        }
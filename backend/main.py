@@ -1,16 +1,36 @@
 #main.py
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, FileResponse, JSONResponse
 import numpy as np
-import cv2
-from inference import TheftDetector
 import asyncio
-from typing import Dict
+import time
+from collections import Counter
+from typing import Dict, List, Optional
 import json
 import socketio
 from datetime import datetime
 from database import Database
 from camera_manager import CameraManager
+from inference_pool import InferenceWorkerPool, PoolSaturatedError, FramePayload
+from schema import wants_msgpack
+from models import AnalyzeResponse, AnalyzeBatchResponse, RegionOfInterestConfig
+from realtime import RealtimeHub
+from preview import MJPEG_BOUNDARY
+from metrics import registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from profiler import SamplingProfiler
+from clips import ClipRecorder
+from roi import roi_shapes, check_roi
+from config import (
+    SOCKETIO_LOGGER,
+    ENGINEIO_LOGGER,
+    ALERT_COOLDOWN,
+    ANALYZE_MAX_BATCH,
+    ANALYZE_BATCH_FPS,
+    PROFILER_ENABLED,
+    CLIP_RECORDING
+)
+import msgpack
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
@@ -38,8 +58,9 @@ app.add_middleware(
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins=['*'],
-    logger=True,
-    engineio_logger=True
+    # Per-packet logging is costly under load, so it is off unless enabled in config
+    logger=SOCKETIO_LOGGER,
+    engineio_logger=ENGINEIO_LOGGER
 )
 
 # Create ASGI app by wrapping the FastAPI app
@@ -48,19 +69,141 @@ asgi_app = socketio.ASGIApp(
     other_asgi_app=app
 )
 # Initialize components
-detector = TheftDetector()
+inference_pool = InferenceWorkerPool()
 db = Database()
-camera_manager = CameraManager()
+camera_manager = CameraManager(db)
+hub = RealtimeHub(sio)
+profiler = SamplingProfiler()
+clip_recorder = ClipRecorder() if CLIP_RECORDING else None
+camera_manager.clip_recorder = clip_recorder
+if clip_recorder:
+    clip_recorder.clip_handler = db.link_clip
+
+# Gauges and totals the components already keep are read when /metrics is scraped
+registry.gauge("inference_ready", "1 once every inference worker has a warm model",
+               lambda: float(inference_pool.ready))
+registry.gauge("inference_pending_frames", "Frames submitted to the inference pool and not yet answered",
+               lambda: inference_pool.pending)
+registry.gauge("inference_batch_queue_depth", "Frames waiting to be batched, per worker",
+               lambda: [({"worker": index}, engine.queue.qsize() if engine.queue else 0)
+                        for index, engine in enumerate(inference_pool.engines)])
+registry.gauge("active_tracks", "Objects currently tracked, per camera",
+               lambda: [({"camera": stream}, tracks) for stream, tracks in inference_pool.active_tracks.items()])
+registry.gauge("alert_queue_depth", "Alerts waiting for the batched writer",
+               lambda: db.alert_queue.qsize())
+registry.counter("alerts_written_total", "Alerts written to the database",
+                 lambda: db.alerts_written)
+registry.gauge("ingest_buffered_frames", "Captured frames waiting for analysis, per camera",
+               lambda: [({"camera": f"camera-{stats['channel']}"}, stats["buffered"])
+                        for stats in camera_manager.get_stream_stats()])
+registry.counter("ingest_frames_dropped_total", "Captured frames dropped because analysis fell behind",
+                 lambda: [({"camera": f"camera-{stats['channel']}"}, stats["frames_dropped"])
+                          for stats in camera_manager.get_stream_stats()])
+registry.gauge("dvrs_offline", "DVRs whose channels could not be discovered",
+               lambda: len(camera_manager.offline))
+registry.gauge("realtime_lagging_clients", "Socket.IO clients skipped for being backlogged",
+               lambda: hub.get_stats()["lagging_clients"])
+registry.gauge("clip_buffer_bytes", "Memory held by event clip pre-roll buffers",
+               lambda: clip_recorder.nbytes if clip_recorder else 0)
+
+ACTIVITY_SEVERITY = {
+    "rapid_movement": "high",
+    "zone_enter": "high",
+    "loitering": "medium",
+    "zone_exit": "low"
+}
+# Last alert time per (camera, object, activity), so a sustained activity alerts once per cooldown
+last_alerted: Dict[tuple, float] = {}
+
+def summarize(result: dict) -> dict:
+    """Reduce an encoded frame result to the summary pushed to subscribers"""
+    classes = result["classes"]
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "detected": result["detected"],
+        "skipped": result["skipped"],
+        "detections": len(result["detections"]),
+        "tracks": len(result["tracks"]),
+        "objects": dict(Counter(classes[row[6]] for row in result["tracks"])),
+        "suspicious_activities": len(result["suspicious_activities"])
+    }
+
+async def publish_result(camera: str, result: dict):
+    """Push a frame result to the camera's room and raise alerts for suspicious activity"""
+    hub.publish_detections(camera, summarize(result))
+
+    now = time.monotonic()
+    if len(last_alerted) > 1024:
+        for key in [key for key, alerted in last_alerted.items() if now - alerted >= ALERT_COOLDOWN]:
+            del last_alerted[key]
+
+    for activity in result["suspicious_activities"]:
+        key = (camera, activity["object_id"], activity["type"])
+        if now - last_alerted.get(key, now - ALERT_COOLDOWN) < ALERT_COOLDOWN:
+            continue
+        last_alerted[key] = now
+
+        # The alert row serves the clip path once the clip is written; /clips answers 202 until then
+        clip_path = clip_recorder.trigger(camera) if clip_recorder else None
+        await db.add_alert(activity["type"], camera, ACTIVITY_SEVERITY.get(activity["type"], "medium"), clip_path)
+        timestamp = datetime.now().isoformat()
+        hub.publish_alert(camera, {
+            "id": f"{camera}-{activity['object_id']}-{activity['type']}-{timestamp}",
+            "timestamp": timestamp,
+            "camera_id": camera,
+            "type": activity["type"],
+            "message": f"{activity['type'].replace('_', ' ').capitalize()} by object {activity['object_id']}",
+            "clip_path": clip_path
+        })
+
+def record_upload(camera_id: Optional[str], contents: bytes):
+    """Keep an uploaded JPEG as pre-roll for the camera's event clips"""
+    if clip_recorder and camera_id and contents[:2] == b"\xff\xd8":
+        clip_recorder.add_frame(camera_id, contents)
+
+async def handle_stream_frame(channel: int, frame: FramePayload, captured_at: float):
+    """Run detection on a frame pulled by an ingest worker"""
+    result = await inference_pool.submit(f"camera-{channel}", frame, captured_at)
+    await publish_result(str(channel), result)
+
+async def handle_status_change(channel: int, entry: dict):
+    """Push a camera status change to the camera's room"""
+    hub.publish_status(channel, {
+        "status": entry["status"],
+        "lastChecked": entry["last_checked"],
+        "lastError": entry["last_error"]
+    })
+
+def apply_roi(camera_id: int, roi: Optional[dict]):
+    """Limit detection to a camera's ROI on its ingest stream and on frames uploaded for it"""
+    shapes = roi_shapes(roi)
+    inference_pool.set_roi(f"camera-{camera_id}", shapes)
+    inference_pool.set_roi(f"upload-{camera_id}", shapes)
+
+camera_manager.frame_handler = handle_stream_frame
+camera_manager.status_handler = handle_status_change
+camera_manager.roi_handler = apply_roi
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
     await db.initialize()
+    await inference_pool.start()
+    await camera_manager.load()
+    await hub.start()
+    if clip_recorder:
+        await clip_recorder.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    profiler.stop()
     await camera_manager.close()
+    if clip_recorder:
+        await clip_recorder.stop()
+    await hub.stop()
+    await inference_pool.stop()
+    await db.close()
 
 @sio.event
 async def connect(sid, environ):
@@ -70,44 +213,183 @@ async def connect(sid, environ):
 @sio.event
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
+    hub.forget(sid)
+
+@sio.event
+async def subscribe(sid, data):
+    """Join the rooms of the cameras a client displays, e.g. {'cameras': [1, 2]}"""
+    if not isinstance(data, dict) or not isinstance(data.get("cameras", []), list):
+        return {"status": "error", "message": "Expected {'cameras': [...]}"}
+    cameras = await hub.subscribe(sid, data.get("cameras", []))
+    return {"status": "subscribed", "cameras": cameras}
+
+@sio.event
+async def unsubscribe(sid, data):
+    """Leave the rooms of cameras a client no longer displays"""
+    if not isinstance(data, dict) or not isinstance(data.get("cameras", []), list):
+        return {"status": "error", "message": "Expected {'cameras': [...]}"}
+    cameras = await hub.unsubscribe(sid, data.get("cameras", []))
+    return {"status": "unsubscribed", "cameras": cameras}
 
 @app.post("/dvr/configure")
 async def configure_dvr(config: DvrConfig):
     try:
-        await camera_manager.initialize(config.ip, config.username, config.password)
-        return {"status": "success", "connected": True, "message": "DVR configured successfully"}
+        dvr_id = await camera_manager.initialize(config.ip, config.username, config.password)
+        return {"status": "success", "connected": True, "dvrId": dvr_id, "message": "DVR configured successfully"}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e) or type(e).__name__)
+
+@app.get("/dvrs")
+async def get_dvrs():
+    return {"dvrs": camera_manager.get_dvr_list()}
+
+@app.delete("/dvrs/{dvr_id}")
+async def delete_dvr(dvr_id: int):
+    if dvr_id not in camera_manager.dvrs:
+        raise HTTPException(status_code=404, detail="DVR not found")
+    await camera_manager.remove_dvr(dvr_id)
+    return {"status": "success", "message": "DVR removed"}
 
 @app.get("/alerts")
-async def get_alerts():
-    alerts = await db.get_recent_alerts()
-    return {"alerts": alerts}
+async def get_alerts(camera: Optional[str] = None, severity: Optional[str] = None,
+                     type: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, cursor: Optional[str] = None,
+                     limit: int = Query(100, ge=1, le=1000)):
+    try:
+        alerts, next_cursor = await db.query_alerts(
+            camera=camera, severity=severity, alert_type=type,
+            since=since, until=until, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"alerts": alerts, "next_cursor": next_cursor}
+
+@app.get("/alerts/stats")
+async def get_alert_stats(granularity: str = "hour", since: Optional[str] = None,
+                          until: Optional[str] = None, camera: Optional[str] = None,
+                          severity: Optional[str] = None, type: Optional[str] = None):
+    try:
+        buckets = await db.get_alert_stats(
+            granularity=granularity, since=since, until=until,
+            camera=camera, severity=severity, alert_type=type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"granularity": granularity, "buckets": buckets}
 
 @app.get("/cameras")
 async def get_cameras():
     cameras = await camera_manager.get_camera_list()
     return {"cameras": cameras}
 
-@app.post("/analyze")
-async def analyze_frame(file: UploadFile = File(...)):
+def render(request: Request, body: dict):
+    """Encode a response as msgpack when the client asks for it, JSON otherwise"""
+    if wants_msgpack(request.headers.get("accept")):
+        return Response(msgpack.packb(body), media_type="application/msgpack")
+    return body
+
+@app.post("/analyze", responses={200: {"model": AnalyzeResponse}})
+async def analyze_frame(request: Request, file: UploadFile = File(...), camera_id: Optional[str] = None,
+                        timestamp: Optional[float] = None):
+    """Analyze one image; timestamp is its capture time in seconds, the arrival time if not given"""
+    contents = await file.read()
+    record_upload(camera_id, contents)
     try:
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        results = detector.process_frame(frame)
-        
+        # Decoding and inference run in the worker process pinned to this stream
+        results = await inference_pool.submit(f"upload-{camera_id or 'default'}", contents, timestamp)
+        if camera_id:
+            await publish_result(camera_id, results)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"Inference pool saturated: {e}")
+    except Exception as e:
         return {
-            "status": "success",
-            "data": results
+            "status": "error",
+            "message": str(e)
         }
+
+    return render(request, {
+        "status": "success",
+        "data": results
+    })
+
+@app.post("/analyze/batch", responses={200: {"model": AnalyzeBatchResponse}})
+async def analyze_batch(request: Request, files: List[UploadFile] = File(...), camera_id: Optional[str] = None,
+                        timestamps: Optional[List[float]] = Query(None), fps: Optional[float] = Query(None, gt=0)):
+    """Analyze consecutive frames of one camera in a single request.
+
+    Movement speeds need each frame's capture time: pass one timestamps
+    value per file, in seconds, or the fps the frames were captured at,
+    in which case the last frame is taken as captured now.
+    """
+    if len(files) > ANALYZE_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {ANALYZE_MAX_BATCH} files per batch")
+    if timestamps is not None and len(timestamps) != len(files):
+        raise HTTPException(status_code=400, detail=f"Got {len(timestamps)} timestamps for {len(files)} files")
+    if timestamps is None:
+        now, interval = time.time(), 1.0 / (fps or ANALYZE_BATCH_FPS)
+        timestamps = [now - (len(files) - 1 - i) * interval for i in range(len(files))]
+    contents = [await file.read() for file in files]
+    for frame in contents:
+        record_upload(camera_id, frame)
+    try:
+        results = await inference_pool.submit_many(f"upload-{camera_id or 'default'}", contents, timestamps)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"Inference pool saturated: {e}")
+
+    data = []
+    for result in results:
+        if isinstance(result, Exception):
+            data.append({"error": str(result)})
+            continue
+        if camera_id:
+            await publish_result(camera_id, result)
+        data.append(result)
+    return render(request, {
+        "status": "success",
+        "data": data
+    })
+
+RAW_DTYPES = {"uint8"}
+
+@app.post("/analyze/raw", responses={200: {"model": AnalyzeResponse}})
+async def analyze_raw(request: Request, camera_id: Optional[str] = None, timestamp: Optional[float] = None):
+    """Analyze an uncompressed BGR (or grayscale) frame.
+
+    The body holds the contiguous pixel bytes; the X-Frame-Shape header gives
+    "height,width[,channels]" and X-Frame-Dtype the element type. timestamp
+    is the capture time in seconds, the arrival time if not given.
+    """
+    dtype = request.headers.get("x-frame-dtype", "uint8")
+    try:
+        shape = tuple(int(dim) for dim in request.headers["x-frame-shape"].split(","))
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="X-Frame-Shape must be 'height,width[,channels]'")
+    if dtype not in RAW_DTYPES or len(shape) not in (2, 3) or (len(shape) == 3 and shape[2] != 3):
+        raise HTTPException(status_code=400, detail="Only uint8 grayscale or 3-channel BGR frames are supported")
+
+    body = await request.body()
+    if len(body) != int(np.prod(shape)) * np.dtype(dtype).itemsize:
+        raise HTTPException(status_code=400, detail=f"Body is {len(body)} bytes, expected {shape} {dtype}")
+    # Wraps the request body without copying it
+    frame = np.frombuffer(body, dtype=dtype).reshape(shape)
+
+    try:
+        results = await inference_pool.submit(f"upload-{camera_id or 'default'}", frame, timestamp)
+        if camera_id:
+            await publish_result(camera_id, results)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"Inference pool saturated: {e}")
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
 
+    return render(request, {
+        "status": "success",
+        "data": results
+    })
+
 @app.get("/socket-health")
 async def socket_health():
     return {
@@ -131,12 +413,178 @@ async def stop_stream(camera_id: int):
         return {"status": "success", "message": "Stream stopped"}
     return {"status": "error", "message": "Failed to stop stream"}
 
+@app.get("/stream/{camera_id}/mjpeg")
+async def stream_mjpeg(camera_id: int, fps: Optional[float] = Query(None, gt=0)):
+    preview = await camera_manager.open_preview(camera_id)
+    if preview is None:
+        raise HTTPException(status_code=404, detail="Camera not found")
+
+    async def body():
+        try:
+            async for jpeg in preview.frames(fps):
+                yield (
+                    f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n"
+                ).encode() + jpeg + b"\r\n"
+        finally:
+            # The viewer may have disconnected mid-frame; leave the preview regardless
+            await asyncio.shield(camera_manager.close_preview(camera_id, preview))
+
+    return StreamingResponse(
+        body(),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        headers={"Cache-Control": "no-cache, no-store"}
+    )
+
+@app.get("/previews")
+async def get_previews():
+    return {"previews": camera_manager.get_preview_stats()}
+
+@app.get("/streams")
+async def get_streams():
+    return {"streams": camera_manager.get_stream_stats()}
+
+@app.get("/database/stats")
+async def get_database_stats():
+    return db.get_stats()
+
+@app.get("/inference/stats")
+async def get_inference_stats():
+    return inference_pool.get_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Stage latency histograms, frame counters and queue gauges in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+def require_profiler():
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiler is disabled; set PROFILER_ENABLED=true")
+
+@app.post("/profiler/start")
+async def start_profiler(seconds: Optional[float] = None, interval_ms: Optional[float] = None):
+    """Start sampling the event loop thread"""
+    require_profiler()
+    profiler.start(seconds, interval_ms)
+    return profiler.get_stats()
+
+@app.post("/profiler/stop")
+async def stop_profiler():
+    require_profiler()
+    await asyncio.to_thread(profiler.stop)
+    return profiler.get_stats()
+
+@app.get("/profiler")
+async def get_profile(limit: Optional[int] = None):
+    """Sampled stacks in collapsed format, for flame graph tools"""
+    require_profiler()
+    return PlainTextResponse(profiler.collapsed(limit))
+
+@app.get("/profiler/stats")
+async def get_profiler_stats():
+    require_profiler()
+    return profiler.get_stats()
+
+@app.get("/realtime/stats")
+async def get_realtime_stats():
+    return hub.get_stats()
+
 @app.get("/camera/{camera_id}/snapshot")
-async def get_snapshot(camera_id: int):
-    snapshot = await camera_manager.get_snapshot(camera_id)
-    if snapshot:
-        return {"status": "success", "data": snapshot}
-    return {"status": "error", "message": "Failed to get snapshot"}
+async def get_snapshot(request: Request, camera_id: int, width: Optional[int] = None):
+    try:
+        snapshot = await camera_manager.get_snapshot(camera_id, width)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to get snapshot: {e}")
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Camera not found")
+
+    data, etag = snapshot
+    headers = {"ETag": etag, "Cache-Control": f"max-age={int(camera_manager.snapshots.ttl)}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(data, media_type="image/jpeg", headers=headers)
+
+@app.get("/camera/{camera_id}/roi")
+async def get_camera_roi(camera_id: int):
+    info = camera_manager.cameras.get(camera_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    return {"cameraId": camera_id, "roi": info["roi"]}
+
+@app.put("/camera/{camera_id}/roi")
+async def set_camera_roi(camera_id: int, config: RegionOfInterestConfig):
+    """Limit detection on a camera to polygons and rectangles normalized to 0-1"""
+    info = camera_manager.cameras.get(camera_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    roi = {"polygons": config.polygons, "rectangles": config.rectangles}
+    try:
+        check_roi(roi)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not roi["polygons"] and not roi["rectangles"]:
+        roi = None
+    await db.set_camera_roi(camera_id, roi)
+    info["roi"] = roi
+    apply_roi(camera_id, roi)
+    return {"cameraId": camera_id, "roi": roi}
+
+@app.delete("/camera/{camera_id}/roi")
+async def delete_camera_roi(camera_id: int):
+    info = camera_manager.cameras.get(camera_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    await db.set_camera_roi(camera_id, None)
+    info["roi"] = None
+    apply_roi(camera_id, None)
+    return {"status": "success", "message": "ROI removed"}
+
+@app.get("/snapshots/stats")
+async def get_snapshot_stats():
+    return camera_manager.snapshots.get_stats()
+
+@app.get("/clips/stats")
+async def get_clip_stats():
+    if clip_recorder is None:
+        return {"enabled": False}
+    return {"enabled": True, **clip_recorder.get_stats()}
+
+@app.get("/clips/{clip_path:path}")
+async def get_clip(clip_path: str):
+    """Download the event clip linked to an alert"""
+    if clip_recorder is None:
+        raise HTTPException(status_code=404, detail="Clip recording is disabled")
+    directory = os.path.realpath(clip_recorder.directory)
+    path = os.path.realpath(os.path.join(directory, clip_path))
+    if os.path.commonpath([directory, path]) != directory:
+        raise HTTPException(status_code=404, detail="Clip not found")
+    if not os.path.isfile(path):
+        if clip_path in clip_recorder.pending:
+            return JSONResponse(
+                {"status": "recording"},
+                status_code=202,
+                headers={"Retry-After": str(int(clip_recorder.post_seconds) + 1)}
+            )
+        raise HTTPException(status_code=404, detail="Clip not found")
+    return FileResponse(path, media_type="video/x-msvideo")
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Report ready only once every inference worker has a warm model"""
+    ready = inference_pool.ready and db.conn is not None
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "starting",
+        "inference": {
+            "warmup_seconds": inference_pool.warmup_seconds,
+            "load_errors": inference_pool.load_errors
+        },
+        "database": db.conn is not None
+    }
 
 @app.get("/health")
 async def health_check():
@@ -146,9 +594,10 @@ async def health_check():
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "services": {
-                "detector": detector is not None,
+                "detector": inference_pool.ready,
                 "database": db is not None,
                 "cameras": len(cameras),
+                "stale_cameras": sum(1 for camera in cameras if camera["stale"]),
                 "socketio": sio is not None
             }
         }
@@ -0,0 +1,184 @@
+# metrics.py
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from config import METRICS_LATENCY_BUCKETS
+
+Labels = Tuple[Tuple[str, str], ...]
+# A collect callback returns one unlabeled value, or (labels, value) pairs
+Collected = Union[float, Iterable[Tuple[dict, float]]]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _remove_matching(series: dict, labels: dict):
+    match = set(_labels(labels))
+    for key in [key for key in series if match <= set(key)]:
+        del series[key]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_sample(name: str, labels: Labels, value: float) -> str:
+    if labels:
+        name += "{" + ",".join(f'{key}="{_escape(label)}"' for key, label in labels) + "}"
+    if math.isinf(value):
+        text = "+Inf" if value > 0 else "-Inf"
+    elif float(value).is_integer():
+        text = str(int(value))
+    else:
+        text = repr(float(value))
+    return f"{name} {text}"
+
+class Metric:
+    """A named metric with one value per label set.
+
+    Values are either recorded as they happen or, when collect is given,
+    read from existing counters at scrape time.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, collect: Optional[Callable[[], Collected]] = None):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.values: Dict[Labels, float] = {}
+
+    def remove(self, **labels):
+        """Drop every series whose labels include the given ones, e.g. all series of a gone camera"""
+        _remove_matching(self.values, labels)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        if self.collect is None:
+            for labels, value in self.values.items():
+                yield self.name, labels, value
+            return
+        collected = self.collect()
+        if isinstance(collected, (int, float)):
+            yield self.name, (), float(collected)
+        else:
+            for labels, value in collected:
+                yield self.name, _labels(labels), float(value)
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[_labels(labels)] = value
+
+class Histogram(Metric):
+    """Cumulative latency histogram with fixed bucket bounds, in seconds"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: List[float] = METRICS_LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = sorted(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self.series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def remove(self, **labels):
+        _remove_matching(self.series, labels)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the time spent in a block, including when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, (counts, total, count) in self.series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + [math.inf], counts):
+                cumulative += bucket_count
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                yield f"{self.name}_bucket", labels + (("le", le),), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class MetricsRegistry:
+    """Process-wide set of metrics, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, collect: Optional[Callable[[], Collected]] = None) -> Counter:
+        return self.register(Counter(name, help, collect))
+
+    def gauge(self, name: str, help: str, collect: Optional[Callable[[], Collected]] = None) -> Gauge:
+        return self.register(Gauge(name, help, collect))
+
+    def histogram(self, name: str, help: str, buckets: List[float] = METRICS_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                print(f"Failed to collect metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(_format_sample(name, labels, value) for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+class StageTimer:
+    """Accumulate the time spent in named pipeline stages until it is taken.
+
+    Cheap enough to leave on for every frame: two perf_counter calls per
+    stage and no locking, since each detector is used by one process.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def take(self) -> Dict[str, float]:
+        """Return the accumulated stage times and start over"""
+        seconds, self.seconds = self.seconds, {}
+        return seconds
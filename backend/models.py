@@ -1,16 +1,63 @@
 # backend/models.py
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Union
 
 class DvrCredentials(BaseModel):
     ip: str
     username: str
     password: str
 
+class RegionOfInterestConfig(BaseModel):
+    """Areas of a camera's view that detection is limited to.
+
+    polygons are lists of [x, y] points and rectangles are [x1, y1, x2, y2],
+    all normalized to 0-1 of the frame width and height.
+    """
+    polygons: List[List[List[float]]] = []
+    rectangles: List[List[float]] = []
+
 class AlertData(BaseModel):
     camera_id: str
     timestamp: str
     alert_type: str
     confidence: float
     image_data: Optional[str] = None
-    metadata: Optional[dict] = None
\ No newline at end of file
+    metadata: Optional[dict] = None
+
+class SuspiciousActivity(BaseModel):
+    object_id: int
+    type: str
+    confidence: float
+    speed: Optional[float] = None
+    acceleration: Optional[float] = None
+    dwell_time: Optional[float] = None
+    zone: Optional[str] = None
+
+class AnalysisResult(BaseModel):
+    """Compact /analyze payload.
+
+    detections rows are [x, y, width, height, confidence, class_id] and
+    tracks rows are [id, x, y, width, height, confidence, class_id, speed,
+    dwell_time, missed], with center-based boxes in frame pixels and
+    class_id indexing into classes.
+    """
+    schema_version: int = Field(alias="schema")
+    classes: List[str]
+    detections: List[List[float]]
+    tracks: List[List[float]]
+    suspicious_activities: List[SuspiciousActivity]
+    detected: bool
+    skipped: bool
+    cadence: dict
+    motion: dict
+
+class AnalyzeResponse(BaseModel):
+    status: str
+    data: AnalysisResult
+
+class AnalysisError(BaseModel):
+    error: str
+
+class AnalyzeBatchResponse(BaseModel):
+    status: str
+    data: List[Union[AnalysisResult, AnalysisError]]
\ No newline at end of file
@@ -0,0 +1,107 @@
+# motion.py
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from config import (
+    MOTION_GATING,
+    MOTION_THRESHOLD,
+    MOTION_PIXEL_THRESHOLD,
+    MOTION_DOWNSCALE_WIDTH,
+    MOTION_METHOD
+)
+
+Region = Tuple[int, int, int, int]
+
+class MotionGate:
+    """Cheap motion check that lets static frames skip detection.
+
+    Works on a small blurred grayscale copy of each frame, using either
+    differencing against the previous frame or MOG2 background subtraction.
+    The motion score is the fraction of changed pixels.
+    """
+
+    def __init__(self, enabled: bool = MOTION_GATING,
+                 threshold: float = MOTION_THRESHOLD,
+                 pixel_threshold: int = MOTION_PIXEL_THRESHOLD,
+                 width: int = MOTION_DOWNSCALE_WIDTH,
+                 method: str = MOTION_METHOD):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.width = width
+        self.method = method
+        self.previous: Optional[np.ndarray] = None
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False) if method == "mog2" else None
+
+        self.frames = 0
+        self.skipped = 0
+        self.last_score = 1.0
+
+    def _mask(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], float]:
+        scale = self.width / frame.shape[1]
+        small = cv2.resize(frame, (self.width, max(1, int(frame.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+
+        if self.subtractor is not None:
+            mask = self.subtractor.apply(small)
+        else:
+            previous, self.previous = self.previous, small
+            if previous is None or previous.shape != small.shape:
+                return None, scale
+            _, mask = cv2.threshold(cv2.absdiff(small, previous), self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        return mask, scale
+
+    def check(self, frame: np.ndarray) -> Tuple[bool, List[Region]]:
+        """Check a frame for motion, returning whether to run detection and the motion regions"""
+        self.frames += 1
+        if not self.enabled:
+            return True, []
+
+        mask, scale = self._mask(frame)
+        if mask is None:
+            # Nothing to compare against yet
+            self.last_score = 1.0
+            return True, []
+
+        self.last_score = cv2.countNonZero(mask) / mask.size
+        if self.last_score < self.threshold:
+            self.skipped += 1
+            return False, []
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            regions.append((
+                int(x / scale), int(y / scale),
+                int((x + w) / scale), int((y + h) / scale)
+            ))
+        return True, regions
+
+    def get_stats(self) -> dict:
+        """Get skip counters for this camera"""
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "last_score": round(self.last_score, 4),
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_rate": self.skipped / self.frames if self.frames else 0.0
+        }
+
+def merge_regions(regions: List[Region], frame_shape, padding: float = 0.1) -> Optional[Region]:
+    """Merge motion regions into one padded crop that stays inside the frame"""
+    if not regions:
+        return None
+    boxes = np.array(regions)
+    x1, y1 = boxes[:, :2].min(axis=0)
+    x2, y2 = boxes[:, 2:].max(axis=0)
+    pad_x, pad_y = int((x2 - x1) * padding), int((y2 - y1) * padding)
+    height, width = frame_shape[:2]
+    return (
+        max(0, int(x1) - pad_x), max(0, int(y1) - pad_y),
+        min(width, int(x2) + pad_x), min(height, int(y2) + pad_y)
+    )
@@ -0,0 +1,183 @@
+# movement.py
+import json
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from config import (
+    MOVEMENT_HISTORY,
+    MOVEMENT_SPEED_THRESHOLD,
+    LOITER_SECONDS,
+    LOITER_RADIUS,
+    MOVEMENT_ZONES
+)
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Even-odd test of many (x, y) points against one polygon at once"""
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    x, y = points[:, 0:1], points[:, 1:2]
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(polygon, -1, axis=0).T
+    straddles = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing_x = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+    return (straddles & (x < crossing_x)).sum(axis=1) % 2 == 1
+
+def load_zones(raw: Optional[str] = MOVEMENT_ZONES) -> Dict[str, np.ndarray]:
+    """Parse zones from a JSON object mapping zone names to [[x, y], ...] polygons"""
+    if not raw:
+        return {}
+    return {name: np.array(polygon, dtype=np.float32) for name, polygon in json.loads(raw).items()}
+
+class MovementAnalyzer:
+    """Per-track trajectory history and rule evaluation.
+
+    Each live track owns a row in fixed-size ring buffers of positions and
+    timestamps. Every update writes the new centers and evaluates all rules
+    for all tracks in one vectorized pass:
+
+    - rapid_movement: speed above the threshold, in pixels per second
+    - loitering: present for LOITER_SECONDS while staying within LOITER_RADIUS
+    - zone_enter / zone_exit: track center crossed a zone boundary
+    """
+
+    def __init__(self, history: int = MOVEMENT_HISTORY,
+                 speed_threshold: float = MOVEMENT_SPEED_THRESHOLD,
+                 loiter_seconds: float = LOITER_SECONDS,
+                 loiter_radius: float = LOITER_RADIUS,
+                 zones: Optional[Dict[str, np.ndarray]] = None):
+        self.history = history
+        self.speed_threshold = speed_threshold
+        self.loiter_seconds = loiter_seconds
+        self.loiter_radius = loiter_radius
+        zones = zones if zones is not None else load_zones()
+        self.zone_names = list(zones.keys())
+        self.zone_polygons = list(zones.values())
+
+        self.rows: Dict[int, int] = {}
+        self.free_rows: List[int] = []
+        self.positions = np.zeros((0, history, 2), dtype=np.float32)
+        self.times = np.zeros((0, history), dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.first_seen = np.zeros(0, dtype=np.float64)
+        self.in_zone = np.zeros((0, len(self.zone_names)), dtype=bool)
+        self.loitering = np.zeros(0, dtype=bool)
+
+        # Kinematics from the last update, aligned with the ids passed in
+        self.speed = np.zeros(0, dtype=np.float32)
+        self.acceleration = np.zeros(0, dtype=np.float32)
+        self.dwell_time = np.zeros(0, dtype=np.float32)
+
+    def _grow(self):
+        old = len(self.counts)
+        extra = max(16, old)
+        self.positions = np.concatenate([self.positions, np.zeros((extra, self.history, 2), dtype=np.float32)])
+        self.times = np.concatenate([self.times, np.zeros((extra, self.history))])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        self.first_seen = np.concatenate([self.first_seen, np.zeros(extra)])
+        self.in_zone = np.concatenate([self.in_zone, np.zeros((extra, len(self.zone_names)), dtype=bool)])
+        self.loitering = np.concatenate([self.loitering, np.zeros(extra, dtype=bool)])
+        self.free_rows.extend(range(old + extra - 1, old - 1, -1))
+
+    def _assign_rows(self, ids: np.ndarray, timestamp: float) -> np.ndarray:
+        live = set(int(track_id) for track_id in ids)
+        for track_id in [track_id for track_id in self.rows if track_id not in live]:
+            row = self.rows.pop(track_id)
+            self.counts[row] = 0
+            self.in_zone[row] = False
+            self.loitering[row] = False
+            self.free_rows.append(row)
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        for i, track_id in enumerate(ids):
+            row = self.rows.get(int(track_id))
+            if row is None:
+                if not self.free_rows:
+                    self._grow()
+                row = self.rows[int(track_id)] = self.free_rows.pop()
+                self.first_seen[row] = timestamp
+            rows[i] = row
+        return rows
+
+    def update(self, ids: np.ndarray, boxes: np.ndarray, confidences: np.ndarray,
+               timestamp: Optional[float] = None) -> List[dict]:
+        """Record the current corner boxes of all tracks and return triggered activities.
+
+        timestamp is when the frame was captured, in seconds on any clock
+        that is consistent for the stream; it defaults to now, which only
+        holds when frames are analyzed as they arrive.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        rows = self._assign_rows(ids, timestamp)
+        if len(rows) == 0:
+            self.speed = self.acceleration = self.dwell_time = np.zeros(0, dtype=np.float32)
+            return []
+
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        slot = self.counts[rows] % self.history
+        self.positions[rows, slot] = centers
+        self.times[rows, slot] = timestamp
+        self.counts[rows] += 1
+        counts = self.counts[rows]
+
+        # Last three samples of every track, straight from the ring buffers
+        h = self.history
+        p0, t0 = centers, np.full(len(rows), timestamp)
+        p1, t1 = self.positions[rows, (counts - 2) % h], self.times[rows, (counts - 2) % h]
+        p2, t2 = self.positions[rows, (counts - 3) % h], self.times[rows, (counts - 3) % h]
+
+        # A sample without a positive time step since the previous one has no measurable speed
+        has_velocity = (counts >= 2) & (t0 > t1)
+        has_prev_velocity = has_velocity & (counts >= 3) & (t1 > t2)
+        dt1 = np.maximum(t0 - t1, 1e-6)
+        dt2 = np.maximum(t1 - t2, 1e-6)
+        velocity = np.where(has_velocity[:, None], (p0 - p1) / dt1[:, None], 0)
+        prev_velocity = np.where(has_prev_velocity[:, None], (p1 - p2) / dt2[:, None], 0)
+        self.speed = np.linalg.norm(velocity, axis=1).astype(np.float32)
+        self.acceleration = np.where(
+            has_prev_velocity, np.linalg.norm(velocity - prev_velocity, axis=1) / dt1, 0
+        ).astype(np.float32)
+        self.dwell_time = (timestamp - self.first_seen[rows]).astype(np.float32)
+
+        activities = []
+
+        rapid = self.speed > self.speed_threshold
+        for i in np.flatnonzero(rapid):
+            activities.append({
+                'object_id': int(ids[i]),
+                'type': 'rapid_movement',
+                'confidence': float(confidences[i]),
+                'speed': float(self.speed[i]),
+                'acceleration': float(self.acceleration[i])
+            })
+
+        # Loitering: long dwell while every stored position stays near the current one
+        valid = np.arange(h)[None, :] < np.minimum(counts, h)[:, None]
+        spread = np.linalg.norm(self.positions[rows] - p0[:, None, :], axis=2)
+        spread = np.where(valid, spread, 0).max(axis=1)
+        loitering = (self.dwell_time >= self.loiter_seconds) & (spread <= self.loiter_radius)
+        for i in np.flatnonzero(loitering & ~self.loitering[rows]):
+            activities.append({
+                'object_id': int(ids[i]),
+                'type': 'loitering',
+                'confidence': float(confidences[i]),
+                'dwell_time': float(self.dwell_time[i])
+            })
+        self.loitering[rows] = loitering
+
+        if self.zone_names:
+            inside = np.stack([points_in_polygon(p0, polygon) for polygon in self.zone_polygons], axis=1)
+            # A brand-new track has no previous side of the boundary to cross from
+            previous = np.where((counts >= 2)[:, None], self.in_zone[rows], inside)
+            for event, changed in (('zone_enter', inside & ~previous), ('zone_exit', ~inside & previous)):
+                for i, z in zip(*np.nonzero(changed)):
+                    activities.append({
+                        'object_id': int(ids[i]),
+                        'type': event,
+                        'confidence': float(confidences[i]),
+                        'zone': self.zone_names[z]
+                    })
+            self.in_zone[rows] = inside
+
+        return activities
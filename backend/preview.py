@@ -0,0 +1,119 @@
+# preview.py
+import asyncio
+from typing import AsyncIterator, Optional
+
+from ingest import IngestWorker
+from config import PREVIEW_MAX_FPS, PREVIEW_QUALITY, PREVIEW_WIDTH
+
+MJPEG_BOUNDARY = "frame"
+
+def encode_preview(frame, quality: int, width: int) -> bytes:
+    """JPEG-encode a frame for preview, downscaled to width when it is wider"""
+    import cv2
+
+    if width and frame.shape[1] > width:
+        height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode preview frame")
+    return encoded.tobytes()
+
+class PreviewStream:
+    """Live JPEG preview of one ingest worker, shared by all its viewers.
+
+    The newest captured frame is encoded at most max_fps times a second,
+    once for everyone. Each viewer always receives the newest encoded frame
+    when it is ready for one, so slow viewers skip frames instead of
+    queueing them.
+    """
+
+    def __init__(self, worker: IngestWorker,
+                 max_fps: float = PREVIEW_MAX_FPS,
+                 quality: int = PREVIEW_QUALITY,
+                 width: int = PREVIEW_WIDTH):
+        self.worker = worker
+        self.max_fps = max_fps
+        self.quality = quality
+        self.width = width
+        self.task: Optional[asyncio.Task] = None
+        self.condition = asyncio.Condition()
+        self.closed = False
+
+        self.jpeg: Optional[bytes] = None
+        self.seq = 0
+        self.source_seq = None
+        self.viewers = 0
+
+        self.frames_encoded = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+    async def start(self):
+        """Start the shared encode loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop encoding and end every viewer's stream"""
+        self.closed = True
+        async with self.condition:
+            self.condition.notify_all()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.max_fps
+        while True:
+            started = loop.time()
+            frame, seq = self.worker.latest_frame, self.worker.frames_read
+            if frame is not None and seq != self.source_seq:
+                try:
+                    jpeg = await asyncio.to_thread(encode_preview, frame, self.quality, self.width)
+                except Exception as e:
+                    print(f"Preview encode failed for channel {self.worker.channel}: {e}")
+                else:
+                    self.jpeg, self.source_seq = jpeg, seq
+                    self.seq += 1
+                    self.frames_encoded += 1
+                    async with self.condition:
+                        self.condition.notify_all()
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def frames(self, max_fps: Optional[float] = None) -> AsyncIterator[bytes]:
+        """Yield the newest encoded frame whenever the viewer is ready for one"""
+        min_interval = 1.0 / max_fps if max_fps else 0.0
+        loop = asyncio.get_running_loop()
+        last_seq, last_sent = 0, 0.0
+        while not self.closed:
+            async with self.condition:
+                await self.condition.wait_for(lambda: self.seq > last_seq or self.closed)
+            if self.closed:
+                return
+
+            if min_interval:
+                delay = last_sent + min_interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if last_seq:
+                self.frames_skipped += self.seq - last_seq - 1
+            last_seq, last_sent = self.seq, loop.time()
+            self.frames_sent += 1
+            yield self.jpeg
+
+    def get_stats(self) -> dict:
+        """Get viewer and frame counters"""
+        return {
+            "channel": self.worker.channel,
+            "viewers": self.viewers,
+            "max_fps": self.max_fps,
+            "frames_encoded": self.frames_encoded,
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped
+        }
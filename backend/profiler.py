@@ -0,0 +1,107 @@
+# profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from config import PROFILER_INTERVAL_MS, PROFILER_MAX_SECONDS
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class SamplingProfiler:
+    """Statistical profiler for one thread, normally the event loop.
+
+    A daemon thread records the target thread's Python stack every
+    interval_ms while running, so the overhead is one stack walk per
+    sample and nothing when stopped. Stacks are kept in the collapsed
+    "outer;...;inner count" format that flame graph tools read.
+    """
+
+    def __init__(self, interval_ms: float = PROFILER_INTERVAL_MS,
+                 max_seconds: float = PROFILER_MAX_SECONDS):
+        self.interval = interval_ms / 1000.0
+        self.max_seconds = max_seconds
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.target: Optional[int] = None
+
+        self.stacks: Counter = Counter()
+        self.lock = threading.Lock()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, seconds: Optional[float] = None, interval_ms: Optional[float] = None,
+              thread_id: Optional[int] = None):
+        """Start sampling the calling thread (or thread_id), discarding earlier samples.
+
+        Sampling stops by itself after seconds, capped at max_seconds, so a
+        forgotten profile does not run forever.
+        """
+        self.stop()
+        if interval_ms:
+            self.interval = interval_ms / 1000.0
+        self.target = thread_id or threading.get_ident()
+        with self.lock:
+            self.stacks.clear()
+            self.samples = 0
+        self.started_at, self.stopped_at = time.time(), None
+        self.stop_event.clear()
+        duration = min(seconds or self.max_seconds, self.max_seconds)
+        self.thread = threading.Thread(target=self._run, args=(duration,), name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling, keeping the collected stacks"""
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def _run(self, duration: float):
+        deadline = time.monotonic() + duration
+        while not self.stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            with self.lock:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+        self.stopped_at = time.time()
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        """Sampled stacks in collapsed format, most frequent first"""
+        with self.lock:
+            stacks = self.stacks.most_common(limit)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def get_stats(self) -> dict:
+        """Get sampling state and the most frequent leaf functions"""
+        leaves = Counter()
+        with self.lock:
+            samples = self.samples
+            for stack, count in self.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000.0,
+            "samples": samples,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "top": [
+                {"function": name, "samples": count, "share": round(count / samples, 4)}
+                for name, count in leaves.most_common(20)
+            ] if samples else []
+        }
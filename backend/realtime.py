@@ -0,0 +1,168 @@
+# realtime.py
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set
+
+import socketio
+from config import REALTIME_TICK_MS, REALTIME_MAX_BACKLOG, REALTIME_MAX_CAMERAS
+
+NAMESPACE = '/'
+
+def camera_room(camera) -> str:
+    """Socket.IO room name for a camera"""
+    return f"camera-{camera}"
+
+class RealtimeHub:
+    """Push per-camera updates to subscribed Socket.IO clients.
+
+    Producers only record state; a tick loop sends it. Detection summaries
+    and camera status are coalesced to the latest value per camera and sent
+    as one 'camera_update' per room per tick, while alerts are queued and
+    all delivered, in one 'alerts' event per room per tick. A client whose outgoing queue is longer than max_backlog
+    is skipped and gets the latest state once it has caught up, instead of
+    every update in between. Upload camera ids are chosen by clients, so
+    state is only kept for the max_cameras most recently updated cameras.
+    """
+
+    def __init__(self, sio: socketio.AsyncServer,
+                 tick_ms: float = REALTIME_TICK_MS,
+                 max_backlog: int = REALTIME_MAX_BACKLOG,
+                 max_cameras: int = REALTIME_MAX_CAMERAS):
+        self.sio = sio
+        self.interval = tick_ms / 1000.0
+        self.max_backlog = max_backlog
+        self.max_cameras = max_cameras
+        self.task: Optional[asyncio.Task] = None
+
+        # Latest update per camera, least recently updated first
+        self.state: Dict[str, dict] = {}
+        self.dirty: Set[str] = set()
+        self.pending_alerts: Dict[str, List[dict]] = {}
+        # Clients that missed the latest state of a camera while backlogged
+        self.lagging: Dict[str, Set[str]] = {}
+
+        self.ticks = 0
+        self.updates_sent = 0
+        self.alerts_sent = 0
+        self.coalesced = 0
+
+    async def start(self):
+        """Start the emit loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the emit loop"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Realtime flush failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def publish_detections(self, camera, summary: dict):
+        """Record the latest detection summary for a camera"""
+        self._set_state(str(camera), 'detections', summary)
+
+    def publish_status(self, camera, status: dict):
+        """Record a camera status change"""
+        self._set_state(str(camera), 'status', status)
+
+    def publish_alert(self, camera, alert: dict):
+        """Queue an alert for delivery on the next tick"""
+        self.pending_alerts.setdefault(str(camera), []).append(alert)
+
+    def _set_state(self, camera: str, key: str, value: dict):
+        state = self.state.pop(camera, None) or {'camera': camera}
+        state[key] = value
+        self.state[camera] = state
+        self.dirty.add(camera)
+        while len(self.state) > self.max_cameras:
+            self._forget_camera(next(iter(self.state)))
+
+    def _forget_camera(self, camera: str):
+        del self.state[camera]
+        self.dirty.discard(camera)
+        self.lagging.pop(camera, None)
+
+    async def subscribe(self, sid: str, cameras: Iterable) -> List[str]:
+        """Add a client to camera rooms and send it their current state"""
+        cameras = [str(camera) for camera in cameras]
+        for camera in cameras:
+            await self.sio.enter_room(sid, camera_room(camera))
+            if camera in self.state:
+                await self.sio.emit('camera_update', self.state[camera], to=sid)
+        return cameras
+
+    async def unsubscribe(self, sid: str, cameras: Iterable) -> List[str]:
+        """Remove a client from camera rooms"""
+        cameras = [str(camera) for camera in cameras]
+        for camera in cameras:
+            await self.sio.leave_room(sid, camera_room(camera))
+            self.lagging.get(camera, set()).discard(sid)
+        return cameras
+
+    def forget(self, sid: str):
+        """Drop coalescing state for a disconnected client"""
+        for sids in self.lagging.values():
+            sids.discard(sid)
+
+    def _backlog(self, eio_sid: str) -> int:
+        socket = self.sio.eio.sockets.get(eio_sid)
+        return socket.queue.qsize() if socket is not None else 0
+
+    async def flush(self):
+        """Send everything recorded since the previous tick"""
+        self.ticks += 1
+        dirty, self.dirty = self.dirty, set()
+        alerts, self.pending_alerts = self.pending_alerts, {}
+
+        for camera, camera_alerts in alerts.items():
+            # Oldest first, one encode and one packet per client for the whole tick
+            await self.sio.emit('alerts', {'type': 'alerts', 'alerts': camera_alerts}, room=camera_room(camera))
+            self.alerts_sent += len(camera_alerts)
+
+        for camera in dirty | {camera for camera, sids in self.lagging.items() if sids}:
+            room = camera_room(camera)
+            lagging = self.lagging.get(camera, set())
+            behind, caught_up = [], []
+            for sid, eio_sid in self.sio.manager.get_participants(NAMESPACE, room):
+                if self._backlog(eio_sid) > self.max_backlog:
+                    behind.append(sid)
+                elif sid in lagging:
+                    caught_up.append(sid)
+
+            update = self.state[camera]
+            if camera in dirty:
+                # One encode for the whole room, skipping backlogged clients
+                await self.sio.emit('camera_update', update, room=room, skip_sid=behind)
+                self.updates_sent += 1
+            else:
+                for sid in caught_up:
+                    await self.sio.emit('camera_update', update, to=sid)
+                    self.updates_sent += 1
+            self.coalesced += len(behind)
+            if behind:
+                self.lagging[camera] = set(behind)
+            else:
+                self.lagging.pop(camera, None)
+
+    def get_stats(self) -> dict:
+        """Get emit and coalescing counters"""
+        return {
+            "tick_ms": self.interval * 1000.0,
+            "ticks": self.ticks,
+            "cameras": len(self.state),
+            "updates_sent": self.updates_sent,
+            "alerts_sent": self.alerts_sent,
+            "coalesced": self.coalesced,
+            "lagging_clients": sum(len(sids) for sids in self.lagging.values())
+        }
@@ -0,0 +1,106 @@
+# roi.py
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from movement import points_in_polygon
+from config import ROI_CROP_PADDING, ROI_MAX_TILES
+
+# Polygons of (x, y) points normalized to 0-1 of the frame width and height.
+# Tuples so the shapes compare cheaply and travel to inference workers as is.
+RoiShapes = Tuple[Tuple[Tuple[float, float], ...], ...]
+# Crop box (x1, y1, x2, y2) in pixels, as in motion.py
+Region = Tuple[int, int, int, int]
+
+def roi_shapes(config: Optional[dict]) -> Optional[RoiShapes]:
+    """Turn a stored {"polygons": [...], "rectangles": [...]} config into polygons"""
+    if not config:
+        return None
+    shapes = [tuple((float(x), float(y)) for x, y in polygon) for polygon in config.get("polygons") or []]
+    for x1, y1, x2, y2 in config.get("rectangles") or []:
+        shapes.append(((x1, y1), (x2, y1), (x2, y2), (x1, y2)))
+    return tuple(shapes) or None
+
+def check_roi(config: dict):
+    """Raise ValueError unless every shape is inside the 0-1 frame and not degenerate"""
+    for polygon in config.get("polygons") or []:
+        if len(polygon) < 3 or any(len(point) != 2 for point in polygon):
+            raise ValueError("Polygons need at least 3 [x, y] points")
+        if not all(0 <= value <= 1 for point in polygon for value in point):
+            raise ValueError("Polygon points must be normalized to 0-1")
+    for rectangle in config.get("rectangles") or []:
+        if len(rectangle) != 4:
+            raise ValueError("Rectangles must be [x1, y1, x2, y2]")
+        x1, y1, x2, y2 = rectangle
+        if not (0 <= x1 < x2 <= 1 and 0 <= y1 < y2 <= 1):
+            raise ValueError("Rectangles must satisfy 0 <= x1 < x2 <= 1 and 0 <= y1 < y2 <= 1")
+
+def _merge_boxes(boxes: List[list]) -> List[list]:
+    # Join overlapping boxes until none overlap, so no pixel is inferred twice
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    boxes[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+class RegionOfInterest:
+    """Areas of one camera's view that detection runs on.
+
+    Shapes are normalized, so they hold at any decode size; their pixel
+    polygons and crop tiles are computed once per frame size. Each tile is
+    a shape's bounding box, padded so objects crossing the edge are seen
+    whole; overlapping tiles are merged, and too many tiles collapse into
+    one box around all of them to keep the number of model inputs bounded.
+    """
+
+    def __init__(self, shapes: RoiShapes, padding: int = ROI_CROP_PADDING, max_tiles: int = ROI_MAX_TILES):
+        self.shapes = shapes
+        self.padding = padding
+        self.max_tiles = max_tiles
+        self._geometry: Dict[Tuple[int, int], Tuple[List[np.ndarray], List[Region]]] = {}
+
+    def _for_shape(self, frame_shape) -> Tuple[List[np.ndarray], List[Region]]:
+        height, width = frame_shape[:2]
+        geometry = self._geometry.get((height, width))
+        if geometry is None:
+            scale = np.array([width, height], dtype=np.float32)
+            polygons = [np.array(shape, dtype=np.float32) * scale for shape in self.shapes]
+            boxes = _merge_boxes([
+                [max(0, int(polygon[:, 0].min()) - self.padding), max(0, int(polygon[:, 1].min()) - self.padding),
+                 min(width, int(np.ceil(polygon[:, 0].max())) + self.padding),
+                 min(height, int(np.ceil(polygon[:, 1].max())) + self.padding)]
+                for polygon in polygons
+            ])
+            if len(boxes) > self.max_tiles:
+                corners = np.array(boxes)
+                boxes = [[*corners[:, :2].min(axis=0), *corners[:, 2:].max(axis=0)]]
+            tiles = [tuple(int(v) for v in box) for box in boxes if box[2] > box[0] and box[3] > box[1]]
+            geometry = self._geometry[(height, width)] = (polygons, tiles)
+        return geometry
+
+    def tiles(self, frame_shape, hint: Optional[Region] = None) -> List[Region]:
+        """Crops to run the detector on, narrowed to the motion hint when there is one"""
+        tiles = self._for_shape(frame_shape)[1]
+        if hint is None:
+            return tiles
+        narrowed = []
+        for x1, y1, x2, y2 in tiles:
+            box = (max(x1, hint[0]), max(y1, hint[1]), min(x2, hint[2]), min(y2, hint[3]))
+            if box[2] > box[0] and box[3] > box[1]:
+                narrowed.append(box)
+        return narrowed
+
+    def contains(self, points: np.ndarray, frame_shape) -> np.ndarray:
+        """Whether each (x, y) pixel point lies inside any of the shapes"""
+        inside = np.zeros(len(points), dtype=bool)
+        for polygon in self._for_shape(frame_shape)[0]:
+            inside |= points_in_polygon(points, polygon)
+        return inside
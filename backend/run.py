@@ -7,5 +7,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        workers=4
-    )
\ No newline at end of file
+        # Cameras, streams and Socket.IO rooms live in this one process;
+        # detection scales across cores through INFERENCE_WORKERS instead
+        workers=1
+    )
@@ -0,0 +1,114 @@
+# schema.py
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Internal hot-loop representations: one structured row per detection or track,
+# boxes in corner form, class names interned to integer ids
+DETECTION_DTYPE = np.dtype([
+    ('x1', '<f4'), ('y1', '<f4'), ('x2', '<f4'), ('y2', '<f4'),
+    ('confidence', '<f4'),
+    ('class_id', '<i4')
+])
+
+TRACK_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('x1', '<f4'), ('y1', '<f4'), ('x2', '<f4'), ('y2', '<f4'),
+    ('confidence', '<f4'),
+    ('class_id', '<i4'),
+    ('hits', '<i4'),
+    ('missed', '<i4'),
+    ('speed', '<f4'),
+    ('dwell_time', '<f4')
+])
+
+# Wire format version and column order of the compact /analyze schema
+SCHEMA_VERSION = 1
+DETECTION_FIELDS = ['x', 'y', 'width', 'height', 'confidence', 'class_id']
+TRACK_FIELDS = ['id', 'x', 'y', 'width', 'height', 'confidence', 'class_id', 'speed', 'dwell_time', 'missed']
+
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+class ClassRegistry:
+    """Interns class names to small integer ids"""
+
+    def __init__(self, names: List[str] = None):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for name in names or []:
+            self.id_for(name)
+
+    def id_for(self, name: str) -> int:
+        class_id = self.ids.get(name)
+        if class_id is None:
+            class_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return class_id
+
+def predictions_to_array(predictions: list, classes: ClassRegistry,
+                         offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """Convert center-based prediction dicts into a detection array, shifted by offset"""
+    detections = np.empty(len(predictions), dtype=DETECTION_DTYPE)
+    if not len(predictions):
+        return detections
+
+    values = np.array([
+        [pred['x'], pred['y'], pred['width'], pred['height'], pred['confidence']]
+        for pred in predictions
+    ], dtype=np.float32)
+    cx, cy = values[:, 0] + offset[0], values[:, 1] + offset[1]
+    half_w, half_h = values[:, 2] / 2, values[:, 3] / 2
+    detections['x1'], detections['y1'] = cx - half_w, cy - half_h
+    detections['x2'], detections['y2'] = cx + half_w, cy + half_h
+    detections['confidence'] = values[:, 4]
+    detections['class_id'] = [classes.id_for(pred['class']) for pred in predictions]
+    return detections
+
+def corner_boxes(rows: np.ndarray) -> np.ndarray:
+    """Get an (n, 4) float array of corner boxes from detection or track rows"""
+    return np.stack([rows['x1'], rows['y1'], rows['x2'], rows['y2']], axis=1)
+
+def _center_columns(rows: np.ndarray, scale: float = 1.0) -> List[np.ndarray]:
+    width, height = rows['x2'] - rows['x1'], rows['y2'] - rows['y1']
+    return [column * scale for column in (rows['x1'] + width / 2, rows['y1'] + height / 2, width, height)]
+
+def encode_result(result: dict, classes: List[str], scale: float = 1.0) -> dict:
+    """Convert an internal frame result into the compact /analyze schema.
+
+    Detections and tracks become lists of rows in DETECTION_FIELDS and
+    TRACK_FIELDS order, with center-based boxes and class ids indexing
+    into 'classes'. Boxes, speeds and accelerations, of tracks and of
+    suspicious activities alike, are multiplied by scale, for frames that
+    were analyzed below their original resolution.
+    """
+    detections, tracks = result['detections'], result['tracks']
+    detection_rows = np.stack(
+        _center_columns(detections, scale) + [detections['confidence'], detections['class_id']], axis=1
+    ).astype(np.float64).round(2) if len(detections) else np.empty((0, len(DETECTION_FIELDS)))
+    track_rows = np.stack(
+        [tracks['id']] + _center_columns(tracks, scale) + [
+            tracks['confidence'], tracks['class_id'], tracks['speed'] * scale, tracks['dwell_time'], tracks['missed']
+        ], axis=1
+    ).astype(np.float64).round(2) if len(tracks) else np.empty((0, len(TRACK_FIELDS)))
+
+    encoded = {key: value for key, value in result.items() if key not in ('detections', 'tracks')}
+    encoded.update({
+        'schema': SCHEMA_VERSION,
+        'classes': classes,
+        'detections': [
+            row[:4] + [row[4], int(row[5])] for row in detection_rows.tolist()
+        ],
+        'tracks': [
+            [int(row[0])] + row[1:6] + [int(row[6]), row[7], row[8], int(row[9])] for row in track_rows.tolist()
+        ]
+    })
+    if 'suspicious_activities' in result:
+        encoded['suspicious_activities'] = [
+            {**activity, **{key: activity[key] * scale for key in ('speed', 'acceleration') if key in activity}}
+            for activity in result['suspicious_activities']
+        ]
+    return encoded
+
+def wants_msgpack(accept: str) -> bool:
+    """Check whether an Accept header asks for the binary msgpack encoding"""
+    return any(media_type in (accept or '') for media_type in MSGPACK_MEDIA_TYPES)
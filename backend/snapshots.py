@@ -0,0 +1,122 @@
+# snapshots.py
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from config import SNAPSHOT_TTL, SNAPSHOT_THUMBNAIL_WIDTHS, SNAPSHOT_THUMBNAIL_QUALITY
+
+Snapshot = Tuple[bytes, str]
+
+def make_etag(data: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+def make_thumbnail(data: bytes, width: int, quality: int) -> bytes:
+    """Downscale a JPEG to the given width, keeping its aspect ratio"""
+    import cv2
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode snapshot")
+    height = max(1, round(image.shape[0] * width / image.shape[1]))
+    thumbnail = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode('.jpg', thumbnail, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode thumbnail")
+    return encoded.tobytes()
+
+class SnapshotCache:
+    """Per-channel snapshot cache with a short TTL.
+
+    Concurrent requests for the same channel share one upstream fetch, and
+    thumbnails are derived from the cached snapshot once per fetch.
+    """
+
+    def __init__(self, fetch: Callable[[int], Awaitable[Optional[bytes]]],
+                 ttl: float = SNAPSHOT_TTL,
+                 thumbnail_widths=SNAPSHOT_THUMBNAIL_WIDTHS,
+                 thumbnail_quality: int = SNAPSHOT_THUMBNAIL_QUALITY):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.thumbnail_widths = set(thumbnail_widths)
+        self.thumbnail_quality = thumbnail_quality
+        # channel -> (fetched_at, {width or 0: (data, etag)})
+        self.entries: Dict[int, Tuple[float, Dict[int, Snapshot]]] = {}
+        self.inflight: Dict[tuple, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def clear(self):
+        """Drop all cached snapshots"""
+        self.entries.clear()
+
+    async def get(self, channel: int, width: Optional[int] = None) -> Optional[Snapshot]:
+        """Get the (JPEG bytes, ETag) of a channel's snapshot, optionally as a thumbnail"""
+        if width is not None and width not in self.thumbnail_widths:
+            raise ValueError(f"Unsupported thumbnail width: {width}")
+
+        entry = self.entries.get(channel)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.misses += 1
+            entry = await self._shared(('fetch', channel), lambda: self._refresh(channel))
+            if entry is None:
+                return None
+        else:
+            self.hits += 1
+
+        variants = entry[1]
+        key = width or 0
+        if key not in variants:
+            original = variants[0][0]
+            data = await self._shared(
+                ('thumbnail', channel, key, id(variants)),
+                lambda: asyncio.to_thread(make_thumbnail, original, width, self.thumbnail_quality)
+            )
+            variants[key] = (data, make_etag(data))
+        return variants[key]
+
+    async def _refresh(self, channel: int):
+        data = await self.fetch(channel)
+        if not data:
+            return None
+        entry = (time.monotonic(), {0: (data, make_etag(data))})
+        self.entries[channel] = entry
+        return entry
+
+    async def _shared(self, key: tuple, factory):
+        # Callers asking for the same key while it is in flight await the same future
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await factory()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+
+    def get_stats(self) -> dict:
+        """Get cache hit and coalescing counters"""
+        return {
+            "ttl": self.ttl,
+            "channels": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced
+        }
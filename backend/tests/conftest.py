@@ -0,0 +1,68 @@
+# conftest.py
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+# Tests never reach a hosted model; the stub backend stands in for detection
+os.environ.setdefault("DETECTION_BACKEND", "stub")
+os.environ.setdefault("STUB_DETECTOR_COST_MS", "0")
+os.environ.setdefault("INFERENCE_WORKERS", "1")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Backend modules import each other by their flat names
+sys.path.insert(0, BACKEND_DIR)
+
+@pytest.fixture
+def video_file(tmp_path):
+    """Write a short MJPG video of changing gray frames and return its path"""
+    def write(frames: int = 20, width: int = 320, height: int = 240, fps: float = 50) -> str:
+        import cv2
+
+        path = str(tmp_path / "video.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+        for i in range(frames):
+            writer.write(np.full((height, width, 3), i * 10 % 255, np.uint8))
+        writer.release()
+        return path
+    return write
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """The API with its startup run once, on a throwaway database"""
+    from fastapi.testclient import TestClient
+    import main
+
+    main.db.db_path = str(tmp_path_factory.mktemp("db") / "security.db")
+    with TestClient(main.app) as client:
+        for _ in range(300):
+            if main.inference_pool.ready:
+                break
+            time.sleep(0.1)
+        yield client
+
+@pytest.fixture(scope="session")
+def fake_dvr_address():
+    """host:port of a fake DVR with 2 channels, served from its own process for the API client"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_dvr", "--port", str(port), "--channels", "2", "--latency", "0"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield f"127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
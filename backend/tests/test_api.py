@@ -0,0 +1,74 @@
+# test_api.py
+import numpy as np
+from benchmarks.frames import encode_jpeg, synthetic_frames
+from config import ANALYZE_MAX_BATCH
+
+def test_alerts_rejects_bad_filters(client):
+    response = client.get("/alerts", params={"since": "yesterday"})
+    assert response.status_code == 400
+    assert "Invalid timestamp" in response.json()["detail"]
+    assert client.get("/alerts", params={"cursor": "%%%"}).status_code == 400
+
+    response = client.get("/alerts", params={"since": "2024-01-01T00:00:00Z", "limit": 5})
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+
+def test_alert_stats_rejects_bad_filters(client):
+    assert client.get("/alerts/stats", params={"granularity": "week"}).status_code == 400
+    assert client.get("/alerts/stats", params={"until": "later"}).status_code == 400
+    response = client.get("/alerts/stats", params={"granularity": "day", "since": "2024-01-01T00:00:00+02:00"})
+    assert response.status_code == 200
+    assert response.json()["granularity"] == "day"
+
+def test_snapshot_conditional_get(client, fake_dvr_address):
+    dvr_id = client.post("/dvr/configure", json={
+        "ip": fake_dvr_address, "username": "admin", "password": "secret"
+    }).json()["dvrId"]
+    try:
+        camera_id = client.get("/dvrs").json()["dvrs"][0]["cameras"][0]
+        response = client.get(f"/camera/{camera_id}/snapshot")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        etag = response.headers["etag"]
+
+        cached = client.get(f"/camera/{camera_id}/snapshot", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        thumbnail = client.get(f"/camera/{camera_id}/snapshot", params={"width": 160})
+        assert thumbnail.headers["etag"] != etag
+        assert client.get(f"/camera/{camera_id}/snapshot", params={"width": 123}).status_code == 400
+        assert client.get("/camera/9999/snapshot").status_code == 404
+    finally:
+        assert client.delete(f"/dvrs/{dvr_id}").status_code == 200
+
+def test_analyze_raw_frames(client):
+    frame = np.zeros((120, 160, 3), np.uint8)
+    response = client.post("/analyze/raw", content=frame.tobytes(), headers={"X-Frame-Shape": "120,160,3"})
+    assert response.status_code == 200
+    assert len(response.json()["data"]["detections"]) == 3
+
+    assert client.post("/analyze/raw", content=frame.tobytes()).status_code == 400
+    assert client.post("/analyze/raw", content=frame.tobytes(), headers={"X-Frame-Shape": "120,160,4"}).status_code == 400
+    assert client.post("/analyze/raw", content=b"\0" * 10, headers={"X-Frame-Shape": "120,160"}).status_code == 400
+
+def test_analyze_batch_reports_errors_per_frame(client):
+    jpeg = encode_jpeg(next(synthetic_frames(1, 320, 240)))
+    files = [("files", ("a.jpg", jpeg, "image/jpeg")), ("files", ("b.jpg", b"broken", "image/jpeg"))]
+    data = client.post("/analyze/batch", files=files).json()["data"]
+    assert data[0]["schema"] == 1
+    assert "error" in data[1]
+
+    too_many = [("files", (f"{i}.jpg", jpeg, "image/jpeg")) for i in range(ANALYZE_MAX_BATCH + 1)]
+    assert client.post("/analyze/batch", files=too_many).status_code == 413
+
+    timed = client.post("/analyze/batch", files=files, params={"timestamps": [10.0, 10.1]})
+    assert timed.status_code == 200
+    assert client.post("/analyze/batch", files=files, params={"timestamps": [10.0]}).status_code == 400
+    assert client.post("/analyze/batch", files=files, params={"fps": 0}).status_code == 422
+
+def test_ready_once_models_are_warm(client):
+    body = client.get("/ready").json()
+    assert body["status"] == "ready"
+    assert body["database"] is True
+    assert all(seconds is not None for seconds in body["inference"]["warmup_seconds"])
@@ -0,0 +1,46 @@
+# test_backends.py
+import numpy as np
+import pytest
+from backends import LocalBackend, StubBackend, create_backend, letterbox, non_max_suppression
+
+def test_letterbox_keeps_aspect_ratio():
+    canvas, scale, (left, top) = letterbox(np.zeros((100, 200, 3), np.uint8), 64)
+    assert canvas.shape == (64, 64, 3)
+    assert scale == pytest.approx(0.32)
+    assert (left, top) == (0, 16)
+    assert (canvas[:16] == 114).all()
+
+def test_nms_is_class_aware():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [0, 0, 10, 10], [50, 50, 60, 60]], np.float32)
+    scores = np.array([0.9, 0.8, 0.7, 0.6], np.float32)
+    class_ids = np.array([0, 0, 1, 0])
+    assert sorted(non_max_suppression(boxes, scores, class_ids, 0.5).tolist()) == [0, 2, 3]
+    assert non_max_suppression(boxes[:0], scores[:0], class_ids[:0], 0.5).size == 0
+
+def test_decode_undoes_letterbox():
+    backend = LocalBackend.__new__(LocalBackend)
+    backend.labels = ["person", "bag"]
+    # YOLOv8 layout (4 + classes, anchors): one confident bag at the center of a 64px input
+    output = np.zeros((6, 8), np.float32)
+    output[:, 0] = [32, 32, 16, 8, 0.1, 0.95]
+    predictions = backend._decode(output, scale=0.32, padding=(0, 16))
+    assert len(predictions) == 1
+    prediction = predictions[0]
+    assert prediction["class"] == "bag"
+    assert prediction["x"] == pytest.approx(100)
+    assert prediction["y"] == pytest.approx(50)
+    assert prediction["width"] == pytest.approx(50)
+    assert prediction["height"] == pytest.approx(25)
+
+def test_stub_backend_is_deterministic():
+    backend = StubBackend(cost_ms=0, boxes=2)
+    first, second = backend.predict_batch([np.zeros((100, 200, 3), np.uint8)] * 2)
+    assert first == second
+    assert [prediction["x"] for prediction in first] == [50, 150]
+    assert create_backend("stub").__class__ is StubBackend
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_backend("nope")
+    with pytest.raises(FileNotFoundError):
+        LocalBackend(model_path="/nonexistent.onnx")
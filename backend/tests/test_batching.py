@@ -0,0 +1,67 @@
+# test_batching.py
+import asyncio
+
+import pytest
+from batching import BatchInferenceEngine
+
+def test_concurrent_frames_share_a_batch():
+    async def main():
+        sizes = []
+
+        async def detect_batch(frames):
+            sizes.append(len(frames))
+            return [frame * 2 for frame in frames]
+
+        engine = BatchInferenceEngine(detect_batch, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(engine.submit(i) for i in range(6)))
+        await engine.stop()
+        assert results == [0, 2, 4, 6, 8, 10]
+        assert sizes == [4, 2]
+        assert engine.get_stats()["batches"] == 2
+
+    asyncio.run(main())
+
+def test_exception_result_fails_only_its_caller():
+    def detect_batch(frames):
+        # Plain functions run in a thread
+        return [ValueError("bad frame") if frame < 0 else frame for frame in frames]
+
+    async def main():
+        engine = BatchInferenceEngine(detect_batch, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(engine.submit(1), engine.submit(-1), return_exceptions=True)
+        await engine.stop()
+        assert results[0] == 1
+        assert isinstance(results[1], ValueError)
+
+    asyncio.run(main())
+
+def test_failed_batch_fails_every_caller():
+    async def detect_batch(frames):
+        raise RuntimeError("model crashed")
+
+    async def main():
+        engine = BatchInferenceEngine(detect_batch, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(engine.submit(1), engine.submit(2), return_exceptions=True)
+        await engine.stop()
+        assert [str(result) for result in results] == ["model crashed"] * 2
+
+    asyncio.run(main())
+
+def test_stop_fails_waiting_frames():
+    async def main():
+        release = asyncio.Event()
+
+        async def detect_batch(frames):
+            await release.wait()
+            return frames
+
+        engine = BatchInferenceEngine(detect_batch, max_batch_size=1, max_wait_ms=0)
+        first = asyncio.create_task(engine.submit(1))
+        second = asyncio.create_task(engine.submit(2))
+        await asyncio.sleep(0.05)
+        await engine.stop()
+        with pytest.raises(RuntimeError, match="stopped"):
+            await second
+        first.cancel()
+
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+# test_benchmarks.py
+import argparse
+import asyncio
+
+import aiohttp
+import numpy as np
+import pytest
+from benchmarks.fake_dvr import FakeDVRServer
+from benchmarks.frames import load_frames, synthetic_frames
+from benchmarks.run import compare, measure, run, summarize
+
+def test_summarize_percentiles():
+    stats = summarize([i / 1000 for i in range(1, 101)], errors=2, seconds=2.0)
+    assert stats["count"] == 100 and stats["errors"] == 2
+    assert stats["throughput"] == 50.0
+    assert stats["p50_ms"] == pytest.approx(50.5)
+    assert stats["max_ms"] == 100.0
+    assert "p50_ms" not in summarize([], 0, 0)
+
+def test_measure_counts_failures():
+    async def call(i):
+        if i % 4 == 0:
+            raise RuntimeError("failed")
+
+    stats = asyncio.run(measure(call, requests=20, concurrency=3))
+    assert stats["count"] == 15 and stats["errors"] == 5
+
+def test_compare_flags_regressions(capsys):
+    baseline = {"analyze": {"p95_ms": 10.0, "p99_ms": 20.0, "throughput": 100.0}}
+    assert compare({"analyze": {"p95_ms": 11.0, "p99_ms": 20.0, "throughput": 95.0}}, baseline, 0.15) == []
+    assert compare({"analyze": {"p95_ms": 12.0, "p99_ms": 20.0, "throughput": 80.0}}, baseline, 0.15) == [
+        "analyze.p95_ms", "analyze.throughput"
+    ]
+    assert compare({"tracker": {"p95_ms": 1.0}}, baseline, 0.15) == []
+    assert "REGRESSION" in capsys.readouterr().out
+
+def test_synthetic_frames_are_reproducible():
+    first = list(synthetic_frames(3, 64, 48, seed=5))
+    second = list(synthetic_frames(3, 64, 48, seed=5))
+    assert all((a == b).all() for a, b in zip(first, second))
+    assert not (first[0] == first[1]).all()
+    assert load_frames(2, width=64, height=48)[0].shape == (48, 64, 3)
+
+def test_fake_dvr_answers_like_a_dahua_box():
+    async def main():
+        server = FakeDVRServer(channels=2, latency=0, snapshot_size=(64, 48))
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://{server.address}/cgi-bin/magicBox.cgi?action=getSystemInfo") as response:
+                    assert "ChannelNum=2" in await response.text()
+                async with session.get(f"http://{server.address}/cgi-bin/snapshot.cgi?channel=3") as response:
+                    assert response.status == 404
+                server.failure_rate = 1.0
+                async with session.get(f"http://{server.address}/cgi-bin/snapshot.cgi?channel=1") as response:
+                    assert response.status == 500
+            assert server.requests == {"status": 1, "snapshot": 2}
+        finally:
+            await server.stop()
+
+    asyncio.run(main())
+
+def test_in_process_benchmarks_run(tmp_path):
+    args = argparse.Namespace(
+        only=["tracker", "add_alert", "camera_list", "snapshot"], requests=20, concurrency=4,
+        objects=5, width=640, height=480, channels=2, dvr_latency=0, dvr_jitter=0, snapshot_ttl=0
+    )
+    results = asyncio.run(run(args))
+    assert {name: stats["count"] for name, stats in results.items()} == {
+        "tracker": 20, "add_alert": 20, "camera_list": 20, "snapshot": 20
+    }
+    assert results["tracker"]["tracks"] == 5
+    # Concurrent requests for a channel share one upstream fetch
+    assert 2 <= results["snapshot"]["upstream_requests"] <= 20
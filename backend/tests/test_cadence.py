@@ -0,0 +1,43 @@
+# test_cadence.py
+from cadence import DetectionCadence
+
+class FakeTracker:
+    def __init__(self, confidence: float = 1.0):
+        self.confidence = confidence
+        self.new_tracks = 0
+        self.lost_tracks = 0
+
+    def min_confidence(self) -> float:
+        return self.confidence
+
+def detected_pattern(cadence: DetectionCadence, tracker, frames: int) -> str:
+    pattern = ""
+    for _ in range(frames):
+        detect = cadence.should_detect(tracker)
+        if detect:
+            cadence.record_detection(tracker)
+        pattern += "D" if detect else "t"
+    return pattern
+
+def test_disabled_detects_every_frame():
+    cadence = DetectionCadence(enabled=False)
+    assert detected_pattern(cadence, FakeTracker(), 5) == "DDDDD"
+    assert cadence.get_stats()["detect_ratio"] == 1.0
+
+def test_interval_grows_while_quiet_and_halves_on_activity():
+    cadence = DetectionCadence(enabled=True, min_interval=1, max_interval=4)
+    tracker = FakeTracker()
+    assert detected_pattern(cadence, tracker, 10) == "DtDttDtttD"
+    assert cadence.interval == 4
+
+    # Activity seen on the next keyframe halves the interval
+    tracker.new_tracks = 1
+    assert detected_pattern(cadence, tracker, 4) == "tttD"
+    assert cadence.interval == 2
+
+def test_low_confidence_forces_detection():
+    cadence = DetectionCadence(enabled=True, min_interval=5, max_interval=10, confidence_floor=0.3)
+    tracker = FakeTracker(confidence=0.9)
+    assert detected_pattern(cadence, tracker, 3) == "ttt"
+    tracker.confidence = 0.2
+    assert detected_pattern(cadence, tracker, 1) == "D"
@@ -0,0 +1,143 @@
+# test_camera_manager.py
+import asyncio
+
+import pytest
+from benchmarks.fake_dvr import FakeDVRServer
+from camera_manager import CameraManager
+from database import Database
+
+async def _open(tmp_path) -> Database:
+    db = Database(str(tmp_path / "security.db"))
+    await db.initialize()
+    return db
+
+def test_dvrs_get_their_own_camera_ids(tmp_path):
+    async def main():
+        servers = [FakeDVRServer(channels=channels, latency=0) for channels in (2, 3)]
+        for server in servers:
+            await server.start()
+        db = await _open(tmp_path)
+        manager = CameraManager(db)
+        try:
+            first = await manager.initialize(servers[0].address, "admin", "secret")
+            second = await manager.initialize(servers[1].address, "admin", "secret")
+            dvrs = {dvr["id"]: dvr for dvr in manager.get_dvr_list()}
+            assert len(dvrs[first]["cameras"]) == 2 and len(dvrs[second]["cameras"]) == 3
+            assert not set(dvrs[first]["cameras"]) & set(dvrs[second]["cameras"])
+            assert [manager.cameras[camera_id]["channel"] for camera_id in dvrs[second]["cameras"]] == [1, 2, 3]
+        finally:
+            await manager.close()
+            await db.close()
+            for server in servers:
+                await server.stop()
+
+    asyncio.run(main())
+
+def test_unreachable_dvr_is_not_stored(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        manager = CameraManager(db)
+        try:
+            with pytest.raises(Exception):
+                await manager.initialize("127.0.0.1:1", "admin", "secret")
+            assert await db.get_dvrs() == []
+            assert manager.dvrs == {} and manager.cameras == {}
+        finally:
+            await manager.close()
+            await db.close()
+
+    asyncio.run(main())
+
+def test_reconfigure_keeps_ids_streams_and_previews(tmp_path):
+    async def main():
+        server = FakeDVRServer(channels=2, latency=0)
+        await server.start()
+        db = await _open(tmp_path)
+        manager = CameraManager(db)
+
+        async def on_frame(channel, frame, captured_at):
+            pass
+
+        manager.frame_handler = on_frame
+        try:
+            dvr_id = await manager.initialize(server.address, "admin", "secret")
+            detecting, previewed = sorted(manager.cameras)
+            assert await manager.start_stream(detecting)
+            preview = await manager.open_preview(previewed)
+            old_workers = dict(manager.active_streams)
+
+            assert await manager.initialize(server.address, "admin", "changed") == dvr_id
+            assert sorted(manager.cameras) == [detecting, previewed]
+            assert manager.dvrs[dvr_id].password == "changed"
+
+            # Both streams run again on the new connection, and the preview keeps its viewer
+            assert sorted(manager.active_streams) == [detecting, previewed]
+            assert manager.active_streams[detecting] is not old_workers[detecting]
+            assert manager.active_streams[detecting].on_frame is on_frame
+            assert manager.previews[previewed] is preview and not preview.closed
+            assert preview.worker is manager.active_streams[previewed]
+            assert preview.worker.on_frame is None
+        finally:
+            await manager.close()
+            await db.close()
+            await server.stop()
+
+    asyncio.run(main())
+
+def test_remove_dvr_clears_cameras_and_rois(tmp_path):
+    async def main():
+        server = FakeDVRServer(channels=2, latency=0)
+        await server.start()
+        db = await _open(tmp_path)
+        manager = CameraManager(db)
+        rois = {}
+        manager.roi_handler = rois.__setitem__
+        try:
+            dvr_id = await manager.initialize(server.address, "admin", "secret")
+            camera_id = min(manager.cameras)
+            await db.set_camera_roi(camera_id, {"rectangles": [[0, 0, 0.5, 0.5]]})
+
+            # Stored ROIs are handed out whenever the cameras are registered
+            await manager.initialize(server.address, "admin", "secret")
+            assert rois[camera_id] == {"rectangles": [[0, 0, 0.5, 0.5]]}
+
+            await manager.remove_dvr(dvr_id)
+            assert rois == {camera_id: None, camera_id + 1: None}
+            assert manager.cameras == {} and manager.poller.table == {}
+            assert await db.get_dvrs() == [] and await db.get_dvr_cameras(dvr_id) == []
+        finally:
+            await manager.close()
+            await db.close()
+            await server.stop()
+
+    asyncio.run(main())
+
+def test_offline_dvr_keeps_known_cameras_until_it_returns(tmp_path):
+    async def main():
+        server = FakeDVRServer(channels=2, latency=0)
+        await server.start()
+        db = await _open(tmp_path)
+        manager = CameraManager(db)
+        await manager.initialize(server.address, "admin", "secret")
+        cameras = sorted(manager.cameras)
+        await manager.close()
+        port = server.port
+        await server.stop()
+
+        manager = CameraManager(db)
+        try:
+            await manager.load()
+            assert sorted(manager.cameras) == cameras
+            assert [dvr["online"] for dvr in manager.get_dvr_list()] == [False]
+
+            server = FakeDVRServer(channels=2, latency=0, port=port)
+            await server.start()
+            await manager.retry_offline()
+            assert [dvr["online"] for dvr in manager.get_dvr_list()] == [True]
+            assert sorted(manager.cameras) == cameras
+        finally:
+            await manager.close()
+            await db.close()
+            await server.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+# test_camera_status.py
+import asyncio
+import time
+
+from benchmarks.fake_dvr import FakeDVRServer
+from camera_manager import CameraManager
+from database import Database
+
+async def _manager(tmp_path, server: FakeDVRServer):
+    db = Database(str(tmp_path / "security.db"))
+    await db.initialize()
+    manager = CameraManager(db)
+    dvr_id = await manager.initialize(server.address, "admin", "secret")
+    return db, manager, dvr_id
+
+async def _close(db: Database, manager: CameraManager, server: FakeDVRServer):
+    await manager.close()
+    await db.close()
+    await server.stop()
+
+def test_poll_caches_status_of_every_camera(tmp_path):
+    async def main():
+        server = FakeDVRServer(channels=3, latency=0)
+        await server.start()
+        db, manager, _ = await _manager(tmp_path, server)
+        try:
+            cameras = await manager.get_camera_list()
+            assert len(cameras) == 3
+            assert {camera["status"] for camera in cameras} == {"active"}
+            assert not any(camera["stale"] for camera in cameras)
+
+            # Listing cameras reads the cached table without calling the DVR
+            polled = server.requests["status"]
+            await manager.get_camera_list()
+            assert server.requests["status"] == polled
+        finally:
+            await _close(db, manager, server)
+
+    asyncio.run(main())
+
+def test_slow_dvr_times_out_as_inactive(tmp_path):
+    async def main():
+        server = FakeDVRServer(channels=2, latency=0)
+        await server.start()
+        db, manager, _ = await _manager(tmp_path, server)
+        changes = []
+
+        async def on_status(camera_id, entry):
+            changes.append((camera_id, entry["status"]))
+
+        manager.status_handler = on_status
+        try:
+            server.latency = 0.5
+            manager.poller.timeout = 0.05
+            await manager.poller.poll_once()
+
+            cameras = await manager.get_camera_list()
+            assert {camera["status"] for camera in cameras} == {"inactive"}
+            assert all(camera["lastError"].startswith("Timed out") for camera in cameras)
+            assert sorted(changes) == sorted((camera["id"], "inactive") for camera in cameras)
+        finally:
+            await _close(db, manager, server)
+
+    asyncio.run(main())
+
+def test_stale_entries():
+    manager = CameraManager()
+    poller = manager.poller
+    poller.ttl = 10
+    assert poller.is_stale({"last_checked": None})
+    assert not poller.is_stale({"last_checked": time.time()})
+    assert poller.is_stale({"last_checked": time.time() - 11})
@@ -0,0 +1,158 @@
+# test_clips.py
+import asyncio
+import os
+import time
+
+import cv2
+import numpy as np
+from benchmarks.frames import encode_jpeg
+from clips import ClipRecorder, JpegRingBuffer
+from config import ALERT_FLUSH_INTERVAL
+from database import Database
+
+JPEG = encode_jpeg(np.full((48, 64, 3), 90, np.uint8))
+
+def test_ring_buffer_is_bounded_by_age_and_bytes():
+    buffer = JpegRingBuffer(max_seconds=2)
+    for t in range(5):
+        assert buffer.add(float(t), b"x" * 10, max_bytes=1000) in (10, 0)
+    assert [t for t, _ in buffer.frames] == [2.0, 3.0, 4.0]
+    assert buffer.add(5.0, b"x" * 10, max_bytes=25) == -10
+    assert buffer.nbytes == 20 and buffer.last == 5.0
+
+def test_memory_cap_holds_across_cameras():
+    recorder = ClipRecorder(pre_seconds=100, fps=1000, camera_max_bytes=500, memory_max_bytes=1000)
+    now = time.time()
+    for i in range(40):
+        for camera in ("a", "b", "c"):
+            recorder.add_frame(camera, b"x" * 50, timestamp=now + i * 0.01)
+            assert recorder.nbytes <= 1000
+    assert recorder.nbytes == sum(buffer.nbytes for buffer in recorder.buffers.values())
+    # Eviction takes from the largest pre-roll, so cameras end up with even shares
+    sizes = [buffer.nbytes for buffer in recorder.buffers.values()]
+    assert max(sizes) - min(sizes) <= 50
+
+def test_idle_pre_rolls_expire():
+    recorder = ClipRecorder(pre_seconds=1, fps=10)
+    recorder.add_frame("gone", JPEG, timestamp=100.0)
+    recorder.add_frame("live", JPEG, timestamp=100.0)
+    recorder.add_frame("live", JPEG, timestamp=101.5)
+    recorder.add_frame("live", JPEG, timestamp=102.6)
+    assert list(recorder.buffers) == ["live"]
+    assert recorder.nbytes == recorder.buffers["live"].nbytes
+
+def test_trigger_without_frames_records_nothing(tmp_path):
+    async def main():
+        recorder = ClipRecorder(directory=str(tmp_path))
+        await recorder.start()
+        try:
+            assert recorder.trigger("empty") is None
+            assert recorder.get_stats()["triggers_dropped"] == 1
+            assert recorder.pending == set()
+        finally:
+            await recorder.stop()
+
+    asyncio.run(main())
+
+async def _wait_written(recorder: ClipRecorder):
+    for _ in range(100):
+        if not recorder.pending:
+            return
+        await asyncio.sleep(0.05)
+
+def test_clips_are_linked_to_alerts_once_written(tmp_path):
+    async def main():
+        db = Database(str(tmp_path / "security.db"))
+        await db.initialize()
+        recorder = ClipRecorder(directory=str(tmp_path / "clips"), pre_seconds=5, post_seconds=1.5, fps=20)
+        recorder.clip_handler = db.link_clip
+        await recorder.start()
+        try:
+            for i in range(5):
+                recorder.add_frame("7", JPEG, timestamp=time.time() - 1 + i * 0.1)
+            await db.add_alert("loitering", "7", "medium")
+            path = recorder.trigger("7")
+            await db.add_alert("zone_enter", "7", "high", path)
+            assert recorder.trigger("7") == path
+            await db.add_alert("loitering", "7", "medium", path)
+            await db.add_alert("loitering", "8", "medium")
+
+            # Until the file is written the alerts have no clip
+            assert path in recorder.pending
+            await asyncio.sleep(ALERT_FLUSH_INTERVAL * 2)
+            alerts, _ = await db.query_alerts()
+            assert [alert["clip_path"] for alert in alerts] == [None] * 4
+            assert "pending_clip_path" not in alerts[0]
+
+            recorder.add_frame("7", JPEG)
+            await _wait_written(recorder)
+            capture = cv2.VideoCapture(recorder.full_path(path))
+            assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 6
+            capture.release()
+        finally:
+            await recorder.stop()
+            await db.close()
+
+        db = Database(db.db_path)
+        await db.initialize()
+        try:
+            alerts, _ = await db.query_alerts()
+            assert sorted((alert["type"], alert["camera"], alert["clip_path"] or "") for alert in alerts) == [
+                ("loitering", "7", ""), ("loitering", "7", path), ("loitering", "8", ""), ("zone_enter", "7", path)
+            ]
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+def test_back_to_back_clips_link_only_their_own_alerts(tmp_path):
+    async def main():
+        db = Database(str(tmp_path / "security.db"))
+        await db.initialize()
+        recorder = ClipRecorder(directory=str(tmp_path / "clips"), pre_seconds=5, post_seconds=0.05, fps=20)
+        recorder.clip_handler = db.link_clip
+        await recorder.start()
+        try:
+            paths = []
+            for clip in range(2):
+                recorder.add_frame("7", JPEG, timestamp=time.time() - 0.5)
+                paths.append(recorder.trigger("7"))
+                await db.add_alert(f"alert-{clip}", "7", "high", paths[-1])
+                await _wait_written(recorder)
+        finally:
+            await recorder.stop()
+            await db.close()
+
+        db = Database(db.db_path)
+        await db.initialize()
+        try:
+            alerts, _ = await db.query_alerts()
+        finally:
+            await db.close()
+        # Both clips and alerts fall within the same second or two; each alert still gets its own clip
+        assert paths[0] != paths[1]
+        assert {alert["type"]: alert["clip_path"] for alert in alerts} == {"alert-0": paths[0], "alert-1": paths[1]}
+
+    asyncio.run(main())
+
+def test_failed_clips_are_not_linked(tmp_path):
+    async def main():
+        linked = []
+
+        async def link(*args):
+            linked.append(args)
+
+        recorder = ClipRecorder(directory=str(tmp_path), post_seconds=0.05)
+        recorder.clip_handler = link
+        await recorder.start()
+        try:
+            recorder.add_frame("1", b"\xff\xd8 not really a jpeg")
+            path = recorder.trigger("1")
+            await asyncio.sleep(0.3)
+        finally:
+            await recorder.stop()
+        assert linked == []
+        assert recorder.clips_failed == 1
+        assert not os.path.exists(recorder.full_path(path))
+
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+# test_database.py
+import asyncio
+
+import aiosqlite
+import pytest
+from database import Database
+
+async def _open(tmp_path) -> Database:
+    db = Database(str(tmp_path / "security.db"))
+    await db.initialize()
+    return db
+
+async def _count(path, table: str = "alerts") -> int:
+    async with aiosqlite.connect(path) as conn:
+        async with conn.execute(f"SELECT COUNT(*) FROM {table}") as cursor:
+            return (await cursor.fetchone())[0]
+
+def test_close_writes_queued_alerts(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        for i in range(250):
+            await db.add_alert("loitering", f"camera-{i % 3}", "medium")
+        await db.close()
+        assert await _count(db.db_path) == 250
+        assert db.alerts_written == 250
+
+    asyncio.run(main())
+
+def test_alerts_are_written_in_batches(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        try:
+            async with db.conn.execute("PRAGMA journal_mode") as cursor:
+                assert (await cursor.fetchone())[0] == "wal"
+            await asyncio.gather(*(db.add_alert("zone_enter", "camera-1", "high") for _ in range(50)))
+            for _ in range(50):
+                if db.alerts_written == 50:
+                    break
+                await asyncio.sleep(0.05)
+            stats = db.get_stats()
+            assert stats["alerts_written"] == 50
+            assert stats["flushes"] < 50
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+def test_failed_flush_leaves_no_partial_rows(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        try:
+            # Inserting the alerts works but folding them into the rollups does not
+            await db.conn.execute("DROP TABLE alert_rollups")
+            await db.conn.commit()
+            with pytest.raises(aiosqlite.OperationalError):
+                await db._flush_alerts([("loitering", "camera-1", "medium", "2024-01-01 00:00:00", None)])
+            assert await _count(db.db_path) == 0
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+ALERTS = [
+    ("loitering", "camera-1", "medium", "2024-01-01 10:00:00", None),
+    ("zone_enter", "camera-2", "high", "2024-01-01 10:00:00", None),
+    ("zone_enter", "camera-1", "high", "2024-01-01 10:00:00", None),
+    ("rapid_movement", "camera-1", "high", "2024-01-01 10:30:00", None),
+    ("zone_exit", "camera-2", "low", "2024-01-01 11:00:00", None),
+    ("loitering", "camera-1", "medium", "2024-01-01 11:15:00", None),
+    ("zone_enter", "camera-1", "high", "2024-01-02 09:00:00", None),
+]
+
+def test_keyset_pages_cover_every_alert_once(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        try:
+            await db._flush_alerts(ALERTS)
+            seen, cursor = [], None
+            while True:
+                page, cursor = await db.query_alerts(cursor=cursor, limit=3)
+                seen += page
+                if cursor is None:
+                    break
+            assert len(seen) == len(ALERTS)
+            assert len({alert["id"] for alert in seen}) == len(ALERTS)
+            # Newest first, ties on created_at broken by id
+            keys = [(alert["created_at"], alert["id"]) for alert in seen]
+            assert keys == sorted(keys, reverse=True)
+
+            page, _ = await db.query_alerts(camera="camera-1", severity="high", limit=10)
+            assert [alert["type"] for alert in page] == ["zone_enter", "rapid_movement", "zone_enter"]
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+def test_time_filters_take_iso_8601(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        try:
+            await db._flush_alerts(ALERTS)
+            page, _ = await db.query_alerts(since="2024-01-01T10:30:00Z", until="2024-01-01T11:15:00")
+            assert [alert["created_at"] for alert in page] == ["2024-01-01 11:00:00", "2024-01-01 10:30:00"]
+
+            # Offsets are converted to UTC, like the stored times
+            page, _ = await db.query_alerts(since="2024-01-02T10:00:00+01:00")
+            assert [alert["created_at"] for alert in page] == ["2024-01-02 09:00:00"]
+
+            with pytest.raises(ValueError, match="Invalid timestamp"):
+                await db.query_alerts(since="yesterday")
+            with pytest.raises(ValueError, match="Invalid cursor"):
+                await db.query_alerts(cursor="not-a-cursor")
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+def test_rollups_count_alerts_per_bucket(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        try:
+            await db._flush_alerts(ALERTS[:4])
+            await db._flush_alerts(ALERTS[4:])
+            hours = await db.get_alert_stats("hour", camera="camera-1")
+            assert sorted((row["bucket"], row["type"], row["count"]) for row in hours) == [
+                ("2024-01-01 10:00", "loitering", 1),
+                ("2024-01-01 10:00", "rapid_movement", 1),
+                ("2024-01-01 10:00", "zone_enter", 1),
+                ("2024-01-01 11:00", "loitering", 1),
+                ("2024-01-02 09:00", "zone_enter", 1),
+            ]
+
+            days = await db.get_alert_stats("day", since="2024-01-01T00:00:00Z", until="2024-01-02T00:00:00Z")
+            assert sum(row["count"] for row in days) == 6
+            assert {row["bucket"] for row in days} == {"2024-01-01"}
+
+            with pytest.raises(ValueError):
+                await db.get_alert_stats("week")
+            with pytest.raises(ValueError, match="Invalid timestamp"):
+                await db.get_alert_stats(since="soon")
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+def test_rollups_are_backfilled_for_older_databases(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        await db._flush_alerts(ALERTS)
+        await db.conn.execute("DELETE FROM alert_rollups")
+        await db.conn.commit()
+        await db.close()
+
+        db = await _open(tmp_path)
+        try:
+            for granularity in ("hour", "day"):
+                buckets = await db.get_alert_stats(granularity)
+                assert sum(row["count"] for row in buckets) == len(ALERTS)
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+def test_retention_is_opt_in(tmp_path):
+    async def main():
+        db = await _open(tmp_path)
+        try:
+            await db._flush_alerts(ALERTS)
+            # Raw alerts are kept unless a retention age is given
+            assert await db.prune_alerts() == 0
+            assert await _count(db.db_path) == len(ALERTS)
+
+            assert await db.prune_alerts(max_age_days=1, chunk_size=2) == len(ALERTS)
+            assert await _count(db.db_path) == 0
+            # Minute rollups follow their own retention; hour and day rollups outlive the raw rows
+            assert await db.get_alert_stats("minute") == []
+            days = await db.get_alert_stats("day")
+            assert sum(row["count"] for row in days) == len(ALERTS)
+        finally:
+            await db.close()
+
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+# test_decode.py
+import numpy as np
+import pytest
+from benchmarks.frames import encode_jpeg, synthetic_frames
+from inference_pool import _decode, _jpeg_size
+
+JPEG = encode_jpeg(next(synthetic_frames(1, 1280, 720)))
+
+def test_jpeg_size_reads_the_header():
+    assert _jpeg_size(JPEG) == (1280, 720)
+    assert _jpeg_size(b"\x89PNG\r\n") is None
+    assert _jpeg_size(JPEG[:20]) is None
+
+@pytest.mark.parametrize("target, shape, scale", [
+    (0, (720, 1280, 3), 1.0),
+    (320, (180, 320, 3), 4.0),
+    (500, (281, 500, 3), 2.56),
+    (2000, (720, 1280, 3), 1.0),
+])
+def test_decode_to_target_size(target, shape, scale):
+    frame, factor = _decode(JPEG, target)
+    assert frame.shape == shape
+    assert factor == pytest.approx(scale)
+
+def test_decode_raw_frames():
+    gray = np.zeros((100, 200), np.uint8)
+    frame, factor = _decode(gray, 100)
+    assert frame.shape == (50, 100, 3)
+    assert factor == pytest.approx(2.0)
+
+    bgr = np.zeros((100, 200, 3), np.uint8)
+    assert _decode(bgr, 0)[0] is bgr
+
+def test_decode_rejects_garbage():
+    with pytest.raises(ValueError):
+        _decode(b"not an image", 320)
@@ -0,0 +1,60 @@
+# test_dvr_pool.py
+import asyncio
+
+from benchmarks.fake_dvr import FakeDVRServer
+from camera_manager import DahuaCamera, DahuaDVR
+
+def test_channels_share_one_session():
+    async def main():
+        server = FakeDVRServer(channels=4, latency=0)
+        await server.start()
+        dvr = DahuaDVR(server.address, "admin", "secret")
+        try:
+            await dvr.initialize()
+            assert sorted(dvr.cameras) == [1, 2, 3, 4]
+
+            snapshots = await asyncio.gather(*(camera.get_snapshot() for camera in dvr.cameras.values()))
+            assert all(snapshot.startswith(b"\xff\xd8") for snapshot in snapshots)
+            sessions = {id(camera.session) for camera in dvr.cameras.values()}
+            assert sessions == {id(dvr.pool.session)}
+
+            # A channel letting go of the session leaves it open for the others
+            await dvr.cameras[1].disconnect()
+            assert not dvr.pool.session.closed
+            assert (await dvr.cameras[2].get_status())["deviceStatus"] == "OK"
+        finally:
+            await dvr.close()
+            await server.stop()
+        assert dvr.pool.session is None
+
+    asyncio.run(main())
+
+def test_standalone_camera_owns_its_pool():
+    async def main():
+        server = FakeDVRServer(channels=1, latency=0)
+        await server.start()
+        camera = DahuaCamera(server.address, "admin", "secret")
+        try:
+            assert (await camera.get_status())["ChannelNum"] == "1"
+            session = camera.session
+        finally:
+            await camera.disconnect()
+            await server.stop()
+        assert session.closed
+
+    asyncio.run(main())
+
+def test_pool_limits_apply_to_connector():
+    async def main():
+        dvr = DahuaDVR("127.0.0.1:1", "admin", "secret")
+        dvr.pool.limit, dvr.pool.limit_per_host = 5, 2
+        session = await dvr.pool.get_session()
+        try:
+            assert session.connector.limit == 5
+            assert session.connector.limit_per_host == 2
+            assert session.headers["Authorization"].startswith("Basic ")
+            assert await dvr.pool.get_session() is session
+        finally:
+            await dvr.close()
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+# test_framebus.py
+import asyncio
+
+import numpy as np
+import pytest
+from framebus import FrameBusReader, SharedFrameRing
+from inference_pool import InferenceWorkerPool
+from ingest import IngestWorker
+
+def frame(value: int) -> np.ndarray:
+    return np.full((4, 6, 3), value, np.uint8)
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(frame(0).nbytes, slots=3)
+    yield ring
+    ring.close()
+
+def test_reader_sees_written_frames(ring):
+    ref = ring.write(frame(7))
+    reader = FrameBusReader()
+    view = reader.read(ref)
+    assert view.shape == (4, 6, 3) and (view == 7).all()
+    assert not view.flags.writeable
+    assert reader.valid(ref)
+
+def test_pinned_slots_are_never_overwritten(ring):
+    refs = [ring.write(frame(i)) for i in range(3)]
+    with pytest.raises(BufferError):
+        ring.write(frame(9))
+    assert all(ring.valid(ref) for ref in refs)
+
+    # Releasing a frame frees exactly its slot for the next write
+    ring.release(refs[1])
+    newest = ring.write(frame(9))
+    assert newest.slot == refs[1].slot
+    assert not ring.valid(refs[1])
+    assert ring.read(refs[1]) is None
+    assert (ring.read(refs[0]) == 0).all() and (ring.read(refs[2]) == 2).all()
+
+def test_stale_release_keeps_the_new_frame_pinned(ring):
+    first = ring.write(frame(1))
+    ring.release(first)
+    ring.write(frame(2))
+    ring.write(frame(3))
+    reused = ring.write(frame(4))
+    assert reused.slot == first.slot
+    ring.release(first)
+    assert reused.slot in ring.pinned
+
+def test_oversized_frames_are_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((10, 10, 3), np.uint8))
+
+def test_bus_frames_reach_worker_processes_intact(video_file):
+    async def main():
+        pool = InferenceWorkerPool(workers=1, max_wait_ms=1)
+        await pool.start()
+        for _ in range(300):
+            if pool.ready:
+                break
+            await asyncio.sleep(0.1)
+        results, errors = [], []
+
+        async def on_frame(channel, ref, captured_at):
+            try:
+                results.append(await pool.submit(f"camera-{channel}", ref, captured_at))
+            except Exception as e:
+                errors.append(e)
+
+        worker = IngestWorker(1, video_file(frames=30), on_frame=on_frame, buffer_size=2, bus_slots=2)
+        await worker.start()
+        try:
+            for _ in range(100):
+                if len(results) + len(errors) >= 10:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await worker.stop()
+            await pool.stop()
+        assert errors == []
+        assert len(results) >= 10
+        assert worker.bus_slots == 4
+
+    asyncio.run(main())
@@ -0,0 +1,237 @@
+# test_inference_pool.py
+import asyncio
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import inference_pool
+import numpy as np
+import pytest
+from backends import DetectionBackend
+from cadence import DetectionCadence
+from inference import TheftDetector
+from inference_pool import FRAMES_PROCESSED, InferenceWorkerPool, PoolSaturatedError, _evict_detectors, _process_batch
+
+FRAME = np.zeros((240, 320, 3), np.uint8)
+
+class SquareBackend(DetectionBackend):
+    """Finds the bright square drawn by square_at, so boxes follow the frame content"""
+
+    def predict_batch(self, frames):
+        results = []
+        for frame in frames:
+            ys, xs = np.nonzero(frame[:, :, 0] > 127)
+            results.append([{
+                'class': 'person', 'confidence': 0.9,
+                'x': (xs.min() + xs.max() + 1) / 2, 'y': (ys.min() + ys.max() + 1) / 2,
+                'width': float(xs.max() + 1 - xs.min()), 'height': float(ys.max() + 1 - ys.min())
+            }] if len(xs) else [])
+        return results
+
+def square_at(x: int, y: int = 100, size: int = 40, shape=(240, 320)) -> np.ndarray:
+    frame = np.zeros((*shape, 3), np.uint8)
+    frame[y:y + size, x:x + size] = 255
+    return frame
+
+@pytest.fixture
+def worker_state(monkeypatch):
+    """Run _process_batch in this process with a fresh set of detectors"""
+    monkeypatch.setattr(inference_pool, "_backend", SquareBackend())
+    monkeypatch.setattr(inference_pool, "_detectors", OrderedDict())
+    monkeypatch.setattr(inference_pool, "_detector_used", {})
+
+async def _started_pool(**kwargs) -> InferenceWorkerPool:
+    pool = InferenceWorkerPool(**kwargs)
+    await pool.start()
+    for _ in range(300):
+        if pool.ready:
+            break
+        await asyncio.sleep(0.1)
+    assert pool.ready
+    return pool
+
+def test_submit_runs_in_worker_process():
+    async def main():
+        pool = await _started_pool(workers=1, max_wait_ms=1)
+        try:
+            result = await pool.submit("camera-1", FRAME)
+            assert result["schema"] == 1
+            assert len(result["detections"]) == 3
+            assert pool.streams["camera-1"]["cadence"]["detected_frames"] == 1
+            assert pool.active_tracks["camera-1"] == 3
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+def test_streams_stay_on_one_worker():
+    pool = InferenceWorkerPool(workers=4)
+    assert {pool.worker_for("camera-7") for _ in range(10)} == {pool.worker_for("camera-7")}
+    assert len({pool.worker_for(f"camera-{i}") for i in range(64)}) == 4
+
+def test_submit_many_is_all_or_nothing():
+    async def main():
+        pool = await _started_pool(workers=1, max_pending=2, max_wait_ms=1)
+        try:
+            with pytest.raises(PoolSaturatedError):
+                await pool.submit_many("camera-1", [FRAME] * 3)
+            assert pool.rejected == 3
+            results = await pool.submit_many("camera-1", [FRAME, b"not an image"])
+            assert results[0]["schema"] == 1
+            assert isinstance(results[1], ValueError)
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+def test_dead_worker_is_replaced():
+    async def main():
+        pool = await _started_pool(workers=1, max_wait_ms=1)
+        try:
+            for pid in list(pool.executors[0]._processes):
+                os.kill(pid, signal.SIGKILL)
+            await asyncio.sleep(0.5)
+
+            # Only the batch caught by the crash fails
+            with pytest.raises(BrokenProcessPool):
+                await pool.submit("camera-1", FRAME)
+            assert pool.restarts == 1
+            result = await pool.submit("camera-1", FRAME)
+            assert len(result["detections"]) == 3
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+def test_ready_only_after_warm_up_and_again_after_a_crash():
+    async def main():
+        pool = InferenceWorkerPool(workers=1, max_wait_ms=1)
+        assert not pool.ready
+        await pool.start()
+        assert not pool.ready
+        for _ in range(300):
+            if pool.ready:
+                break
+            await asyncio.sleep(0.1)
+        try:
+            assert pool.ready and pool.warmup_seconds[0] > 0
+
+            for pid in list(pool.executors[0]._processes):
+                os.kill(pid, signal.SIGKILL)
+            await asyncio.sleep(0.5)
+            with pytest.raises(BrokenProcessPool):
+                await pool.submit("camera-1", FRAME)
+            assert not pool.ready
+
+            # The replacement process warms up on its own, without further frames
+            for _ in range(300):
+                if pool.ready:
+                    break
+                await asyncio.sleep(0.1)
+            assert pool.ready
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+def test_load_errors_are_reported(monkeypatch):
+    async def main():
+        pool = InferenceWorkerPool(workers=1)
+        await pool.start()
+        try:
+            for _ in range(300):
+                if pool.load_errors[0]:
+                    break
+                await asyncio.sleep(0.1)
+            assert "Unknown detection backend" in pool.load_errors[0]
+            assert not pool.ready
+        finally:
+            await pool.stop()
+
+    # Worker processes read their backend from the environment they are spawned with
+    monkeypatch.setenv("DETECTION_BACKEND", "missing")
+    asyncio.run(main())
+
+def test_frames_sharing_a_batch_use_their_capture_times(worker_state):
+    # 5 px per frame at 10 fps is 50 px/s, though the batch is analyzed within microseconds
+    items = [("upload-1", square_at(20 + 5 * i), None, 1000.0 + i / 10) for i in range(4)]
+    results, _, _ = _process_batch(items)
+    assert [result["suspicious_activities"] for result in results] == [[]] * 4
+    assert [result["tracks"][0][7] for result in results] == [0.0, 50.0, 50.0, 50.0]
+
+def test_frames_of_a_stream_are_analyzed_in_order(worker_state):
+    # The first frame is due a detection and the second is carried by the tracker
+    detector = inference_pool._detectors["upload-1"] = TheftDetector(inference_pool._backend)
+    detector.cadence = DetectionCadence(enabled=True, min_interval=2, max_interval=4)
+    detector.cadence.frames_since_detection = 1
+    items = [("upload-1", square_at(20 + 5 * i), None, 1000.0 + i / 10) for i in range(2)]
+    items.insert(1, ("upload-2", square_at(100), None, 1000.0))
+    results, _, _ = _process_batch(items)
+    assert [result["detected"] for result in results] == [True, True, False]
+    # The tracking frame carries forward the track its keyframe just created
+    assert [track[0] for track in results[2]["tracks"]] == [results[0]["tracks"][0][0]]
+    assert detector.cadence.get_stats()["tracked_frames"] == 1
+
+def test_detector_errors_fail_only_their_frame(worker_state, monkeypatch):
+    class PickyBackend(SquareBackend):
+        def predict_batch(self, frames):
+            if any(not frame.any() for frame in frames):
+                raise ValueError("Empty frame")
+            return super().predict_batch(frames)
+
+    monkeypatch.setattr(inference_pool, "_backend", PickyBackend())
+    items = [
+        ("upload-1", square_at(20), None, 1000.0),
+        ("upload-2", np.zeros((240, 320, 3), np.uint8), None, 1000.0),
+        ("upload-3", square_at(100), None, 1000.0),
+    ]
+    results, _, tracks = _process_batch(items)
+    assert isinstance(results[1], ValueError)
+    assert [len(results[i]["tracks"]) for i in (0, 2)] == [1, 1]
+    assert tracks == {"upload-1": 1, "upload-2": 0, "upload-3": 1}
+
+def test_reduced_decode_reports_one_scale(worker_state, monkeypatch):
+    # Frames decoded at half size: 20 px per 10 ms in the original is 1000 px/s at analysis size
+    monkeypatch.setattr(inference_pool, "_decode", partial(inference_pool._decode, target=320))
+    items = [
+        ("upload-1", square_at(20 + 20 * i, size=80, shape=(480, 640)), None, 1000.0 + i / 100)
+        for i in range(3)
+    ]
+    results, _, _ = _process_batch(items)
+    activity = results[-1]["suspicious_activities"][0]
+    track = results[-1]["tracks"][0]
+    assert activity["type"] == "rapid_movement"
+    assert activity["speed"] == pytest.approx(track[7], abs=0.01)
+    assert track[7] == pytest.approx(2000)
+    # Boxes are in original pixels too: the last square spans x 60-140
+    assert track[1] == pytest.approx(100)
+
+def test_worker_drops_idle_and_least_recently_used_detectors(worker_state):
+    _process_batch([(f"upload-{i}", square_at(20), None, 1000.0) for i in range(4)])
+    _process_batch([("upload-0", square_at(25), None, 1000.1)])
+    _evict_detectors(max_streams=3)
+    assert list(inference_pool._detectors) == ["upload-2", "upload-3", "upload-0"]
+
+    inference_pool._detector_used["upload-2"] -= 120
+    _evict_detectors(idle_seconds=60)
+    assert list(inference_pool._detectors) == ["upload-3", "upload-0"]
+    assert set(inference_pool._detector_used) == {"upload-3", "upload-0"}
+
+def test_pool_forgets_stream_state_and_metrics():
+    pool = InferenceWorkerPool(workers=1, max_streams=2, stream_idle_seconds=60)
+    for stream in ("upload-a", "upload-b"):
+        pool._touch(stream)
+        pool.streams[stream] = {}
+        pool.active_tracks[stream] = 1
+        FRAMES_PROCESSED.inc(camera=stream)
+    pool._touch("upload-c")
+    assert list(pool.stream_seen) == ["upload-b", "upload-c"]
+    assert list(pool.streams) == list(pool.active_tracks) == ["upload-b"]
+    cameras = {dict(labels)["camera"] for labels in FRAMES_PROCESSED.values}
+    assert "upload-a" not in cameras and "upload-b" in cameras
+
+    pool.stream_seen["upload-b"] -= 120
+    pool._touch("upload-c")
+    assert list(pool.stream_seen) == ["upload-c"] and pool.streams == {}
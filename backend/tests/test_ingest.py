@@ -0,0 +1,68 @@
+# test_ingest.py
+import asyncio
+import time
+
+import numpy as np
+from ingest import FrameRingBuffer, IngestWorker
+
+def test_ring_buffer_drops_oldest():
+    buffer = FrameRingBuffer(size=2)
+    frames = [np.full(1, i) for i in range(3)]
+    assert buffer.put(frames[0]) is None
+    assert buffer.put(frames[1]) is None
+    assert buffer.put(frames[2]) is frames[0]
+    assert buffer.dropped == 1
+    assert buffer.latest() is frames[2]
+    assert buffer.get() is frames[1]
+    assert buffer.get() is frames[2]
+    assert buffer.get() is None
+
+def test_take_latest_skips_older_frames():
+    buffer = FrameRingBuffer(size=4)
+    frames = [np.full(1, i) for i in range(3)]
+    for frame in frames:
+        buffer.put(frame)
+    latest, skipped = buffer.take_latest()
+    assert latest is frames[2]
+    assert skipped == frames[:2]
+    assert buffer.dropped == 2
+    assert len(buffer) == 0
+    assert buffer.take_latest() == (None, [])
+
+def test_worker_feeds_every_frame_of_a_file(video_file):
+    async def main():
+        received, captured = [], []
+
+        async def on_frame(channel, frame, captured_at):
+            received.append((channel, frame.shape))
+            captured.append(captured_at)
+
+        worker = IngestWorker(3, video_file(frames=10), on_frame=on_frame, buffer_size=16)
+        await worker.start()
+        for _ in range(100):
+            if len(received) >= 10:
+                break
+            await asyncio.sleep(0.05)
+        await worker.stop()
+        assert received[:10] == [(3, (240, 320, 3))] * 10
+        # Frames carry their capture time, paced at the file's 50 fps
+        assert captured == sorted(captured) and captured[-1] <= time.time()
+        assert captured[9] - captured[0] >= 0.15
+        stats = worker.get_stats()
+        assert stats["frames_read"] >= 10
+        assert stats["frames_processed"] >= 10
+
+    asyncio.run(main())
+
+def test_worker_retries_unreachable_source(tmp_path):
+    async def main():
+        worker = IngestWorker(1, str(tmp_path / "missing.avi"), reconnect_min=0.01, reconnect_max=0.02)
+        await worker.start()
+        await asyncio.sleep(0.2)
+        await worker.stop()
+        stats = worker.get_stats()
+        assert not stats["connected"]
+        assert stats["reconnects"] >= 2
+        assert "Unable to open source" in stats["last_error"]
+
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+# test_metrics.py
+import time
+
+import pytest
+from metrics import MetricsRegistry, StageTimer
+from profiler import SamplingProfiler
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", buckets=[0.01, 0.1])
+    for value in (0.005, 0.01, 0.05, 2.0):
+        histogram.observe(value, stage="predict")
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP stage_seconds Stage latency", "# TYPE stage_seconds histogram"]
+    assert lines[2:] == [
+        'stage_seconds_bucket{stage="predict",le="0.01"} 2',
+        'stage_seconds_bucket{stage="predict",le="0.1"} 3',
+        'stage_seconds_bucket{stage="predict",le="+Inf"} 4',
+        'stage_seconds_sum{stage="predict"} 2.065',
+        'stage_seconds_count{stage="predict"} 4',
+    ]
+
+def test_counters_gauges_and_collected_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("frames_total", "Frames")
+    counter.inc(camera='a "quoted"\nname')
+    counter.inc(2, camera='a "quoted"\nname')
+    registry.gauge("queue_depth", "Depth", lambda: 3)
+    registry.gauge("per_worker", "Per worker", lambda: [({"worker": 0}, 1.5), ({"worker": 1}, 0)])
+    registry.gauge("broken", "Raises", lambda: 1 / 0)
+
+    text = registry.render()
+    assert 'frames_total{camera="a \\"quoted\\"\\nname"} 3' in text
+    assert "queue_depth 3" in text
+    assert 'per_worker{worker="0"} 1.5' in text and 'per_worker{worker="1"} 0' in text
+    # A failing collector is left out instead of breaking the scrape
+    assert "broken" not in text
+    assert text.endswith("\n")
+
+def test_histogram_time_records_failures():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("call_seconds", "Calls")
+    with pytest.raises(RuntimeError):
+        with histogram.time(call="x"):
+            raise RuntimeError()
+    assert histogram.series[(("call", "x"),)][2] == 1
+
+def test_remove_drops_every_series_of_a_label():
+    registry = MetricsRegistry()
+    counter = registry.counter("frames_total", "Frames")
+    histogram = registry.histogram("stage_seconds", "Stages", buckets=[0.1])
+    for camera in ("upload-a", "upload-b"):
+        counter.inc(camera=camera, reason="failed")
+        histogram.observe(0.05, camera=camera, stage="decode")
+        histogram.observe(0.05, camera=camera, stage="predict")
+    counter.remove(camera="upload-a")
+    histogram.remove(camera="upload-a")
+    text = registry.render()
+    assert "upload-a" not in text
+    assert text.count('camera="upload-b"') == 1 + 2 * 4
+
+def test_stage_timer_accumulates_until_taken():
+    timer = StageTimer()
+    for _ in range(2):
+        with timer.stage("decode"):
+            time.sleep(0.01)
+    with timer.stage("predict"):
+        pass
+    stages = timer.take()
+    assert set(stages) == {"decode", "predict"}
+    assert stages["decode"] >= 0.02
+    assert timer.take() == {}
+
+def test_profiler_samples_the_target_thread():
+    profiler = SamplingProfiler(interval_ms=1)
+    profiler.start(seconds=5)
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        sum(range(1000))
+    profiler.stop()
+    stats = profiler.get_stats()
+    assert not stats["running"] and stats["samples"] > 10
+    assert "test_metrics.py:test_profiler_samples_the_target_thread" in profiler.collapsed()
+
+def test_metrics_endpoint(client):
+    client.post("/analyze/raw", content=b"\0" * 300, headers={"X-Frame-Shape": "10,10,3"})
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE inference_stage_seconds histogram" in response.text
+    assert 'inference_stage_seconds_count{camera="upload-default",stage="predict"}' in response.text
+    assert "inference_ready 1" in response.text
@@ -0,0 +1,44 @@
+# test_motion.py
+import numpy as np
+from inference import TheftDetector
+from backends import StubBackend
+from motion import MotionGate, merge_regions
+
+def frame_with_box(x: int = None) -> np.ndarray:
+    frame = np.zeros((480, 640, 3), np.uint8)
+    if x is not None:
+        frame[200:300, x:x + 100] = 255
+    return frame
+
+def test_static_frames_are_skipped():
+    gate = MotionGate(enabled=True, threshold=0.005)
+    assert gate.check(frame_with_box(100)) == (True, [])
+    assert gate.check(frame_with_box(100)) == (False, [])
+
+    moving, regions = gate.check(frame_with_box(300))
+    assert moving
+    # Regions are in full-frame pixels and cover where the box left and arrived
+    x1 = min(region[0] for region in regions)
+    x2 = max(region[2] for region in regions)
+    assert x1 <= 100 and x2 >= 400
+    assert gate.get_stats()["skipped"] == 1
+
+def test_disabled_gate_passes_everything():
+    gate = MotionGate(enabled=False)
+    for _ in range(3):
+        assert gate.check(frame_with_box(100)) == (True, [])
+    assert gate.get_stats()["skip_rate"] == 0.0
+
+def test_merge_regions_pads_inside_frame():
+    assert merge_regions([], (480, 640)) is None
+    assert merge_regions([(0, 10, 100, 110), (200, 50, 300, 150)], (480, 640)) == (0, 0, 330, 164)
+
+def test_skipped_frames_keep_previous_tracks():
+    detector = TheftDetector(backend=StubBackend(cost_ms=0))
+    detector.motion = MotionGate(enabled=True)
+    first = detector.process_frame(frame_with_box(100))
+    assert not first['skipped'] and len(first['tracks']) == 3
+
+    second = detector.process_frame(frame_with_box(100))
+    assert second['skipped'] and not second['detected']
+    assert second['tracks']['id'].tolist() == first['tracks']['id'].tolist()
@@ -0,0 +1,56 @@
+# test_movement.py
+import numpy as np
+import pytest
+from movement import MovementAnalyzer, load_zones, points_in_polygon
+
+SQUARE = np.array([[0, 0], [100, 0], [100, 100], [0, 100]], np.float32)
+
+def box_at(x: float, y: float, size: float = 20) -> np.ndarray:
+    return np.array([[x - size / 2, y - size / 2, x + size / 2, y + size / 2]], np.float32)
+
+def test_points_in_polygon():
+    points = np.array([[50, 50], [150, 50], [-1, 10], [99, 99]], np.float32)
+    assert points_in_polygon(points, SQUARE).tolist() == [True, False, False, True]
+    assert points_in_polygon(np.empty((0, 2)), SQUARE).size == 0
+
+def test_load_zones():
+    zones = load_zones('{"counter": [[0, 0], [10, 0], [10, 10]]}')
+    assert list(zones) == ["counter"]
+    assert zones["counter"].shape == (3, 2)
+    assert load_zones(None) == {}
+
+def test_rapid_movement():
+    analyzer = MovementAnalyzer(speed_threshold=100, zones={})
+    ids, confidence = np.array([7]), np.array([0.9])
+    assert analyzer.update(ids, box_at(0, 0), confidence, timestamp=0.0) == []
+    activities = analyzer.update(ids, box_at(50, 0), confidence, timestamp=0.1)
+    assert [activity['type'] for activity in activities] == ['rapid_movement']
+    assert activities[0]['speed'] == pytest.approx(500)
+    assert analyzer.speed.tolist() == pytest.approx([500])
+
+def test_loitering_is_reported_once():
+    analyzer = MovementAnalyzer(loiter_seconds=10, loiter_radius=5, zones={})
+    ids, confidence = np.array([1]), np.array([0.9])
+    reported = []
+    for second in range(15):
+        reported += analyzer.update(ids, box_at(50 + second % 2, 50), confidence, timestamp=float(second))
+    assert [activity['type'] for activity in reported] == ['loitering']
+    assert reported[0]['dwell_time'] == 10
+
+def test_zone_enter_and_exit():
+    analyzer = MovementAnalyzer(speed_threshold=1e9, zones={"counter": SQUARE})
+    ids, confidence = np.array([3]), np.array([0.9])
+    events = []
+    for t, x in enumerate([150, 50, 50, 150]):
+        events += [(a['type'], a['zone']) for a in analyzer.update(ids, box_at(x, 50), confidence, timestamp=float(t))]
+    assert events == [('zone_enter', 'counter'), ('zone_exit', 'counter')]
+
+def test_rows_are_recycled_for_new_tracks():
+    analyzer = MovementAnalyzer(zones={})
+    confidence = np.array([0.9])
+    analyzer.update(np.array([1]), box_at(0, 0), confidence, timestamp=0.0)
+    analyzer.update(np.array([2]), box_at(0, 0), confidence, timestamp=5.0)
+    assert list(analyzer.rows) == [2]
+    # A new track starts its dwell time fresh
+    assert analyzer.dwell_time.tolist() == [0]
+    assert analyzer.update(np.empty(0), np.empty((0, 4)), np.empty(0)) == []
@@ -0,0 +1,80 @@
+# test_preview.py
+import asyncio
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+from benchmarks.fake_dvr import FakeDVRServer
+from camera_manager import CameraManager
+from database import Database
+from preview import PreviewStream, encode_preview
+
+def test_encode_preview_downscales_wide_frames():
+    jpeg = encode_preview(np.zeros((480, 1280, 3), np.uint8), quality=70, width=640)
+    assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).shape == (240, 640, 3)
+    jpeg = encode_preview(np.zeros((120, 160, 3), np.uint8), quality=70, width=640)
+    assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).shape == (120, 160, 3)
+
+def test_viewers_share_each_encoded_frame():
+    async def main():
+        worker = SimpleNamespace(channel=1, latest_frame=None, frames_read=0)
+        preview = PreviewStream(worker, max_fps=100, width=0)
+        await preview.start()
+
+        async def watch(count):
+            received = []
+            async for jpeg in preview.frames():
+                received.append(jpeg)
+                if len(received) == count:
+                    break
+            return received
+
+        viewers = [asyncio.create_task(watch(2)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        for value in (50, 200):
+            worker.latest_frame, worker.frames_read = np.full((60, 80, 3), value, np.uint8), worker.frames_read + 1
+            await asyncio.sleep(0.1)
+        received = await asyncio.gather(*viewers)
+
+        # One encode per captured frame, whatever the number of viewers
+        assert preview.frames_encoded == 2
+        assert received[0] == received[1] == received[2]
+        assert received[0][0] != received[0][1]
+
+        # A viewer joining gets the current frame at once; stopping ends its stream
+        joining = asyncio.create_task(watch(10))
+        await asyncio.sleep(0.02)
+        await preview.stop()
+        assert await asyncio.wait_for(joining, 1) == [received[0][1]]
+
+    asyncio.run(main())
+
+def test_last_viewer_leaving_stops_the_decode(tmp_path):
+    async def main():
+        server = FakeDVRServer(channels=1, latency=0)
+        await server.start()
+        db = Database(str(tmp_path / "security.db"))
+        await db.initialize()
+        manager = CameraManager(db)
+        try:
+            await manager.initialize(server.address, "admin", "secret")
+            camera_id = next(iter(manager.cameras))
+
+            first = await manager.open_preview(camera_id)
+            second = await manager.open_preview(camera_id)
+            assert first is second and first.viewers == 2
+            assert camera_id in manager.active_streams
+
+            await manager.close_preview(camera_id, first)
+            assert camera_id in manager.previews
+            await manager.close_preview(camera_id, second)
+            assert camera_id not in manager.previews
+            assert camera_id not in manager.active_streams
+
+            assert await manager.open_preview(9999) is None
+        finally:
+            await manager.close()
+            await db.close()
+            await server.stop()
+
+    asyncio.run(main())
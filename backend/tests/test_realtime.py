@@ -0,0 +1,141 @@
+# test_realtime.py
+import asyncio
+import copy
+from types import SimpleNamespace
+
+from realtime import RealtimeHub, camera_room
+
+class FakeServer:
+    """Records emits and keeps rooms like socketio.AsyncServer, with settable client backlogs"""
+
+    def __init__(self):
+        self.rooms = {}
+        self.backlogs = {}
+        self.emitted = []
+        self.manager = SimpleNamespace(get_participants=self._participants)
+        self.eio = SimpleNamespace(sockets=self)
+
+    def get(self, eio_sid):
+        return SimpleNamespace(queue=SimpleNamespace(qsize=lambda: self.backlogs.get(eio_sid, 0)))
+
+    def _participants(self, namespace, room):
+        return [(sid, sid) for sid in self.rooms.get(room, ())]
+
+    async def enter_room(self, sid, room):
+        self.rooms.setdefault(room, set()).add(sid)
+
+    async def leave_room(self, sid, room):
+        self.rooms.get(room, set()).discard(sid)
+
+    async def emit(self, event, data, room=None, to=None, skip_sid=None):
+        targets = {to} if to else self.rooms.get(room, set()) - set(skip_sid or ())
+        for sid in sorted(targets):
+            # Copied like the real server encodes it, since hub state is updated in place
+            self.emitted.append((sid, event, copy.deepcopy(data)))
+
+    def take(self):
+        emitted, self.emitted = self.emitted, []
+        return emitted
+
+def test_updates_are_coalesced_per_tick():
+    async def main():
+        server = FakeServer()
+        hub = RealtimeHub(server)
+        await hub.subscribe("a", [1])
+        for count in range(5):
+            hub.publish_detections(1, {"tracks": count})
+        hub.publish_status(1, {"status": "active"})
+        hub.publish_detections(2, {"tracks": 9})
+        await hub.flush()
+
+        # Only the latest state, and only for the subscribed camera
+        assert server.take() == [
+            ("a", "camera_update", {"camera": "1", "detections": {"tracks": 4}, "status": {"status": "active"}})
+        ]
+        await hub.flush()
+        assert server.take() == []
+
+    asyncio.run(main())
+
+def test_alerts_are_all_delivered_in_one_event_per_room():
+    async def main():
+        server = FakeServer()
+        hub = RealtimeHub(server)
+        await hub.subscribe("a", ["7"])
+        await hub.subscribe("b", ["8"])
+        hub.publish_alert(7, {"id": 1})
+        hub.publish_alert(8, {"id": 3})
+        hub.publish_alert(7, {"id": 2})
+        await hub.flush()
+        assert server.take() == [
+            ("a", "alerts", {"type": "alerts", "alerts": [{"id": 1}, {"id": 2}]}),
+            ("b", "alerts", {"type": "alerts", "alerts": [{"id": 3}]}),
+        ]
+        assert hub.get_stats()["alerts_sent"] == 3
+
+    asyncio.run(main())
+
+def test_subscribe_sends_current_state():
+    async def main():
+        server = FakeServer()
+        hub = RealtimeHub(server)
+        hub.publish_status(3, {"status": "inactive"})
+        await hub.flush()
+        assert await hub.subscribe("late", [3, 4]) == ["3", "4"]
+        assert server.take() == [("late", "camera_update", {"camera": "3", "status": {"status": "inactive"}})]
+
+        await hub.unsubscribe("late", [3])
+        hub.publish_status(3, {"status": "active"})
+        await hub.flush()
+        assert server.take() == []
+        assert server.rooms[camera_room(4)] == {"late"}
+
+    asyncio.run(main())
+
+def test_backlogged_client_gets_latest_state_once_caught_up():
+    async def main():
+        server = FakeServer()
+        hub = RealtimeHub(server, max_backlog=2)
+        await hub.subscribe("fast", [1])
+        await hub.subscribe("slow", [1])
+        server.backlogs["slow"] = 10
+
+        hub.publish_detections(1, {"tracks": 1})
+        await hub.flush()
+        hub.publish_detections(1, {"tracks": 2})
+        await hub.flush()
+        assert [(sid, data["detections"]) for sid, _, data in server.take()] == [
+            ("fast", {"tracks": 1}), ("fast", {"tracks": 2})
+        ]
+        assert hub.get_stats()["lagging_clients"] == 1
+
+        server.backlogs["slow"] = 0
+        await hub.flush()
+        assert [(sid, data["detections"]) for sid, _, data in server.take()] == [("slow", {"tracks": 2})]
+        assert hub.get_stats()["lagging_clients"] == 0
+
+    asyncio.run(main())
+
+def test_state_is_kept_for_recently_updated_cameras():
+    async def main():
+        server = FakeServer()
+        hub = RealtimeHub(server, max_cameras=2)
+        for camera in ("a", "b", "c"):
+            hub.publish_detections(camera, {"tracks": 1})
+        hub.publish_status("b", {"status": "active"})
+        hub.publish_detections("d", {"tracks": 1})
+        assert list(hub.state) == ["b", "d"]
+        assert hub.dirty == {"b", "d"}
+        await hub.flush()
+        # Cameras nobody lags behind on leave nothing behind
+        assert hub.lagging == {}
+        assert hub.get_stats()["cameras"] == 2
+
+    asyncio.run(main())
+
+def test_subscribe_rejects_malformed_payloads():
+    import main
+
+    for payload in ("camera-1", None, {"cameras": 5}):
+        assert asyncio.run(main.subscribe("sid", payload))["status"] == "error"
+        assert asyncio.run(main.unsubscribe("sid", payload))["status"] == "error"
@@ -0,0 +1,93 @@
+# test_roi.py
+import numpy as np
+import pytest
+from backends import StubBackend
+from inference import TheftDetector
+from roi import RegionOfInterest, check_roi, roi_shapes
+from test_tracker import detections
+
+def test_rectangles_become_polygons():
+    assert roi_shapes(None) is None
+    assert roi_shapes({"polygons": [], "rectangles": []}) is None
+    shapes = roi_shapes({"polygons": [[[0, 0], [1, 0], [0, 1]]], "rectangles": [[0.1, 0.2, 0.3, 0.4]]})
+    assert shapes == (
+        ((0.0, 0.0), (1.0, 0.0), (0.0, 1.0)),
+        ((0.1, 0.2), (0.3, 0.2), (0.3, 0.4), (0.1, 0.4)),
+    )
+
+@pytest.mark.parametrize("config, message", [
+    ({"polygons": [[[0, 0], [1, 1]]]}, "at least 3"),
+    ({"polygons": [[[0, 0], [1, 0], [0, 1.5]]]}, "normalized"),
+    ({"rectangles": [[0, 0, 1]]}, "x1, y1, x2, y2"),
+    ({"rectangles": [[0.5, 0, 0.5, 1]]}, "x1 < x2"),
+])
+def test_invalid_shapes_are_rejected(config, message):
+    with pytest.raises(ValueError, match=message):
+        check_roi(config)
+
+def test_tiles_are_padded_merged_and_bounded():
+    shapes = roi_shapes({"rectangles": [[0.125, 0.125, 0.25, 0.25], [0.1875, 0.1875, 0.3125, 0.3125], [0.75, 0.75, 0.875, 0.875]]})
+    roi = RegionOfInterest(shapes, padding=10, max_tiles=2)
+    # The two overlapping rectangles share one tile, clamped to the frame
+    assert roi.tiles((160, 160, 3)) == [(10, 10, 60, 60), (110, 110, 150, 150)]
+    assert roi.tiles((160, 160, 3), hint=(50, 50, 120, 120)) == [(50, 50, 60, 60), (110, 110, 120, 120)]
+    assert roi.tiles((160, 160, 3), hint=(70, 0, 100, 160)) == []
+
+    collapsed = RegionOfInterest(shapes, padding=0, max_tiles=1)
+    assert collapsed.tiles((160, 160, 3)) == [(20, 20, 140, 140)]
+
+def test_contains_checks_every_shape():
+    roi = RegionOfInterest(roi_shapes({
+        "polygons": [[[0, 0], [0.5, 0], [0, 0.5]]], "rectangles": [[0.6, 0.6, 1, 1]]
+    }))
+    points = np.array([[10, 10], [40, 40], [80, 80], [90, 10]], np.float32)
+    assert roi.contains(points, (100, 100)).tolist() == [True, False, True, False]
+
+def test_detector_drops_detections_outside_the_roi():
+    detector = TheftDetector(StubBackend(cost_ms=0))
+    frame = np.zeros((100, 200, 3), np.uint8)
+    found = detections((0, 0, 20, 20), (150, 50, 190, 90))
+    assert detector.detection_regions(frame, hint=(1, 2, 3, 4)) == (1, 2, 3, 4)
+    assert len(detector.filter_roi(frame, found)) == 2
+
+    detector.set_roi(roi_shapes({"rectangles": [[0.5, 0.25, 1, 1]]}))
+    roi = detector.roi
+    assert detector.detection_regions(frame) == [(68, 0, 200, 100)]
+    assert detector.filter_roi(frame, found)[['x1', 'y1']].tolist() == [(150, 50)]
+    # Setting the same shapes keeps the cached geometry
+    detector.set_roi(roi_shapes({"rectangles": [[0.5, 0.25, 1, 1]]}))
+    assert detector.roi is roi
+
+    detector.set_roi(None)
+    assert detector.roi is None
+
+def test_roi_endpoints(client, fake_dvr_address):
+    import main
+
+    dvr_id = client.post("/dvr/configure", json={
+        "ip": fake_dvr_address, "username": "admin", "password": "secret"
+    }).json()["dvrId"]
+    try:
+        camera_id = client.get("/dvrs").json()["dvrs"][0]["cameras"][0]
+        assert client.get(f"/camera/{camera_id}/roi").json()["roi"] is None
+
+        roi = {"polygons": [[[0, 0], [0.5, 0], [0, 0.5]]], "rectangles": [[0.5, 0.5, 1, 1]]}
+        response = client.put(f"/camera/{camera_id}/roi", json=roi)
+        assert response.status_code == 200
+        assert client.get(f"/camera/{camera_id}/roi").json()["roi"] == roi
+        for stream in (f"camera-{camera_id}", f"upload-{camera_id}"):
+            assert main.inference_pool.rois[stream] == roi_shapes(roi)
+
+        bad = client.put(f"/camera/{camera_id}/roi", json={"rectangles": [[0.5, 0.5, 0.2, 1]]})
+        assert bad.status_code == 400
+        assert client.get(f"/camera/{camera_id}/roi").json()["roi"] == roi
+
+        assert client.delete(f"/camera/{camera_id}/roi").status_code == 200
+        assert client.get(f"/camera/{camera_id}/roi").json()["roi"] is None
+        assert f"camera-{camera_id}" not in main.inference_pool.rois
+
+        assert client.get("/camera/9999/roi").status_code == 404
+        assert client.put("/camera/9999/roi", json=roi).status_code == 404
+        assert client.delete("/camera/9999/roi").status_code == 404
+    finally:
+        assert client.delete(f"/dvrs/{dvr_id}").status_code == 200
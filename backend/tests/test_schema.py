@@ -0,0 +1,85 @@
+# test_schema.py
+import msgpack
+import numpy as np
+import pytest
+from benchmarks.frames import encode_jpeg, synthetic_frames
+from schema import (
+    DETECTION_DTYPE, DETECTION_FIELDS, TRACK_DTYPE, TRACK_FIELDS, ClassRegistry,
+    encode_result, predictions_to_array, wants_msgpack
+)
+
+def test_class_registry_interns_names():
+    classes = ClassRegistry(["person"])
+    assert classes.id_for("bag") == 1
+    assert classes.id_for("person") == 0
+    assert classes.names == ["person", "bag"]
+
+def test_predictions_to_array_shifts_by_offset():
+    classes = ClassRegistry()
+    rows = predictions_to_array(
+        [{'class': 'bag', 'confidence': 0.5, 'x': 10, 'y': 20, 'width': 4, 'height': 6}], classes, offset=(100, 0)
+    )
+    assert rows.dtype == DETECTION_DTYPE
+    assert [rows[0][field] for field in ('x1', 'y1', 'x2', 'y2')] == [108, 17, 112, 23]
+    assert rows[0]['class_id'] == 0
+    assert len(predictions_to_array([], classes)) == 0
+
+def test_encode_result_rows_follow_field_order():
+    detections = np.zeros(1, DETECTION_DTYPE)
+    detections[0] = (0, 0, 10, 20, 0.9, 1)
+    tracks = np.zeros(1, TRACK_DTYPE)
+    tracks[0]['id'], tracks[0]['x2'], tracks[0]['y2'] = 5, 10, 20
+    tracks[0]['speed'], tracks[0]['class_id'] = 3, 1
+
+    encoded = encode_result({'detections': detections, 'tracks': tracks, 'detected': True}, ["person", "bag"], scale=2)
+    assert encoded['schema'] == 1
+    assert encoded['detected'] is True
+    assert encoded['detections'] == [[10, 20, 20, 40, pytest.approx(0.9), 1]]
+    assert len(encoded['detections'][0]) == len(DETECTION_FIELDS)
+    assert encoded['tracks'][0][:3] == [5, 10, 20]
+    assert encoded['tracks'][0][TRACK_FIELDS.index('speed')] == 6
+    assert len(encoded['tracks'][0]) == len(TRACK_FIELDS)
+
+def test_encode_result_scales_activity_kinematics():
+    tracks = np.zeros(1, TRACK_DTYPE)
+    tracks[0]['id'], tracks[0]['speed'] = 5, 800
+    activities = [
+        {'object_id': 5, 'type': 'rapid_movement', 'confidence': 0.9, 'speed': 800.0, 'acceleration': 100.0},
+        {'object_id': 5, 'type': 'loitering', 'confidence': 0.9, 'dwell_time': 40.0}
+    ]
+    encoded = encode_result(
+        {'detections': np.zeros(0, DETECTION_DTYPE), 'tracks': tracks, 'suspicious_activities': activities},
+        ["person"], scale=2.5
+    )
+    rapid, loitering = encoded['suspicious_activities']
+    assert rapid['speed'] == encoded['tracks'][0][TRACK_FIELDS.index('speed')] == 2000
+    assert rapid['acceleration'] == 250
+    assert loitering['dwell_time'] == 40
+    # The internal result keeps analysis-scale values
+    assert activities[0]['speed'] == 800
+
+def test_encode_empty_result():
+    empty = {'detections': np.zeros(0, DETECTION_DTYPE), 'tracks': np.zeros(0, TRACK_DTYPE)}
+    encoded = encode_result(empty, [])
+    assert encoded['detections'] == [] and encoded['tracks'] == []
+
+def test_wants_msgpack():
+    assert wants_msgpack("application/msgpack, application/json;q=0.5")
+    assert wants_msgpack("application/x-msgpack")
+    assert not wants_msgpack("application/json")
+    assert not wants_msgpack(None)
+
+def test_analyze_answers_msgpack_when_asked(client):
+    jpeg = encode_jpeg(next(synthetic_frames(1, 320, 240)))
+    response = client.post(
+        "/analyze", files={"file": ("frame.jpg", jpeg, "image/jpeg")},
+        headers={"Accept": "application/msgpack"}
+    )
+    assert response.headers["content-type"] == "application/msgpack"
+    body = msgpack.unpackb(response.content)
+    assert body["status"] == "success"
+    assert body["data"]["classes"] == ["person"]
+    assert len(body["data"]["detections"]) == 3
+
+    json_body = client.post("/analyze", files={"file": ("frame.jpg", jpeg, "image/jpeg")}).json()
+    assert json_body["data"]["schema"] == 1
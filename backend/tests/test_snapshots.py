@@ -0,0 +1,77 @@
+# test_snapshots.py
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+from benchmarks.frames import encode_jpeg
+from snapshots import SnapshotCache, make_etag
+
+JPEG = encode_jpeg(np.full((480, 640, 3), 128, np.uint8))
+
+def test_concurrent_misses_share_one_fetch():
+    async def main():
+        fetches = []
+
+        async def fetch(channel):
+            fetches.append(channel)
+            await asyncio.sleep(0.05)
+            return JPEG
+
+        cache = SnapshotCache(fetch, ttl=60, thumbnail_widths=[160])
+        snapshots = await asyncio.gather(*(cache.get(1) for _ in range(5)))
+        assert fetches == [1]
+        assert snapshots == [(JPEG, make_etag(JPEG))] * 5
+        assert cache.get_stats()["coalesced"] == 4
+
+        # Within the TTL the cached snapshot is served as is
+        assert await cache.get(1) == snapshots[0]
+        assert cache.hits == 1
+
+    asyncio.run(main())
+
+def test_expired_snapshot_is_fetched_again():
+    async def main():
+        fetches = []
+
+        async def fetch(channel):
+            fetches.append(channel)
+            return JPEG
+
+        cache = SnapshotCache(fetch, ttl=0)
+        await cache.get(2)
+        await asyncio.sleep(0.01)
+        await cache.get(2)
+        assert fetches == [2, 2]
+
+    asyncio.run(main())
+
+def test_thumbnails():
+    async def main():
+        async def fetch(channel):
+            return JPEG if channel == 1 else None
+
+        cache = SnapshotCache(fetch, ttl=60, thumbnail_widths=[160])
+        data, etag = await cache.get(1, width=160)
+        assert cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR).shape == (120, 160, 3)
+        assert etag != make_etag(JPEG)
+        assert await cache.get(1, width=160) == (data, etag)
+
+        with pytest.raises(ValueError):
+            await cache.get(1, width=123)
+        assert await cache.get(2) is None
+
+    asyncio.run(main())
+
+def test_fetch_errors_reach_every_waiter():
+    async def main():
+        async def fetch(channel):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("DVR down")
+
+        cache = SnapshotCache(fetch)
+        results = await asyncio.gather(cache.get(1), cache.get(1), return_exceptions=True)
+        assert [type(result) for result in results] == [ConnectionError] * 2
+        assert cache.inflight == {}
+
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+# test_tracker.py
+import numpy as np
+import pytest
+from schema import DETECTION_DTYPE
+from tracker import IoUTracker, iou_matrix
+
+def detections(*boxes, class_id: int = 0, confidence: float = 0.9) -> np.ndarray:
+    rows = np.zeros(len(boxes), dtype=DETECTION_DTYPE)
+    for row, box in zip(rows, boxes):
+        row['x1'], row['y1'], row['x2'], row['y2'] = box
+    rows['confidence'] = confidence
+    rows['class_id'] = class_id
+    return rows
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10]], np.float32)
+    iou = iou_matrix(a, b)
+    assert iou.shape == (2, 2)
+    assert iou[0, 0] == pytest.approx(1.0)
+    assert iou[0, 1] == pytest.approx(50 / 150)
+    assert iou[1].tolist() == [0, 0]
+    assert iou_matrix(a, b[:0]).shape == (2, 0)
+
+def test_moving_objects_keep_their_ids():
+    tracker = IoUTracker(iou_threshold=0.3)
+    for step in range(10):
+        x = step * 10
+        tracker.update(detections((x, 0, x + 200, 200), (600 - x, 400, 800 - x, 600)))
+    tracks = tracker.to_array()
+    assert sorted(tracks['id'].tolist()) == [0, 1]
+    assert tracks['hits'].tolist() == [10, 10]
+    assert tracker.new_tracks == 0 and tracker.lost_tracks == 0
+
+def test_classes_never_match():
+    tracker = IoUTracker()
+    tracker.update(detections((0, 0, 100, 100), class_id=0))
+    tracker.update(detections((0, 0, 100, 100), class_id=1))
+    assert tracker.new_tracks == 1
+    assert tracker.to_array()['id'].tolist() == [0, 1]
+
+def test_lost_tracks_expire_and_ids_are_not_reused():
+    tracker = IoUTracker(max_missed=2)
+    tracker.update(detections((0, 0, 100, 100)))
+    for _ in range(3):
+        tracker.update(detections())
+    assert len(tracker) == 0
+
+    tracker.update(detections((0, 0, 100, 100)))
+    assert tracker.to_array()['id'].tolist() == [1]
+
+def test_predict_decays_confidence():
+    tracker = IoUTracker(confidence_decay=0.5)
+    assert tracker.min_confidence() == 1.0
+    tracker.update(detections((0, 0, 100, 100), confidence=0.8))
+    tracker.predict()
+    tracker.predict()
+    assert tracker.min_confidence() == pytest.approx(0.2)
+
+def test_velocity_is_per_frame_after_coasting():
+    tracker = IoUTracker()
+    # Detected every third frame, moving 10px per frame, and coasting in between
+    for step in range(0, 30, 3):
+        tracker.update(detections((step * 10, 0, step * 10 + 200, 200)))
+        tracker.predict()
+        tracker.predict()
+    assert len(tracker) == 1
+    assert tracker.velocities[0, 0] == pytest.approx(10, abs=0.1)
+    assert tracker.velocities[0, 2] == pytest.approx(10, abs=0.1)
+    # The coasted box is where the object is now
+    assert tracker.boxes[0, 0] == pytest.approx(290, abs=1)
@@ -0,0 +1,151 @@
+# tracker.py
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from schema import TRACK_DTYPE, corner_boxes
+from config import TRACKER_IOU_THRESHOLD, TRACKER_MAX_MISSED, TRACKER_CONFIDENCE_DECAY
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between two sets of corner boxes, shaped (len(a), len(b))"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+class IoUTracker:
+    """SORT-style multi-object tracker.
+
+    Tracks are matched to detections by optimal assignment on an IoU matrix
+    against constant-velocity predictions. All track state lives in parallel
+    NumPy arrays, so each update costs O(tracks x detections) regardless of
+    how long the tracker has been running. IDs increase monotonically and are
+    never reused.
+
+    Velocities are measured between a track's last two detections and
+    divided by the frames in between, so coasting with predict() between
+    keyframes does not distort them.
+    """
+
+    def __init__(self, iou_threshold: float = TRACKER_IOU_THRESHOLD,
+                 max_missed: int = TRACKER_MAX_MISSED,
+                 confidence_decay: float = TRACKER_CONFIDENCE_DECAY):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.confidence_decay = confidence_decay
+        self.next_id = 0
+
+        # Outcome of the last update, used to judge scene activity
+        self.new_tracks = 0
+        self.lost_tracks = 0
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.boxes = np.empty((0, 4), dtype=np.float32)
+        self.velocities = np.empty((0, 4), dtype=np.float32)
+        # Each track's last detected box and the frames since it was detected
+        self.detected = np.empty((0, 4), dtype=np.float32)
+        self.elapsed = np.empty(0, dtype=np.int32)
+        self.confidences = np.empty(0, dtype=np.float32)
+        self.class_ids = np.empty(0, dtype=np.int32)
+        self.hits = np.empty(0, dtype=np.int32)
+        self.misses = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def update(self, detections: np.ndarray):
+        """Advance all tracks by one frame using this frame's DETECTION_DTYPE rows"""
+        boxes = corner_boxes(detections)
+        confidences = detections['confidence']
+        class_ids = detections['class_id']
+        previous = self.boxes
+        predicted = previous + self.velocities
+
+        iou = iou_matrix(boxes, predicted)
+        # Never match a detection to a track of a different class
+        iou[class_ids[:, None] != self.class_ids[None, :]] = 0
+
+        matched_dets = np.empty(0, dtype=np.int64)
+        matched_tracks = np.empty(0, dtype=np.int64)
+        if iou.size:
+            rows, cols = linear_sum_assignment(iou, maximize=True)
+            good = iou[rows, cols] >= self.iou_threshold
+            matched_dets, matched_tracks = rows[good], cols[good]
+
+        # Unmatched tracks coast on their predicted position
+        self.boxes = predicted
+        self.misses += 1
+        self.elapsed += 1
+        self.lost_tracks = len(previous) - len(matched_tracks)
+
+        # Matched tracks take the detection and smooth their per-frame velocity
+        observed = (boxes[matched_dets] - self.detected[matched_tracks]) / self.elapsed[matched_tracks, None]
+        self.velocities[matched_tracks] = 0.5 * self.velocities[matched_tracks] + 0.5 * observed
+        self.boxes[matched_tracks] = boxes[matched_dets]
+        self.detected[matched_tracks] = boxes[matched_dets]
+        self.elapsed[matched_tracks] = 0
+        self.confidences[matched_tracks] = confidences[matched_dets]
+        self.hits[matched_tracks] += 1
+        self.misses[matched_tracks] = 0
+
+        # Unmatched detections start new tracks
+        new = np.setdiff1d(np.arange(len(boxes)), matched_dets)
+        self.new_tracks = len(new)
+        if len(new):
+            self.ids = np.concatenate([self.ids, self.next_id + np.arange(len(new))])
+            self.next_id += len(new)
+            self.boxes = np.concatenate([self.boxes, boxes[new]])
+            self.velocities = np.concatenate([self.velocities, np.zeros((len(new), 4), dtype=np.float32)])
+            self.detected = np.concatenate([self.detected, boxes[new]])
+            self.elapsed = np.concatenate([self.elapsed, np.zeros(len(new), dtype=np.int32)])
+            self.confidences = np.concatenate([self.confidences, confidences[new]])
+            self.class_ids = np.concatenate([self.class_ids, class_ids[new]])
+            self.hits = np.concatenate([self.hits, np.ones(len(new), dtype=np.int32)])
+            self.misses = np.concatenate([self.misses, np.zeros(len(new), dtype=np.int32)])
+
+        self._expire()
+
+    def predict(self):
+        """Advance all tracks by one frame without detections.
+
+        Boxes move by their velocity and confidences decay, so callers can
+        tell when the tracker has coasted for too long.
+        """
+        self.boxes = self.boxes + self.velocities
+        self.elapsed += 1
+        self.confidences = self.confidences * self.confidence_decay
+
+    def min_confidence(self) -> float:
+        """Get the lowest confidence among current tracks"""
+        return float(self.confidences.min()) if len(self.confidences) else 1.0
+
+    def _expire(self):
+        alive = self.misses <= self.max_missed
+        if alive.all():
+            return
+        self.ids = self.ids[alive]
+        self.boxes = self.boxes[alive]
+        self.velocities = self.velocities[alive]
+        self.detected = self.detected[alive]
+        self.elapsed = self.elapsed[alive]
+        self.confidences = self.confidences[alive]
+        self.class_ids = self.class_ids[alive]
+        self.hits = self.hits[alive]
+        self.misses = self.misses[alive]
+
+    def to_array(self) -> np.ndarray:
+        """Get the current tracks as TRACK_DTYPE rows"""
+        tracks = np.zeros(len(self.ids), dtype=TRACK_DTYPE)
+        tracks['id'] = self.ids
+        tracks['x1'], tracks['y1'], tracks['x2'], tracks['y2'] = self.boxes.T
+        tracks['confidence'] = self.confidences
+        tracks['class_id'] = self.class_ids
+        tracks['hits'] = self.hits
+        tracks['missed'] = self.misses
+        return tracks
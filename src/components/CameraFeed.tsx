@@ -1,10 +1,15 @@
 import React from 'react';
 import { Camera, Loader2 } from 'lucide-react';
 import { useApp } from '../context/AppContext';
+import { config } from '../config';
 
 export function CameraFeed() {
-  const { selectedCamera, setSelectedCamera, cameras, isLoading } = useApp();
+  const { selectedCamera, setSelectedCamera, cameras, isLoading, dvrConnected } = useApp();
   const currentCamera = cameras.find(cam => cam.id === selectedCamera);
+  // The backend shares one decoded stream per camera across all viewers
+  const feedUrl = dvrConnected
+    ? `${config.API_URL}/stream/${selectedCamera}/mjpeg`
+    : currentCamera?.stream_url;
 
   return (
     <div className="bg-white rounded-lg shadow">
@@ -19,7 +24,7 @@ export function CameraFeed() {
         ) : (
           <>
             <img 
-              src={currentCamera?.stream_url}
+              src={feedUrl}
               alt="Camera Feed"
               className="w-full h-full object-cover"
             />
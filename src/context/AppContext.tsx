@@ -1,5 +1,5 @@
 import React, { createContext, useContext, useState, useEffect, useCallback } from 'react';
-import { Alert, Camera, Stat } from '../types';
+import { Alert, Camera, CameraUpdate, Stat } from '../types';
 import { checkHealth, startCameraStream, stopCameraStream } from '../services/api';
 import { mockCameras, mockStats } from '../services/mockData';
 import { config } from '../config';
@@ -16,6 +16,7 @@ interface AppContextType {
   setSelectedCamera: (id: number) => void;
   alerts: Alert[];
   cameras: Camera[];
+  cameraUpdate: CameraUpdate | null;
   stats: Stat[];
   systemHealth: boolean;
   isLoading: boolean;
@@ -29,7 +30,8 @@ const AppContext = createContext<AppContextType | undefined>(undefined);
 export function AppProvider({ children }: { children: React.ReactNode }) {
   const [selectedCamera, setSelectedCamera] = useState<number>(1);
   const [alerts, setAlerts] = useState<Alert[]>([]);
-  const [cameras] = useState<Camera[]>(mockCameras);
+  const [cameras, setCameras] = useState<Camera[]>(mockCameras);
+  const [cameraUpdate, setCameraUpdate] = useState<CameraUpdate | null>(null);
   const [stats] = useState<Stat[]>(mockStats);
   const [systemHealth, setSystemHealth] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
@@ -104,9 +106,10 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
           console.log('Connection status:', data);
         });
 
-        newSocket.on('alert', (data) => {
-          if (data.type === 'alert') {
-            setAlerts(prev => [data.alert, ...prev].slice(0, 10));
+        // Alerts raised since the previous server tick arrive together, oldest first
+        newSocket.on('alerts', (data: { type: string; alerts: Alert[] }) => {
+          if (data.type === 'alerts') {
+            setAlerts(prev => [...data.alerts.slice().reverse(), ...prev].slice(0, 10));
           }
         });
 
@@ -133,6 +136,36 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
     };
   }, []);
 
+  // Receive pushed updates only for the camera being displayed
+  useEffect(() => {
+    if (!socket || !socketConnected) {
+      return;
+    }
+
+    const handleCameraUpdate = (data: CameraUpdate) => {
+      // Updates for a camera left behind may still arrive before the unsubscribe lands
+      if (String(data.camera) !== String(selectedCamera)) {
+        return;
+      }
+      setCameraUpdate(data);
+      if (data.status) {
+        const { status } = data.status;
+        setCameras(prev => prev.map(camera =>
+          camera.id === selectedCamera ? { ...camera, status } : camera
+        ));
+      }
+    };
+
+    setCameraUpdate(null);
+    socket.on('camera_update', handleCameraUpdate);
+    socket.emit('subscribe', { cameras: [selectedCamera] });
+
+    return () => {
+      socket.off('camera_update', handleCameraUpdate);
+      socket.emit('unsubscribe', { cameras: [selectedCamera] });
+    };
+  }, [socket, socketConnected, selectedCamera]);
+
   // Check system health periodically
   useEffect(() => {
     let isSubscribed = true;
@@ -189,6 +222,7 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
         setSelectedCamera: handleCameraSelect, 
         alerts, 
         cameras, 
+        cameraUpdate,
         stats,
         systemHealth,
         isLoading,
@@ -50,4 +50,4 @@ export async function stopCameraStream(cameraId: number) {
     console.error('Error stopping camera stream:', error);
     throw error;
   }
-}
\ No newline at end of file
+}
@@ -7,6 +7,7 @@ export interface Alert {
     type: string;
     message: string;
     image_url?: string;
+    clip_path?: string | null;
 }
 
 export interface Camera {
@@ -16,6 +17,28 @@ export interface Camera {
     stream_url?: string;
 }
 
+export interface CameraStatus {
+    status: string;
+    lastChecked: string | null;
+    lastError: string | null;
+}
+
+export interface DetectionSummary {
+    timestamp: string;
+    detected: boolean;
+    skipped: boolean;
+    detections: number;
+    tracks: number;
+    objects: Record<string, number>;
+    suspicious_activities: number;
+}
+
+export interface CameraUpdate {
+    camera: string;
+    status?: CameraStatus;
+    detections?: DetectionSummary;
+}
+
 export interface DvrConfig {
     ip: string;
     username: string;